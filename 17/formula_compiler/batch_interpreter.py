@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для виконання коду, який згенеровано генератором коду,
+одночасно для багатьох наборів значень змінних (рядків).
+
+Значення кожної вхідної змінної задаються масивом NumPy (стовпчиком),
+i-ий елемент якого - значення змінної у i-ому рядку.
+Інтерпретатор виконує кожну команду над цілими стовпчиками:
+у стеку знаходяться масиви, а арифметичні операції виконуються
+поелементно.
+
+Ділення на 0 не зупиняє виконання: рядки, у яких виникло ділення на 0,
+позначаються у масиві помилок (масці), і наступні команди SET
+не змінюють значень змінних у цих рядках, так само, як Interpreter
+не виконує команди після помилки.
+Недопустима команда та змінна, що не задана і не присвоєна раніше,
+зупиняють виконання для всіх рядків.
+Усі стовпчики повинні мати однакову довжину (число задає однакове
+значення для всіх рядків), інакше конструктор піднімає ValueError.
+"""
+import numpy as np
+
+from interpreter import ERRORS
+
+# функції, що виконують арифметичні команди над стовпчиками
+OPERATIONS = {"ADD": np.add,
+              "SUB": np.subtract,
+              "MUL": np.multiply}
+
+
+class BatchInterpreter:
+    def __init__(self, code, columns):
+        self._code = code           # програмний код (результат роботи
+                                    # генератора коду)
+        self._values = {}           # словник стовпчиків значень змінних
+        self._size = None           # кількість рядків
+        for variable, column in columns.items():
+            column = np.asarray(column, dtype=float)
+            if column.ndim > 1:
+                raise ValueError("Стовпчик змінної {} не є одновимірним"
+                                 .format(variable))
+            if column.ndim:
+                if self._size is None:
+                    self._size = len(column)
+                elif len(column) != self._size:
+                    raise ValueError(
+                        "Стовпчик змінної {} має {} значень замість {}"
+                        .format(variable, len(column), self._size))
+            self._values[variable] = column
+        if self._size is None:
+            self._size = 1
+        for variable, column in self._values.items():
+            self._values[variable] = np.broadcast_to(column, (self._size,))
+        self._errors = np.zeros(self._size, dtype=bool)   # маска помилок
+        self._last_error = 0        # код помилки виконання
+
+    def execute(self):
+        """
+        Метод виконує код програми для усіх рядків.
+        Повертає код помилки, що зупинила виконання для усіх рядків,
+        або 0, якщо такої помилки немає.
+        Рядки з діленням на 0 позначаються у масці get_error_mask.
+        Якщо є помилка, то показує її.
+        :return: код помилки або 0
+        """
+        stack = []
+        alive = np.ones(self._size, dtype=bool)     # рядки без помилок
+        failed = False                              # чи є рядки з помилками
+        self._last_error = 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for command, operand in self._code:
+                if command == "LOADC":
+                    stack.append(operand)
+                elif command == "LOADV":
+                    if operand not in self._values:
+                        self._last_error = 2
+                        break
+                    stack.append(self._values[operand])
+                elif command in OPERATIONS:
+                    second = stack.pop()
+                    first = stack.pop()
+                    stack.append(OPERATIONS[command](first, second))
+                elif command == "DIV":
+                    second = stack.pop()
+                    first = stack.pop()
+                    zero = np.equal(second, 0) & alive
+                    if zero.any():
+                        alive = alive & ~zero
+                        failed = True
+                    stack.append(np.divide(first, second))
+                elif command == "SET":
+                    value = np.broadcast_to(stack.pop(), (self._size,))
+                    if failed:
+                        old = self._values.get(operand)
+                        if old is None:
+                            old = np.full(self._size, np.nan)
+                        value = np.where(alive, value, old)
+                    self._values[operand] = value
+                else:
+                    self._last_error = 1
+                    break
+
+        self._errors = ~alive
+        if self._last_error:
+            print("Помилка виконання: {}".format(ERRORS[self._last_error]))
+        return self._last_error
+
+    def get_values(self, variable):
+        """
+        Метод повертає стовпчик значень змінної variable
+        Якщо змінної немає, повертає None
+        :param variable: ім'я змінної
+        :return: масив значень (or None)
+        """
+        return self._values.get(variable)
+
+    def get_all(self):
+        """
+        Метод повертає словник стовпчиків значень змінних
+        :return: словник масивів
+        """
+        return self._values
+
+    def get_error_mask(self):
+        """
+        Метод повертає маску рядків, у яких виникло ділення на 0
+        :return: масив булівських значень
+        """
+        return self._errors
+
+
+if __name__ == "__main__":
+    from storage import Storage
+    from code_generator import CodeGenerator
+    from interpreter import Interpreter
+
+    lines = ["x = 1",
+             "y = 2",
+             "u2 = x - 2*a",
+             "t = 2*x - y*b",
+             "z = (2*u2 + 3.2*x - 1.3*y)/t",
+             "w = z + a"]
+    code, error = CodeGenerator(lines, Storage()).generate_code()
+    a = np.array([1.0, 2.0, 3.0, 4.0])
+    b = np.array([1.0, 0.5, 1.0, 2.0])
+    interpreter = BatchInterpreter(code, {"a": a, "b": b})
+    last_error = interpreter.execute()
+    success = not error and last_error == 0 and \
+        interpreter.get_error_mask().tolist() == [True, False, True, False]
+
+    for row in range(len(a)):
+        storage = Storage()
+        CodeGenerator(lines, storage).generate_code()
+        storage.set("a", a[row])
+        storage.set("b", b[row])
+        row_error = Interpreter(code, storage).execute()
+        success = success and (row_error == 3) == \
+            interpreter.get_error_mask()[row]
+        for variable, value in storage.get_all().items():
+            batch_value = interpreter.get_values(variable)[row]
+            success = success and (value == batch_value or
+                                   value is None and np.isnan(batch_value))
+
+    interpreter = BatchInterpreter([("LOADV", "q"), ("SET", "x")], {"a": a})
+    success = success and interpreter.execute() == 2
+    interpreter = BatchInterpreter([("XXX", None)], {"a": a})
+    success = success and interpreter.execute() == 1
+
+    interpreter = BatchInterpreter(code, {"a": 2.0, "b": b})
+    success = success and interpreter.execute() == 0 and \
+        interpreter.get_values("a").tolist() == [2.0] * len(b)
+    for columns in ({"a": a, "b": b[:3]}, {"a": a[:1], "b": b},
+                    {"a": a, "b": np.ones((4, 1))}):
+        try:
+            BatchInterpreter(code, columns)
+            success = False
+        except ValueError as e:
+            success = success and "змінної b " in str(e)
+    print("Success =", success)
@@ -0,0 +1,835 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для вимірювання швидкодії частин компілятора формул.
+
+Кожна функція benchmark_... порівнює базову реалізацію з прискореною
+на виразах різної довжини та показує час виконання у секундах.
+"""
+import sys
+import time
+
+from storage import Storage
+from tokenizer import get_tokens, scan_tokens
+from code_generator import CodeGenerator
+from interpreter import Interpreter
+from compiled_interpreter import CompiledInterpreter
+from register_interpreter import RegisterInterpreter
+from binary_code import encode, BinaryInterpreter
+from slot_storage import SlotStorage, SlotInterpreter
+from fast_interpreter import FastInterpreter
+from incremental_compiler import IncrementalCompiler
+from spreadsheet import Spreadsheet
+from parallel_executor import ParallelExecutor
+from syntax_analyzer import SyntaxAnalyzer
+from syntax_table import TableSyntaxAnalyzer
+from token_array import TokenArray
+from profiler import ProfilingInterpreter
+from bindings import bind, load_csv, load_json, save_binary, load_binary
+from scenarios import run_scenarios
+from lazy_evaluator import LazyInterpreter
+from stack_depth import PreallocatedInterpreter
+from superinstructions import SuperInterpreter, count_patterns, \
+    select_superinstructions, fuse
+from optimizer import fold_constants, remove_dead_stores, \
+    eliminate_common_subexpressions
+
+# довжини виразів для вимірювань: 1 KB, 10 KB, 100 KB
+SIZES = (1000, 10000, 100000)
+
+
+def make_expression(size):
+    """
+    Функція будує вираз довжиною не менше size символів вигляду
+    (a0 + 1.5) * b0 - (a1 + 1.5) * b1 - ...
+    :param size: мінімальна довжина виразу
+    :return: рядок виразу
+    """
+    parts = []
+    length = 0
+    i = 0
+    while length < size:
+        part = "(a{0} + {0}.5) * b{0}".format(i)
+        parts.append(part)
+        length += len(part) + 3
+        i += 1
+    return " - ".join(parts)
+
+
+def measure(func, *args, repeat=3):
+    """
+    Функція виконує func(*args) repeat разів
+    та повертає найменший час виконання
+    :param func: функція
+    :param args: аргументи функції
+    :param repeat: кількість повторень
+    :return: час у секундах
+    """
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def show(title, rows):
+    """
+    Функція показує таблицю результатів вимірювань
+    :param title: заголовок
+    :param rows: список кортежів (<розмір>, <час 1>, <час 2>)
+    :return: None
+    """
+    print(title)
+    for size, base, fast in rows:
+        print("{:>8} {:>12.6f} {:>12.6f} {:>8.1f}x".format(
+            size, base, fast, base / fast if fast else float("inf")))
+
+
+def benchmark_tokenizer(sizes=SIZES):
+    """
+    Функція порівнює get_tokens та scan_tokens
+    :param sizes: довжини виразів
+    :return: список кортежів (<розмір>, <час get_tokens>, <час scan_tokens>)
+    """
+    rows = []
+    for size in sizes:
+        expression = make_expression(size)
+        rows.append((size,
+                     measure(get_tokens, expression, repeat=1),
+                     measure(scan_tokens, expression)))
+    show("tokenizer: get_tokens / scan_tokens", rows)
+    return rows
+
+
+def benchmark_parser(sizes=SIZES):
+    """
+    Функція порівнює рекурсивний розбір виразу зі списку токенів
+    (CodeGenerator._expression) та розбір за індексом зі стеком операцій
+    (CodeGenerator._cursor_expression). Токенізація не вимірюється
+    :param sizes: довжини виразів
+    :return: список кортежів (<розмір>, <час рекурсивного розбору>,
+                              <час розбору за індексом>)
+    """
+    rows = []
+    for size in sizes:
+        tokens = scan_tokens(make_expression(size))
+        generator = CodeGenerator([], Storage())
+        rows.append((size,
+                     measure(lambda: generator._expression([], tokens[:]),
+                             repeat=1),
+                     measure(lambda: generator._cursor_expression([], tokens,
+                                                                  0))))
+    show("code generator: recursive / cursor", rows)
+    return rows
+
+
+def benchmark_fused_front_end(sizes=SIZES):
+    """
+    Функція порівнює генерацію коду рядка присвоєння з окремою
+    синтаксичною перевіркою (parser="cursor") та з перевіркою під час
+    розбору за один прохід (parser="fused"). Токенізація входить
+    до результату
+    :param sizes: довжини виразів
+    :return: список кортежів (<розмір>, <час cursor>, <час fused>)
+    """
+    rows = []
+    for size in sizes:
+        lines = ["x = " + make_expression(size)]
+        rows.append((size,
+                     measure(lambda: CodeGenerator(lines, Storage(), "cursor")
+                             .generate_code(), repeat=1),
+                     measure(lambda: CodeGenerator(lines, Storage(), "fused")
+                             .generate_code())))
+    show("front end: cursor / fused", rows)
+    return rows
+
+
+def benchmark_syntax_table(sizes=SIZES):
+    """
+    Функція порівнює перевірку синтаксису виразу SyntaxAnalyzer
+    та TableSyntaxAnalyzer з циклом по таблиці пар і з NumPy.
+    Токенізація не вимірюється
+    :param sizes: довжини виразів
+    :return: список кортежів (<розмір>, <час SyntaxAnalyzer>,
+                              <час TableSyntaxAnalyzer>,
+                              <час TableSyntaxAnalyzer з NumPy>)
+    """
+    rows = []
+    for size in sizes:
+        tokens = scan_tokens(make_expression(size))
+        rows.append((size,
+                     measure(lambda: SyntaxAnalyzer(tokens)
+                             .check_expression_syntax()),
+                     measure(lambda: TableSyntaxAnalyzer(tokens)
+                             .check_expression_syntax()),
+                     measure(lambda: TableSyntaxAnalyzer(tokens, True)
+                             .check_expression_syntax())))
+    show("syntax analyzer: SyntaxAnalyzer / table",
+         [row[:3] for row in rows])
+    show("syntax analyzer: SyntaxAnalyzer / table (NumPy)",
+         [row[:2] + row[3:] for row in rows])
+    return rows
+
+
+def token_list_size(tokens):
+    """
+    Функція повертає приблизну кількість байтів, які займає список
+    токенів Token разом з рядками значень (рядки типів спільні)
+    :param tokens: список токенів
+    :return: кількість байтів
+    """
+    return sys.getsizeof(tokens) + \
+        sum(sys.getsizeof(token) + sys.getsizeof(token.value)
+            for token in tokens)
+
+
+def benchmark_token_array(sizes=(1000, 10000, 100000)):
+    """
+    Функція порівнює генерацію коду програми за списками токенів
+    рядків (parser="cursor") та за токенами програми у вигляді TokenArray
+    (parser="array") і показує пам'ять, яку займають токени
+    :param sizes: кількості рядків програми
+    :return: список кортежів (<кількість рядків>, <час cursor>,
+                              <час array>)
+    """
+    rows = []
+    for size in sizes:
+        lines = ["z{0} = (x + y) * (x * x + {0} * x * y + y * y) / (y - 2.5)"
+                 .format(i) for i in range(size)]
+        tokens = [token for line in lines for token in scan_tokens(line)]
+        print("{:>8} tokens: {} bytes, TokenArray: {} bytes".format(
+            size, token_list_size(tokens), TokenArray(lines).get_size()))
+        rows.append((size,
+                     measure(lambda: CodeGenerator(lines, Storage(), "cursor")
+                             .generate_code(), repeat=1),
+                     measure(lambda: CodeGenerator(lines, Storage(), "array")
+                             .generate_code())))
+    show("code generator: cursor / array", rows)
+    return rows
+
+
+def make_program(size, storage_class=Storage):
+    """
+    Функція будує програму з присвоєнь, вирази яких мають загальну
+    довжину не менше size символів, та пам'ять з визначеними змінними
+    :param size: мінімальна довжина виразів програми
+    :param storage_class: клас пам'яті
+    :return: програмний код - список команд
+    :return: пам'ять
+    """
+    lines = ["x = 1", "y = 2"]
+    length = 0
+    i = 0
+    while length < size:
+        line = "z{0} = (x + y) * (x * x + {0} * x * y + y * y) / (y - x)" \
+               " - z{0}".format(i)
+        lines.append(line)
+        length += len(line)
+        i += 1
+    storage = storage_class()
+    code, _ = CodeGenerator(lines, storage, "cursor").generate_code()
+    for variable in storage.get_all():
+        storage.set(variable, 1.0)
+    return code, storage
+
+
+def run_repeatedly(interpreter, times):
+    """
+    Функція виконує програму інтерпретатором times разів
+    :param interpreter: інтерпретатор
+    :param times: кількість виконань
+    :return: None
+    """
+    for _ in range(times):
+        interpreter.execute()
+
+
+def benchmark_compiled_interpreter(sizes=(100, 1000, 10000), times=200):
+    """
+    Функція порівнює виконання програми інтерпретатором Interpreter
+    та функцією Python (CompiledInterpreter).
+    Програма виконується times разів, час перетворення у функцію
+    входить до результату
+    :param sizes: довжини виразів програми
+    :param times: кількість виконань програми
+    :return: список кортежів (<розмір>, <час Interpreter>,
+                              <час CompiledInterpreter>)
+    """
+    rows = []
+    for size in sizes:
+        code, storage = make_program(size)
+        rows.append((size,
+                     measure(run_repeatedly, Interpreter(code, storage), times),
+                     measure(run_repeatedly,
+                             CompiledInterpreter(code, storage), times,
+                             repeat=1)))
+    show("interpreter x{}: Interpreter / CompiledInterpreter".format(times),
+         rows)
+    return rows
+
+
+def benchmark_register_interpreter(sizes=(100, 1000, 10000), times=200):
+    """
+    Функція порівнює виконання програми стековим інтерпретатором
+    Interpreter та регістровим RegisterInterpreter.
+    Програма виконується times разів, час побудови регістрового коду
+    входить до результату
+    :param sizes: довжини виразів програми
+    :param times: кількість виконань програми
+    :return: список кортежів (<розмір>, <час Interpreter>,
+                              <час RegisterInterpreter>)
+    """
+    rows = []
+    for size in sizes:
+        code, storage = make_program(size)
+        rows.append((size,
+                     measure(run_repeatedly, Interpreter(code, storage), times),
+                     measure(lambda: run_repeatedly(
+                         RegisterInterpreter(code, storage), times))))
+    show("interpreter x{}: Interpreter / RegisterInterpreter".format(times),
+         rows)
+    return rows
+
+
+def code_size(code):
+    """
+    Функція повертає приблизний розмір списку команд у пам'яті в байтах:
+    список, кортежі команд та числа (рядки команд та імен спільні)
+    :param code: список команд
+    :return: кількість байтів
+    """
+    return sys.getsizeof(code) + sum(sys.getsizeof(command) +
+                                     sys.getsizeof(command[1])
+                                     for command in code
+                                     if command[0] == "LOADC") + \
+        sum(sys.getsizeof(command) for command in code
+            if command[0] != "LOADC")
+
+
+def benchmark_binary_code(sizes=(100, 1000, 10000), times=200):
+    """
+    Функція порівнює виконання програми інтерпретатором Interpreter
+    та BinaryInterpreter над компактним записом коду
+    і показує розмір коду у пам'яті та у двійковому записі
+    :param sizes: довжини виразів програми
+    :param times: кількість виконань програми
+    :return: список кортежів (<розмір>, <час Interpreter>,
+                              <час BinaryInterpreter>)
+    """
+    rows = []
+    for size in sizes:
+        code, storage = make_program(size)
+        binary = encode(code)
+        print("{:>8} code: {} bytes as list, {} bytes encoded".format(
+            size, code_size(code), len(binary.to_bytes())))
+        rows.append((size,
+                     measure(run_repeatedly, Interpreter(code, storage), times),
+                     measure(run_repeatedly,
+                             BinaryInterpreter(binary, storage), times)))
+    show("interpreter x{}: Interpreter / BinaryInterpreter".format(times),
+         rows)
+    return rows
+
+
+def benchmark_slot_storage(sizes=(100, 1000, 10000), times=200):
+    """
+    Функція порівнює виконання програми інтерпретатором Interpreter
+    з пам'яттю Storage та SlotInterpreter з пам'яттю SlotStorage
+    :param sizes: довжини виразів програми
+    :param times: кількість виконань програми
+    :return: список кортежів (<розмір>, <час Interpreter>,
+                              <час SlotInterpreter>)
+    """
+    rows = []
+    for size in sizes:
+        code, storage = make_program(size)
+        slot_code, slot_storage = make_program(size, SlotStorage)
+        rows.append((size,
+                     measure(run_repeatedly, Interpreter(code, storage), times),
+                     measure(run_repeatedly,
+                             SlotInterpreter(slot_code, slot_storage), times)))
+    show("interpreter x{}: Storage / SlotStorage".format(times), rows)
+    return rows
+
+
+def benchmark_fast_interpreter(sizes=(100, 1000, 10000), times=200):
+    """
+    Функція порівнює виконання програми інтерпретатором Interpreter
+    та FastInterpreter, який повідомляє про помилки винятками
+    :param sizes: довжини виразів програми
+    :param times: кількість виконань програми
+    :return: список кортежів (<розмір>, <час Interpreter>,
+                              <час FastInterpreter>)
+    """
+    rows = []
+    for size in sizes:
+        code, storage = make_program(size)
+        rows.append((size,
+                     measure(run_repeatedly, Interpreter(code, storage), times),
+                     measure(run_repeatedly,
+                             FastInterpreter(code, storage), times)))
+    show("interpreter x{}: Interpreter / FastInterpreter".format(times), rows)
+    return rows
+
+
+def benchmark_preallocated_interpreter(sizes=(100, 1000, 10000), times=200):
+    """
+    Функція порівнює виконання програми інтерпретатором Interpreter
+    та PreallocatedInterpreter зі стеком найбільшої глибини коду
+    :param sizes: довжини виразів програми
+    :param times: кількість виконань програми
+    :return: список кортежів (<розмір>, <час Interpreter>,
+                              <час PreallocatedInterpreter>)
+    """
+    rows = []
+    for size in sizes:
+        code, storage = make_program(size)
+        rows.append((size,
+                     measure(run_repeatedly, Interpreter(code, storage), times),
+                     measure(run_repeatedly,
+                             PreallocatedInterpreter(code, storage), times)))
+    show("interpreter x{}: Interpreter / PreallocatedInterpreter".format(times),
+         rows)
+    return rows
+
+
+def benchmark_superinstructions(sizes=(100, 1000, 10000), times=200):
+    """
+    Функція обирає суперкоманди за профілем програм усіх розмірів
+    (ProfilingInterpreter), показує, у скільки разів зменшується
+    кількість викликів команд, та порівнює виконання програми
+    інтерпретатором Interpreter та SuperInterpreter з обраними суперкомандами
+    :param sizes: довжини виразів програми
+    :param times: кількість виконань програми
+    :return: список кортежів (<розмір>, <час Interpreter>,
+                              <час SuperInterpreter>)
+    """
+    programs = [make_program(size) for size in sizes]
+    counts = {}
+    total = 0
+    for code, storage in programs:
+        profiler = ProfilingInterpreter(code, storage)
+        profiler.execute()
+        total += profiler.get_profile()["instructions"]
+        for name, count in count_patterns(code,
+                                          profiler.get_executions()).items():
+            counts[name] = counts.get(name, 0) + count
+    names = select_superinstructions(counts, total)
+    print("superinstructions:", ", ".join(names))
+
+    rows = []
+    for size, (code, storage) in zip(sizes, programs):
+        fused, _ = fuse(code, names)
+        print("{:>8} dispatches {} -> {} ({:.1f}x)".format(
+            size, len(code), len(fused), len(code) / len(fused)))
+        rows.append((size,
+                     measure(run_repeatedly, Interpreter(code, storage), times),
+                     measure(run_repeatedly,
+                             SuperInterpreter(code, storage, names), times)))
+    show("interpreter x{}: Interpreter / SuperInterpreter".format(times), rows)
+    return rows
+
+
+def make_constant_program(size):
+    """
+    Функція будує програму з присвоєнь з константними підвиразами,
+    вирази яких мають загальну довжину не менше size символів,
+    та пам'ять з визначеними змінними
+    :param size: мінімальна довжина виразів програми
+    :return: програмний код - список команд
+    :return: пам'ять
+    """
+    lines = ["x = 1", "y = 2"]
+    length = 0
+    i = 0
+    while length < size:
+        line = "z{0} = (x + 2 * 3) * (y - 8 / 2) / 4 + {0} * (1 + 1) * x" \
+               " - z{0} * 1 + 0".format(i)
+        lines.append(line)
+        length += len(line)
+        i += 1
+    storage = Storage()
+    code, _ = CodeGenerator(lines, storage, "cursor").generate_code()
+    for variable in storage.get_all():
+        storage.set(variable, 1.0)
+    return code, storage
+
+
+def benchmark_constant_folding(sizes=(100, 1000, 10000), times=200):
+    """
+    Функція показує, скільки команд програми з константними підвиразами
+    вилучає fold_constants, та порівнює виконання програми
+    інтерпретатором Interpreter до та після оптимізації.
+    Час оптимізації показується окремо
+    :param sizes: довжини виразів програми
+    :param times: кількість виконань програми
+    :return: список кортежів (<розмір>, <час вихідного коду>,
+                              <час оптимізованого коду>)
+    """
+    rows = []
+    for size in sizes:
+        code, storage = make_constant_program(size)
+        start = time.perf_counter()
+        folded, eliminated = fold_constants(code)
+        elapsed = time.perf_counter() - start
+        print("{:>8} instructions {} -> {} ({:.1f}x), eliminated {}, "
+              "optimization {:.6f}".format(
+                  size, len(code), len(folded), len(code) / len(folded),
+                  eliminated, elapsed))
+        rows.append((size,
+                     measure(run_repeatedly, Interpreter(code, storage), times),
+                     measure(run_repeatedly,
+                             Interpreter(folded, storage), times)))
+    show("interpreter x{}: code / folded code".format(times), rows)
+    return rows
+
+
+def benchmark_optimizer(sizes=(100, 1000, 10000), times=200):
+    """
+    Функція показує, скільки команд програми вилучають remove_dead_stores
+    та eliminate_common_subexpressions, та порівнює виконання програми
+    інтерпретатором Interpreter до та після оптимізації.
+    Час оптимізації показується окремо
+    :param sizes: довжини виразів програми
+    :param times: кількість виконань програми
+    :return: список кортежів (<розмір>, <час вихідного коду>,
+                              <час оптимізованого коду>)
+    """
+    rows = []
+    for size in sizes:
+        code, storage = make_program(size)
+        start = time.perf_counter()
+        optimized, dead = remove_dead_stores(code)
+        optimized, common = eliminate_common_subexpressions(optimized, storage)
+        elapsed = time.perf_counter() - start
+        print("{:>8} instructions {} -> {} ({:.1f}x), dead stores {}, "
+              "common subexpressions {}, optimization {:.6f}".format(
+                  size, len(code), len(optimized), len(code) / len(optimized),
+                  dead, common, elapsed))
+        rows.append((size,
+                     measure(run_repeatedly, Interpreter(code, storage), times),
+                     measure(run_repeatedly,
+                             Interpreter(optimized, storage), times)))
+    show("interpreter x{}: code / optimized code".format(times), rows)
+    return rows
+
+
+def benchmark_profiler(sizes=(100, 1000, 10000), times=20):
+    """
+    Функція показує, скільки коштує профілювання: порівнює виконання
+    програми інтерпретатором Interpreter та ProfilingInterpreter
+    :param sizes: довжини виразів програми
+    :param times: кількість виконань програми
+    :return: список кортежів (<розмір>, <час Interpreter>,
+                              <час ProfilingInterpreter>)
+    """
+    rows = []
+    for size in sizes:
+        code, storage = make_program(size)
+        rows.append((size,
+                     measure(run_repeatedly, Interpreter(code, storage),
+                             times),
+                     measure(run_repeatedly,
+                             ProfilingInterpreter(code, storage), times)))
+    show("interpreter x{}: Interpreter / ProfilingInterpreter".format(times),
+         rows)
+    return rows
+
+
+def benchmark_bindings(sizes=(1000, 10000, 100000)):
+    """
+    Функція порівнює завантаження та встановлення значень вхідних
+    змінних з файлів CSV, JSON та двійкового файлу (mmap)
+    :param sizes: кількості вхідних змінних
+    :return: список кортежів (<кількість змінних>, <час CSV>, <час JSON>,
+                              <час двійкового файлу>)
+    """
+    import json
+    import os
+    import tempfile
+
+    directory = tempfile.mkdtemp()
+    csv_file = os.path.join(directory, "values.csv")
+    json_file = os.path.join(directory, "values.json")
+    binary_file = os.path.join(directory, "values.bin")
+
+    def run(load, filename):
+        bindings = load(filename)
+        bind(code, storage, bindings)
+        if hasattr(bindings, "close"):
+            bindings.close()
+
+    rows = []
+    for size in sizes:
+        names = ["v{}".format(i) for i in range(size)]
+        values = [i + 0.5 for i in range(size)]
+        lines = ["y{0} = v{0} * 2".format(i) for i in range(size)]
+        storage = Storage()
+        code, _ = CodeGenerator(lines, storage, "cursor").generate_code()
+        with open(csv_file, "w") as f:
+            f.write(",".join(names) + "\n" + ",".join(map(str, values)))
+        with open(json_file, "w") as f:
+            json.dump(dict(zip(names, values)), f)
+        save_binary(binary_file, names, [values])
+        rows.append((size, measure(run, load_csv, csv_file),
+                     measure(run, load_json, json_file),
+                     measure(run, load_binary, binary_file)))
+    for filename in (csv_file, json_file, binary_file):
+        os.remove(filename)
+    os.rmdir(directory)
+    show("bindings: CSV / binary", [row[:2] + row[3:] for row in rows])
+    show("bindings: JSON / binary", [row[:1] + row[2:] for row in rows])
+    return rows
+
+
+def benchmark_scenarios(sizes=(100, 1000, 10000), count=100):
+    """
+    Функція порівнює виконання програми для count сценаріїв, кожен з яких
+    змінює одну вхідну змінну (змінні z утворюють двійкове дерево,
+    тому зміна впливає на рядки піддерева): з побудовою нової пам'яті Storage
+    для кожного сценарію та з пам'яттю сценаріїв над спільним знімком
+    (run_scenarios). Показує середню кількість змінних,
+    що зберігаються у пам'яті сценарію
+    :param sizes: кількості рядків програми
+    :param count: кількість сценаріїв
+    :return: список кортежів (<кількість рядків>, <час Storage>,
+                              <час run_scenarios>)
+    """
+    def rebuild():
+        for scenario in scenarios:
+            storage = Storage()
+            for variable, value in baseline.get_all().items():
+                storage.add(variable)
+                storage.set(variable, value)
+            for variable, value in scenario.items():
+                storage.set(variable, value)
+            Interpreter(code, storage).execute()
+
+    rows = []
+    for size in sizes:
+        lines = ["z0 = (a0 + 1.5) * a0"]
+        lines += ["z{0} = (a{0} + 1.5) * a{0} - z{1}".format(i, (i - 1) // 2)
+                  for i in range(1, size)]
+        storage = Storage()
+        code, _ = CodeGenerator(lines, storage, "cursor").generate_code()
+        for variable in storage.get_all():
+            storage.set(variable, 1.0)
+        Interpreter(code, storage).execute()
+        baseline = storage.snapshot()
+        scenarios = [{"a{}".format(size - 1 - i * size // count): 2.0}
+                     for i in range(count)]
+        rows.append((size, measure(rebuild),
+                     measure(run_scenarios, code, baseline, scenarios)))
+        changes = sum(len(storage.get_changes()) for _, storage
+                      in run_scenarios(code, baseline, scenarios))
+        print("{:>8} variables: {}, changed per scenario: {:.1f}".format(
+            size, len(baseline.get_all()), changes / count))
+    show("{} scenarios: Storage / run_scenarios".format(count), rows)
+    return rows
+
+
+def benchmark_lazy_evaluator(sizes=(1000, 10000, 100000)):
+    """
+    Функція порівнює виконання усієї програми інтерпретатором Interpreter
+    та обчислення однієї змінної LazyInterpreter.get_value (разом
+    з побудовою зрізу коду). Кожне присвоєння читає попереднє
+    з номером i // 2, тому потрібні лише log2(size) присвоєнь.
+    Окремо вимірюється повторне обчислення з уже побудованим зрізом
+    :param sizes: кількості рядків програми
+    :return: список кортежів (<кількість рядків>, <час Interpreter>,
+                              <час LazyInterpreter>)
+    """
+    rows = []
+    cached = []
+    for size in sizes:
+        lines = ["z0 = x * y"]
+        lines += ["z{0} = (x + y) * z{1} - {0}".format(i, i // 2)
+                  for i in range(1, size)]
+        storage = Storage()
+        code, _ = CodeGenerator(lines, storage, "cursor").generate_code()
+        for variable in storage.get_all():
+            storage.set(variable, 1.0)
+        output = "z{}".format(size - 1)
+        interpreter = LazyInterpreter(code, storage)
+        interpreter.get_value(output)
+        print("{:>8} {}".format(size, interpreter.get_report()))
+        base = measure(lambda: Interpreter(code, storage).execute())
+        rows.append((size, base,
+                     measure(lambda: LazyInterpreter(code, storage)
+                             .get_value(output))))
+        cached.append((size, base,
+                       measure(lambda: (interpreter.invalidate(),
+                                        interpreter.get_value(output)))))
+    show("interpreter: execute / lazy get_value", rows)
+    show("interpreter: execute / lazy get_value (cached slice)", cached)
+    return rows
+
+
+def benchmark_incremental_compiler(sizes=(100, 1000, 10000)):
+    """
+    Функція порівнює генерацію коду програми після зміни одного рядка
+    генератором CodeGenerator та IncrementalCompiler.
+    Окремо вимірюються зміни, що чергуються між першим та останнім
+    рядком (найгірший випадок IncrementalCompiler: кінці кодів рядків
+    перераховуються для усієї програми)
+    :param sizes: кількості рядків програми
+    :return: список кортежів (<кількість рядків>, <час CodeGenerator>,
+                              <час IncrementalCompiler>)
+    """
+    rows = []
+    far = []
+    for size in sizes:
+        lines = ["z{0} = (x + y) * (x * x + {0} * x * y + y * y) / (y - x)"
+                 .format(i) for i in range(size)]
+        compiler = IncrementalCompiler(Storage())
+        compiler.generate_code(lines)
+        edits = []
+        for i in range(3):
+            edits.append(lines[:])
+            edits[-1][size // 2] = "z = a * {}".format(i)
+
+        def edit():
+            for edited in edits:
+                compiler.generate_code(edited)
+
+        rows.append((size,
+                     measure(lambda: [CodeGenerator(edited, Storage())
+                                      .generate_code() for edited in edits],
+                             repeat=1),
+                     measure(edit)))
+
+        edits = [edits[-1]]
+        for i in range(3):
+            for position in (0, size - 1):
+                edits.append(edits[-1][:])
+                edits[-1][position] = "z = a * {}".format(i)
+        del edits[0]
+        far.append((size, rows[-1][1] * 2, measure(edit)))
+    show("code generator, edit of one line: CodeGenerator / "
+         "IncrementalCompiler", rows)
+    show("code generator, edits of first and last lines: CodeGenerator / "
+         "IncrementalCompiler", far)
+    return rows
+
+
+def benchmark_spreadsheet(sizes=(100, 1000, 10000), times=20):
+    """
+    Функція порівнює повторне виконання програми інтерпретатором
+    Interpreter після зміни однієї вхідної змінної та перерахунок
+    змінених присвоєнь Spreadsheet
+    :param sizes: кількості рядків програми
+    :param times: кількість змін вхідної змінної
+    :return: список кортежів (<кількість рядків>, <час Interpreter>,
+                              <час Spreadsheet>)
+    """
+    rows = []
+    for size in sizes:
+        lines = ["k = 2"]
+        lines += ["c{0} = a{0} * k + {0}".format(i) for i in range(size)]
+        storage = Storage()
+        code, _ = CodeGenerator(lines, storage).generate_code()
+        for variable in storage.get_all():
+            storage.set(variable, 1.0)
+        sheet = Spreadsheet(code, storage)
+        sheet.execute()
+        variable = "a{}".format(size // 2)
+
+        def rerun(interpreter):
+            for i in range(times):
+                storage.set(variable, float(i))
+                interpreter.execute()
+
+        def recompute():
+            for i in range(times):
+                sheet.set_value(variable, float(i))
+                sheet.execute()
+
+        rows.append((size,
+                     measure(rerun, Interpreter(code, storage)),
+                     measure(recompute)))
+    show("change of one input x{}: Interpreter / Spreadsheet".format(times),
+         rows)
+    return rows
+
+
+def benchmark_parallel_generator(sizes=(10000, 100000), workers=None):
+    """
+    Функція порівнює генерацію коду програми методами generate_code
+    та generate_code_parallel
+    :param sizes: кількості рядків програми
+    :param workers: кількість процесів або None
+    :return: список кортежів (<кількість рядків>, <час generate_code>,
+                              <час generate_code_parallel>)
+    """
+    rows = []
+    for size in sizes:
+        lines = ["z{0} = (x + y) * (x * x + {0} * x * y + y * y) / (y - x)"
+                 .format(i) for i in range(size)]
+        rows.append((size,
+                     measure(lambda: CodeGenerator(lines, Storage(), "cursor")
+                             .generate_code(), repeat=1),
+                     measure(lambda: CodeGenerator(lines, Storage(), "cursor")
+                             .generate_code_parallel(workers), repeat=1)))
+    show("code generator: generate_code / generate_code_parallel", rows)
+    return rows
+
+
+def benchmark_parallel_executor(sizes=(1000, 10000, 100000), chains=64,
+                                workers=None, times=5):
+    """
+    Функція порівнює виконання програми з chains незалежних ланцюжків
+    присвоєнь інтерпретатором Interpreter та ParallelExecutor
+    і показує паралельність програми
+    :param sizes: кількості рядків програми
+    :param chains: кількість незалежних ланцюжків
+    :param workers: кількість процесів або None
+    :param times: кількість виконань програми
+    :return: список кортежів (<кількість рядків>, <час Interpreter>,
+                              <час ParallelExecutor>)
+    """
+    rows = []
+    for size in sizes:
+        lines = ["c{0} = a{0} * 2".format(i) for i in range(chains)]
+        lines += ["c{0} = (c{0} + a{0}) * (c{0} - {1}) / (a{0} + 1)"
+                  .format(i % chains, i) for i in range(size - chains)]
+        storage = Storage()
+        code, _ = CodeGenerator(lines, storage).generate_code()
+        for variable in storage.get_all():
+            storage.set(variable, 1.0)
+        executor = ParallelExecutor(code, storage, workers)
+        rows.append((size,
+                     measure(run_repeatedly, Interpreter(code, storage), times),
+                     measure(run_repeatedly, executor, times)))
+        print("{:>8} {}".format(size, executor.get_report()))
+        executor.close()
+    show("interpreter x{}: Interpreter / ParallelExecutor".format(times),
+         rows)
+    return rows
+
+
+if __name__ == "__main__":
+    benchmark_tokenizer()
+    benchmark_parser()
+    benchmark_fused_front_end()
+    benchmark_syntax_table()
+    benchmark_token_array()
+    benchmark_compiled_interpreter()
+    benchmark_register_interpreter()
+    benchmark_binary_code()
+    benchmark_slot_storage()
+    benchmark_fast_interpreter()
+    benchmark_preallocated_interpreter()
+    benchmark_superinstructions()
+    benchmark_constant_folding()
+    benchmark_optimizer()
+    benchmark_profiler()
+    benchmark_bindings()
+    benchmark_scenarios()
+    benchmark_lazy_evaluator()
+    benchmark_incremental_compiler()
+    benchmark_spreadsheet()
+    benchmark_parallel_generator()
+    benchmark_parallel_executor()
@@ -0,0 +1,363 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для компактного запису коду, який згенеровано
+генератором коду, та для виконання коду у такому записі.
+
+Функція encode перетворює список команд (<код_команди>, <операнд>)
+у об'єкт BinaryCode, що складається з
+- масиву кодів команд array('B');
+- масиву операндів array('I'): номер константи для LOADC,
+  номер змінної для LOADV та SET, 0 для арифметичних команд;
+- таблиці констант array('d');
+- таблиці імен змінних.
+
+Двійковий формат (байти у порядку little-endian):
+заголовок MAGIC, кількість команд, кількість констант, довжина таблиці імен;
+коди команд; операнди; константи; імена змінних у UTF-8, розділені "\\n".
+Кожна частина починається з адреси, кратної 8, тому файл можна
+відобразити у пам'ять (mmap) і використовувати масиви без копіювання.
+Так кілька процесів, що завантажили один файл, спільно використовують
+одні й ті самі сторінки пам'яті.
+"""
+import mmap
+import struct
+import sys
+from array import array
+
+from storage import Storage
+from interpreter import Interpreter, ERRORS
+
+# коди команд
+B_LOADC = 0
+B_LOADV = 1
+B_ADD = 2
+B_SUB = 3
+B_MUL = 4
+B_DIV = 5
+B_SET = 6
+B_FAIL = 7      # недопустима команда, операнд - код помилки
+
+# коди, що відповідають командам генератора коду
+OPCODES = {"LOADC": B_LOADC,
+           "LOADV": B_LOADV,
+           "ADD": B_ADD,
+           "SUB": B_SUB,
+           "MUL": B_MUL,
+           "DIV": B_DIV,
+           "SET": B_SET}
+
+# заголовок двійкового запису
+MAGIC = b"FCB1"
+HEADER = struct.Struct("<4sIII")
+ALIGNMENT = 8
+
+
+class BinaryCode:
+    """
+    Компактний запис програмного коду.
+    Масиви можуть бути масивами array або memoryview
+    над байтами чи відображеним у пам'ять файлом
+    """
+    def __init__(self, opcodes, operands, constants, names):
+        self.opcodes = opcodes          # коди команд
+        self.operands = operands        # операнди команд
+        self.constants = constants      # таблиця констант
+        self.names = names              # таблиця імен змінних
+        self._mmap = None               # відображений файл або None
+
+    def __len__(self):
+        return len(self.opcodes)
+
+    def decode(self):
+        """
+        Метод повертає код у вигляді списку команд
+        :return: список команд - кортежів (<код_команди>, <операнд>)
+        """
+        commands = {opcode: command for command, opcode in OPCODES.items()}
+        code = []
+        for opcode, operand in zip(self.opcodes, self.operands):
+            if opcode == B_LOADC:
+                code.append(("LOADC", self.constants[operand]))
+            elif opcode in (B_LOADV, B_SET):
+                code.append((commands[opcode], self.names[operand]))
+            elif opcode in commands:
+                code.append((commands[opcode], None))
+            else:
+                code.append(("FAIL", operand))
+        return code
+
+    def to_bytes(self):
+        """
+        Метод повертає двійковий запис коду
+        :return: байти
+        """
+        names = "\n".join(self.names).encode("utf-8")
+        parts = [HEADER.pack(MAGIC, len(self.opcodes), len(self.constants),
+                             len(names))]
+        for values, typecode in ((self.opcodes, "B"), (self.operands, "I"),
+                                 (self.constants, "d")):
+            values = array(typecode, values)
+            if sys.byteorder != "little":
+                values.byteswap()
+            parts.append(_pad(values.tobytes()))
+        parts.append(names)
+        return b"".join(parts)
+
+    def save(self, filename):
+        """
+        Метод записує двійковий запис коду у файл
+        :param filename: ім'я файлу
+        :return: None
+        """
+        with open(filename, "wb") as f:
+            f.write(self.to_bytes())
+
+    def close(self):
+        """
+        Метод звільняє відображений у пам'ять файл, якщо код завантажено
+        функцією load. Після цього код використовувати не можна
+        :return: None
+        """
+        if self._mmap is not None:
+            for view in (self.opcodes, self.operands, self.constants):
+                view.release()
+            self._mmap.close()
+            self._mmap = None
+
+
+def encode(code):
+    """
+    Функція перетворює програмний код у компактний запис.
+    Однакові константи та змінні записуються у таблиці один раз.
+    Недопустима команда записується як B_FAIL, команди після неї
+    не записуються, бо ніколи не виконуються
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :return: BinaryCode
+    """
+    opcodes = array("B")
+    operands = array("I")
+    constants = array("d")
+    constant_numbers = {}
+    names = []
+    name_numbers = {}
+    for command, operand in code:
+        opcode = OPCODES.get(command)
+        if opcode is None:
+            opcodes.append(B_FAIL)
+            operands.append(1)
+            break
+        if opcode == B_LOADC:
+            key = repr(float(operand))
+            if key not in constant_numbers:
+                constant_numbers[key] = len(constants)
+                constants.append(operand)
+            operand = constant_numbers[key]
+        elif opcode in (B_LOADV, B_SET):
+            if operand not in name_numbers:
+                name_numbers[operand] = len(names)
+                names.append(operand)
+            operand = name_numbers[operand]
+        else:
+            operand = 0
+        opcodes.append(opcode)
+        operands.append(operand)
+    return BinaryCode(opcodes, operands, constants, names)
+
+
+def from_buffer(buffer):
+    """
+    Функція відновлює код з двійкового запису.
+    Масиви коду - це memoryview над buffer, тобто дані не копіюються
+    (крім платформ з порядком байтів big-endian)
+    :param buffer: байти або інший об'єкт з буферним протоколом
+    :return: BinaryCode
+    """
+    view = memoryview(buffer).cast("B")
+    magic, size, constants_size, names_size = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("Неправильний формат коду")
+    offset = HEADER.size
+    arrays = []
+    for typecode, count in (("B", size), ("I", size), ("d", constants_size)):
+        length = count * array(typecode).itemsize
+        part = view[offset:offset + length].cast(typecode)
+        if sys.byteorder != "little":
+            part = array(typecode, part)
+            part.byteswap()
+        arrays.append(part)
+        offset += _padded(length)
+    names = bytes(view[offset:offset + names_size]).decode("utf-8")
+    view.release()
+    return BinaryCode(*arrays, names.split("\n") if names else [])
+
+
+def load(filename):
+    """
+    Функція завантажує код з файлу, відображаючи файл у пам'ять.
+    Щоб звільнити файл, треба викликати метод close коду
+    :param filename: ім'я файлу
+    :return: BinaryCode
+    """
+    with open(filename, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    binary = from_buffer(mapped)
+    binary._mmap = mapped
+    return binary
+
+
+def _padded(length):
+    """
+    Функція повертає найменше число, не менше length, кратне ALIGNMENT
+    :param length: довжина
+    :return: довжина з вирівнюванням
+    """
+    return (length + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _pad(data):
+    """
+    Функція доповнює байти нулями до довжини, кратної ALIGNMENT
+    :param data: байти
+    :return: байти
+    """
+    return data + bytes(_padded(len(data)) - len(data))
+
+
+class BinaryInterpreter(Interpreter):
+    """
+    Інтерпретатор компактного запису коду.
+    Код можна задати списком команд або об'єктом BinaryCode
+    """
+    def __init__(self, code, storage):
+        Interpreter.__init__(self, code, storage)
+        if not isinstance(code, BinaryCode):
+            code = encode(code)
+        self._binary = code         # компактний запис коду
+
+    def execute(self):
+        """
+        Метод виконує компактний запис коду програми.
+        Повертає код останньої помилки або 0, якщо помилки немає.
+        Якщо є помилка, то показує її.
+        :return: код останньої помилки або 0, якщо помилки немає
+        """
+        binary = self._binary
+        constants = binary.constants
+        names = binary.names
+        storage = self._storage
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        self._last_error = 0
+        for opcode, operand in zip(binary.opcodes, binary.operands):
+            if opcode == B_LOADV:
+                variable = names[operand]
+                if not storage.is_in(variable):
+                    self._last_error = 2
+                    break
+                value = storage.get(variable)
+                if value is None:
+                    storage.input_var(variable)
+                    value = storage.get(variable)
+                push(value)
+            elif opcode == B_LOADC:
+                push(constants[operand])
+            elif opcode == B_ADD:
+                second = pop()
+                push(pop() + second)
+            elif opcode == B_MUL:
+                second = pop()
+                push(pop() * second)
+            elif opcode == B_SUB:
+                second = pop()
+                push(pop() - second)
+            elif opcode == B_DIV:
+                second = pop()
+                if second == 0:
+                    self._last_error = 3
+                    break
+                push(pop() / second)
+            elif opcode == B_SET:
+                variable = names[operand]
+                if not storage.is_in(variable):
+                    self._last_error = 2
+                    break
+                storage.set(variable, pop())
+            else:
+                self._last_error = operand
+                break
+
+        if self._last_error:
+            print("Помилка виконання: {}".format(ERRORS[self._last_error]))
+        return self._last_error
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+
+    code = [('LOADC', 1.0),
+            ('SET', 'x'),
+            ('LOADC', 1.0),
+            ('SET', 'y'),
+            ('LOADV', 'x'),
+            ('LOADV', 'a'),
+            ('MUL', None),
+            ('SET', 't'),
+            ('LOADC', 1.0),
+            ('LOADV', 'x'),
+            ('LOADV', 'y'),
+            ('SUB', None),
+            ('DIV', None),
+            ('SET', 'z')]
+    binary = encode(code)
+    success = binary.opcodes.tolist() == [B_LOADC, B_SET, B_LOADC, B_SET,
+                                          B_LOADV, B_LOADV, B_MUL, B_SET,
+                                          B_LOADC, B_LOADV, B_LOADV, B_SUB,
+                                          B_DIV, B_SET] and \
+        binary.operands.tolist() == [0, 0, 0, 1, 0, 2, 0, 3,
+                                     0, 0, 1, 0, 0, 4] and \
+        binary.constants.tolist() == [1.0] and \
+        binary.names == ['x', 'y', 'a', 't', 'z'] and \
+        binary.decode() == code
+
+    restored = from_buffer(binary.to_bytes())
+    success = success and restored.decode() == code
+
+    storage = Storage()
+    for variable in ('x', 'y', 'a', 't', 'z'):
+        storage.add(variable)
+    storage.set('a', 5.0)
+    interpreter = BinaryInterpreter(restored, storage)
+    success = success and interpreter.execute() == 3 and \
+        interpreter.get_value('t') == 5.0 and interpreter.get_value('z') is None
+
+    interpreter = BinaryInterpreter([('XXX', 1.0), ('SET', 'x')], Storage())
+    success = success and interpreter.execute() == 1
+    interpreter = BinaryInterpreter([('LOADC', 1.0), ('SET', 'x')], Storage())
+    success = success and interpreter.execute() == 2
+
+    code = [('LOADC', 2.0),
+            ('SET', 'x'),
+            ('LOADC', 1.0),
+            ('SET', 'y'),
+            ('LOADC', 1.0),
+            ('LOADV', 'x'),
+            ('LOADV', 'y'),
+            ('SUB', None),
+            ('DIV', None),
+            ('SET', 'z')]
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "program.fcb")
+        encode(code).save(filename)
+        binary = load(filename)
+        storage = Storage()
+        for variable in ('x', 'y', 'z'):
+            storage.add(variable)
+        interpreter = BinaryInterpreter(binary, storage)
+        success = success and interpreter.execute() == 0 and \
+            interpreter.get_value('z') == 1.0
+        binary.close()
+
+    print("Success =", success)
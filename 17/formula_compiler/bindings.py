@@ -0,0 +1,337 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для задання значень вхідних змінних програми
+з файлу замість введення з клавіатури (Storage.input_var).
+
+Значення завантажуються у об'єкт Bindings: імена змінних та один
+або кілька рядків значень (наборів значень усіх змінних).
+Джерела значень:
+    load_csv - файл CSV: перший рядок - імена змінних,
+               кожен наступний рядок - набір значень;
+    load_json - файл JSON: об'єкт {<змінна>: <значення>}
+                або список таких об'єктів з однаковими ключами;
+    load_binary - двійковий файл, відображений у пам'ять (mmap):
+                  заголовок, імена змінних та значення float64,
+                  які використовуються без копіювання.
+Двійковий формат (байти у порядку little-endian): заголовок MAGIC,
+кількість змінних, кількість рядків, довжина таблиці імен;
+імена змінних у UTF-8, розділені "\\n", з доповненням до адреси,
+кратної 8; значення рядків підряд. Файл записує функція save_binary.
+
+Функція bind перевіряє за один прохід усі значення рядка та те,
+що задано значення кожної вхідної змінної коду (змінної, яку код читає
+до присвоєння і яка невизначена у пам'яті), і лише після цього
+встановлює значення у пам'ять. Тому після успішного bind виконання
+коду не чекає введення з клавіатури, а після помилки пам'ять не змінюється.
+"""
+import csv
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from storage import Storage
+
+# словник помилок
+ERRORS = {"unknown_variable": "Змінна {} не існує",
+          "invalid_value": "Неправильне значення змінної {}: {}",
+          "missing_value": "Не задано значення змінних: {}",
+          "missing_row": "Немає рядка значень {}"}
+
+# заголовок двійкового запису значень
+MAGIC = b"FCV1"
+HEADER = struct.Struct("<4sIII")
+ALIGNMENT = 8
+
+
+class Bindings:
+    """
+    Значення змінних: імена змінних та значення усіх рядків підряд.
+    Значення можуть бути списком (числа або рядки з файлу)
+    або memoryview над відображеним у пам'ять файлом
+    """
+    def __init__(self, names, values):
+        self.names = names          # імена змінних
+        self.values = values        # значення рядків підряд
+        self._mmap = None           # відображений файл або None
+
+    def __len__(self):
+        return len(self.values) // len(self.names) if self.names else 0
+
+    def get_row(self, row):
+        """
+        Метод повертає значення змінних рядка з номером row (від 0)
+        у порядку names
+        :param row: номер рядка
+        :return: послідовність значень
+        """
+        count = len(self.names)
+        return self.values[row * count:(row + 1) * count]
+
+    def close(self):
+        """
+        Метод звільняє відображений у пам'ять файл, якщо значення
+        завантажено функцією load_binary
+        :return: None
+        """
+        if self._mmap is not None:
+            self.values.release()
+            self._mmap.close()
+            self._mmap = None
+
+
+def input_variables(code):
+    """
+    Функція повертає змінні, які код читає до їх присвоєння,
+    у порядку першого читання
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :return: список змінних
+    """
+    assigned = set()
+    inputs = {}
+    for command, operand in code:
+        if command == "LOADV" and operand not in assigned:
+            inputs[operand] = None
+        elif command == "SET":
+            assigned.add(operand)
+    return list(inputs)
+
+
+def bind(code, storage, bindings, row=0, strict=False):
+    """
+    Функція перевіряє значення рядка row та встановлює їх у пам'ять.
+    Змінні, яких немає у пам'яті, пропускаються, а якщо strict,
+    то є помилкою. Помилкою також є неправильне значення та вхідна
+    змінна коду, яка невизначена у пам'яті і не має значення.
+    Якщо є помилка, то пам'ять не змінюється.
+    Повертає текст помилки або порожній рядок, якщо помилки немає
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :param storage: пам'ять
+    :param bindings: значення змінних Bindings
+    :param row: номер рядка значень
+    :param strict: чи є помилкою змінна, якої немає у пам'яті
+    :return: текст помилки
+    """
+    if not 0 <= row < len(bindings):
+        return ERRORS["missing_row"].format(row)
+
+    numbers = {}
+    for variable, value in zip(bindings.names, bindings.get_row(row)):
+        if not storage.is_in(variable):
+            if strict:
+                return ERRORS["unknown_variable"].format(variable)
+            continue
+        number = _to_number(value)
+        if number is None:
+            return ERRORS["invalid_value"].format(variable, value)
+        numbers[variable] = number
+
+    missing = [variable for variable in input_variables(code)
+               if variable not in numbers and storage.is_in(variable) and
+               storage.get(variable) is None]
+    if missing:
+        return ERRORS["missing_value"].format(", ".join(missing))
+
+    for variable, number in numbers.items():
+        storage.set(variable, number)
+    return ""
+
+
+def _to_number(value):
+    """
+    Функція перетворює значення з файлу у дійсне число
+    :param value: число або рядок
+    :return: дійсне число або None, якщо значення не є числом
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def load_csv(filename):
+    """
+    Функція завантажує значення змінних з файлу CSV
+    :param filename: ім'я файлу
+    :return: Bindings
+    """
+    with open(filename, newline="", encoding="utf-8") as f:
+        rows = [row for row in csv.reader(f) if row]
+    if not rows:
+        raise ValueError("Неправильний формат файлу значень")
+    names = [name.strip() for name in rows[0]]
+    values = []
+    for row in rows[1:]:
+        if len(row) != len(names):
+            raise ValueError("Неправильний формат файлу значень")
+        values += [value.strip() for value in row]
+    return Bindings(names, values)
+
+
+def load_json(filename):
+    """
+    Функція завантажує значення змінних з файлу JSON
+    :param filename: ім'я файлу
+    :return: Bindings
+    """
+    with open(filename, encoding="utf-8") as f:
+        rows = json.load(f)
+    if isinstance(rows, dict):
+        rows = [rows]
+    if not isinstance(rows, list) or \
+            not all(isinstance(row, dict) for row in rows):
+        raise ValueError("Неправильний формат файлу значень")
+    names = list(rows[0]) if rows else []
+    values = []
+    for row in rows:
+        if set(row) != set(names):
+            raise ValueError("Неправильний формат файлу значень")
+        values += [row[name] for name in names]
+    return Bindings(names, values)
+
+
+def save_binary(filename, names, rows):
+    """
+    Функція записує значення змінних у двійковий файл
+    :param filename: ім'я файлу
+    :param names: імена змінних
+    :param rows: список рядків значень у порядку names
+    :return: None
+    """
+    encoded = "\n".join(names).encode("utf-8")
+    values = array("d")
+    for row in rows:
+        if len(row) != len(names):
+            raise ValueError("Неправильний формат файлу значень")
+        values.extend(row)
+    if sys.byteorder != "little":
+        values.byteswap()
+    with open(filename, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(names), len(rows), len(encoded)))
+        f.write(encoded)
+        f.write(bytes(_padded(HEADER.size + len(encoded)) -
+                      HEADER.size - len(encoded)))
+        f.write(values.tobytes())
+
+
+def load_binary(filename):
+    """
+    Функція завантажує значення змінних з двійкового файлу,
+    відображаючи файл у пам'ять. Щоб звільнити файл, треба викликати
+    метод close значень
+    :param filename: ім'я файлу
+    :return: Bindings
+    """
+    with open(filename, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    try:
+        magic, count, rows, names_size = HEADER.unpack_from(view)
+        offset = _padded(HEADER.size + names_size)
+        size = count * rows * array("d").itemsize
+        if magic != MAGIC or len(view) < offset + size:
+            raise ValueError("Неправильний формат файлу значень")
+        names = bytes(view[HEADER.size:HEADER.size + names_size])
+        names = names.decode("utf-8").split("\n") if names_size else []
+        values = view[offset:offset + size].cast("d")
+    except (ValueError, struct.error):
+        view.release()
+        mapped.close()
+        raise ValueError("Неправильний формат файлу значень") from None
+    view.release()
+    if sys.byteorder != "little":
+        values = array("d", values)
+        values.byteswap()
+    bindings = Bindings(names, values)
+    if isinstance(values, memoryview):
+        bindings._mmap = mapped
+    else:
+        mapped.close()
+    return bindings
+
+
+def _padded(length):
+    """
+    Функція повертає найменше число, не менше length, кратне ALIGNMENT
+    :param length: довжина
+    :return: довжина з вирівнюванням
+    """
+    return (length + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    from code_generator import CodeGenerator
+    from interpreter import Interpreter
+
+    lines = ["x = a * 2",
+             "y = x + b",
+             "a = y - c"]
+    storage = Storage()
+    code, error = CodeGenerator(lines, storage).generate_code()
+    success = input_variables(code) == ["a", "b", "c"]
+
+    directory = tempfile.mkdtemp()
+    filename = os.path.join(directory, "values.csv")
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write("a, b, c, unused\n1, 2.5, 3, 4\n\n2, 3, 4, 5\n")
+    bindings = load_csv(filename)
+    success = success and len(bindings) == 2 and \
+        bind(code, storage, bindings, 1) == "" and \
+        storage.get("a") == 2.0 and storage.get("b") == 3.0 and \
+        Interpreter(code, storage).execute() == 0 and \
+        storage.get("y") == 7.0 and storage.get("a") == 3.0
+    success = success and bind(code, storage, bindings, 1, strict=True) == \
+        "Змінна unused не існує" and \
+        bind(code, storage, bindings, 2) == "Немає рядка значень 2"
+
+    filename = os.path.join(directory, "values.json")
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump({"a": 1, "b": "x2"}, f)
+    storage = Storage()
+    CodeGenerator(lines, storage).generate_code()
+    success = success and \
+        bind(code, storage, load_json(filename)) == \
+        "Неправильне значення змінної b: x2" and storage.get("a") is None
+    with open(filename, "w", encoding="utf-8") as f:
+        json.dump([{"a": 1, "b": 2}], f)
+    success = success and \
+        bind(code, storage, load_json(filename)) == \
+        "Не задано значення змінних: c" and storage.get("a") is None
+    storage.set("c", 0.5)
+    success = success and bind(code, storage, load_json(filename)) == "" and \
+        storage.get("a") == 1.0
+
+    filename = os.path.join(directory, "values.bin")
+    save_binary(filename, ["c", "b", "a"], [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+    bindings = load_binary(filename)
+    storage = Storage()
+    CodeGenerator(lines, storage).generate_code()
+    success = success and bindings.names == ["c", "b", "a"] and \
+        len(bindings) == 2 and list(bindings.get_row(1)) == [4.0, 5.0, 6.0] \
+        and bind(code, storage, bindings, 1) == "" and \
+        Interpreter(code, storage).execute() == 0 and \
+        storage.get("a") == 13.0
+    bindings.close()
+
+    with open(filename, "wb") as f:
+        f.write(b"FCV1")
+    try:
+        load_binary(filename)
+        success = False
+    except ValueError:
+        pass
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+    print("Success =", success)
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для збереження згенерованого коду програм,
+щоб не виконувати токенізацію, синтаксичний аналіз та генерацію коду
+повторно для програми, текст якої не змінився.
+
+Ключ програми - хеш SHA-256 її рядків.
+Для кожної програми зберігається результат CodeGenerator.generate_code
+(код та текст помилки) та список змінних пам'яті у порядку їх додавання.
+Кеш у пам'яті має обмежений розмір і видаляє програму,
+яка найдовше не використовувалась (LRU).
+Якщо задано каталог, то результати також зберігаються у файлах
+(модуль marshal) і читаються з них, якщо програми немає у пам'яті.
+"""
+import hashlib
+import marshal
+import os
+from collections import OrderedDict
+
+from storage import Storage
+from code_generator import CodeGenerator
+
+# розширення файлів кешу на диску
+FILE_EXTENSION = ".marshal"
+
+
+class CodeCache:
+    def __init__(self, capacity=128, directory=None, parser="recursive"):
+        self._capacity = capacity       # найбільша кількість програм у пам'яті
+        self._directory = directory     # каталог кешу на диску або None
+        self._parser = parser           # спосіб розбору виразів генератором
+        self._programs = OrderedDict()  # словник ключ - (код, помилка, змінні)
+        self._hits = 0                  # кількість знайдених у пам'яті програм
+        self._disk_hits = 0             # кількість знайдених на диску програм
+        self._misses = 0                # кількість згенерованих програм
+
+    def generate_code(self, program_lines, storage):
+        """
+        Метод повертає код та текст помилки так само,
+        як CodeGenerator.generate_code, та додає змінні програми до пам'яті.
+        Якщо програма є у кеші, то код не генерується.
+        Побічний ефект: очищує пам'ять.
+        :param program_lines: список рядків програми
+        :param storage: пам'ять
+        :return: список команд - кортежів (<код_команди>, <операнд>)
+        :return: текст помилки
+        """
+        key = self.get_key(program_lines)
+        entry = self._programs.get(key)
+        if entry is not None:
+            self._hits += 1
+            self._programs.move_to_end(key)
+        else:
+            entry = self._load(key)
+            if entry is not None:
+                self._disk_hits += 1
+            else:
+                self._misses += 1
+                entry = self._generate(program_lines)
+                self._save(key, entry)
+            self._remember(key, entry)
+
+        code, error, variables = entry
+        storage.clear()
+        for variable in variables:
+            storage.add(variable)
+        return list(code), error
+
+    def get_key(self, program_lines):
+        """
+        Метод повертає ключ програми - хеш її рядків
+        :param program_lines: список рядків програми
+        :return: рядок шістнадцяткових цифр
+        """
+        digest = hashlib.sha256()
+        for line in program_lines:
+            digest.update(line.encode("utf-8"))
+            digest.update(b"\n")
+        return digest.hexdigest()
+
+    def get_stats(self):
+        """
+        Метод повертає лічильники звернень до кешу
+        :return: словник з ключами hits, disk_hits, misses, size
+        """
+        return {"hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "size": len(self._programs)}
+
+    def clear(self):
+        """
+        Метод видаляє усі програми з пам'яті кешу та обнуляє лічильники.
+        Файли на диску не видаляються
+        :return: None
+        """
+        self._programs.clear()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+
+    def _generate(self, program_lines):
+        """
+        Метод генерує код програми
+        :param program_lines: список рядків програми
+        :return: кортеж (<код>, <помилка>, <змінні>)
+        """
+        storage = Storage()
+        code, error = CodeGenerator(program_lines, storage,
+                                    self._parser).generate_code()
+        return tuple(code), error, tuple(storage.get_all())
+
+    def _remember(self, key, entry):
+        """
+        Метод додає програму до пам'яті кешу, видаляючи програму,
+        яка найдовше не використовувалась, якщо кеш заповнений
+        :param key: ключ програми
+        :param entry: кортеж (<код>, <помилка>, <змінні>)
+        :return: None
+        """
+        self._programs[key] = entry
+        if len(self._programs) > self._capacity:
+            self._programs.popitem(last=False)
+
+    def _filename(self, key):
+        """
+        Метод повертає ім'я файлу програми на диску
+        :param key: ключ програми
+        :return: ім'я файлу
+        """
+        return os.path.join(self._directory, key + FILE_EXTENSION)
+
+    def _load(self, key):
+        """
+        Метод читає програму з диску.
+        Повертає None, якщо кеш на диску не використовується,
+        або файлу немає чи його неможливо прочитати
+        :param key: ключ програми
+        :return: кортеж (<код>, <помилка>, <змінні>) або None
+        """
+        if self._directory is None:
+            return None
+        try:
+            with open(self._filename(key), "rb") as f:
+                return marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+    def _save(self, key, entry):
+        """
+        Метод записує програму на диск, якщо задано каталог кешу.
+        Файл спочатку записується під тимчасовим ім'ям, щоб інші процеси
+        не прочитали незавершений файл
+        :param key: ключ програми
+        :param entry: кортеж (<код>, <помилка>, <змінні>)
+        :return: None
+        """
+        if self._directory is None:
+            return
+        os.makedirs(self._directory, exist_ok=True)
+        filename = self._filename(key)
+        temp_filename = "{}.{}.tmp".format(filename, os.getpid())
+        with open(temp_filename, "wb") as f:
+            marshal.dump(entry, f)
+        os.replace(temp_filename, filename)
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    lines = ["x = 1",
+             "y = 2",
+             "z = (x + y)*(x*x + 2*x*y + y*y) / a"]
+    storage = Storage()
+    expected = CodeGenerator(lines, storage).generate_code()
+    expected_variables = list(storage.get_all())
+
+    cache = CodeCache(capacity=2)
+    success = True
+    for _ in range(3):
+        storage = Storage()
+        success = success and cache.generate_code(lines, storage) == expected \
+            and list(storage.get_all()) == expected_variables
+    success = success and cache.get_stats() == {"hits": 2, "disk_hits": 0,
+                                                "misses": 1, "size": 1}
+
+    storage = Storage()
+    code, error = cache.generate_code(["a = b + c", "y = (2 - 1"], storage)
+    success = success and error == "Неправильно розставлені дужки" and \
+        list(storage.get_all()) == ["b", "c", "a"]
+    cache.generate_code(["x = 2"], Storage())
+    cache.generate_code(lines, Storage())
+    success = success and cache.get_stats()["misses"] == 4 and \
+        cache.get_stats()["size"] == 2
+
+    with tempfile.TemporaryDirectory() as directory:
+        CodeCache(directory=directory).generate_code(lines, Storage())
+        cache = CodeCache(directory=directory)
+        storage = Storage()
+        success = success and cache.generate_code(lines, storage) == expected \
+            and list(storage.get_all()) == expected_variables and \
+            cache.get_stats()["disk_hits"] == 1
+
+    print("Success =", success)
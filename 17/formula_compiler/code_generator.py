@@ -37,10 +37,58 @@
 
 Під час розбору кожен метод забирає токени зі списку токенів tokens,
 а також додає команди до списку команд code
+
+Якщо генератор створено з параметром parser="cursor", то вираз
+розбирається без рекурсії методом _cursor_expression: токени не вилучаються
+зі списку, а переглядаються за індексом, а порядок операцій визначається
+явним стеком операцій (алгоритм сортувальної станції) з урахуванням
+пріоритетів PRECEDENCE. Час генерації коду лінійний від довжини виразу,
+а глибина вкладеності дужок не обмежена глибиною рекурсії.
+
+Метод generate_code_stream генерує той самий код, читаючи токени програми
+по одному (tokenizer.iter_tokens) через курсор TokenCursor з випередженням
+на один токен. Синтаксична перевірка рядка виконується під час розбору
+(syntax_analyzer.ExpressionChecker), тому списки токенів рядків
+не будуються, і програму можна читати безпосередньо з файлу.
+
+Якщо генератор створено з параметром parser="fused", то синтаксична
+перевірка рядка та генерація коду виконуються за один прохід
+по токенах рядка (_generate_fused_line_code): під час розбору
+за індексом зі стеком операцій перевіряються пари сусідніх токенів
+та глибина дужок, а помилки та їх пріоритет такі самі, як у SyntaxAnalyzerExt.
+Змінні додаються до пам'яті лише після успішної перевірки рядка.
+
+Метод generate_code_parallel розбиває програму на частини
+по CHUNK_SIZE рядків і генерує код частин в окремих процесах.
+Код частин об'єднується у порядку рядків, змінні додаються до пам'яті
+у тому ж порядку, що й generate_code, а помилкою програми є помилка
+першої частини, у якій вона виникла.
+Номер рядка з помилкою повертає метод get_error_line.
+
+Якщо генератор створено з параметром parser="array", то токени усієї
+програми будуються один раз у компактному вигляді token_array.TokenArray
+(масиви кодів типів, позицій та довжин токенів), синтаксис рядка
+перевіряється за кодами типів (token_array.ArraySyntaxAnalyzer),
+а код генерується розбором за індексом зі стеком операцій
+(_generate_array_line_code) без створення об'єктів Token.
+
+Для згенерованого коду генератор обчислює найбільшу глибину стеку
+кожного присвоєння (stack_depth.analyze_stack). Її повертають методи
+get_stack_depths та get_max_stack_depth, наприклад, щоб створити стек
+потрібного розміру до виконання коду, а метод get_underflow_index
+повертає номер команди, для якої у стеку недостатньо значень
+(для коду правильних рядків - None).
 """
+from concurrent.futures import ProcessPoolExecutor
+
 from storage import Storage
-from tokenizer import get_tokens
-from syntax_analyzer_ext import SyntaxAnalyzerExt
+from tokenizer import Token, get_tokens, scan_tokens, iter_tokens, TokenCursor
+from syntax_analyzer import ExpressionChecker, VALID_PAIRS
+from syntax_analyzer_ext import SyntaxAnalyzerExt, ERRORS
+from syntax_table import LEFT_PAREN, RIGHT_PAREN
+from token_array import TokenArray, ArraySyntaxAnalyzer, VARIABLE, CONSTANT, \
+    OPERATION
+from stack_depth import analyze_stack
 
 COMMANDS = ("LOADC",
             "LOADV",
@@ -50,10 +98,37 @@ COMMANDS = ("LOADC",
             "DIV",
             "SET")
 
+# пріоритети операцій для розбору виразу без рекурсії
+PRECEDENCE = {"+": 1,
+              "-": 1,
+              "*": 2,
+              "/": 2}
+
+# команди, що відповідають операціям
+OPERATION_COMMANDS = {"+": ("ADD", None),
+                      "-": ("SUB", None),
+                      "*": ("MUL", None),
+                      "/": ("DIV", None)}
+
+# способи розбору виразу
+PARSERS = ("recursive", "cursor", "fused", "array")
+
+# дужки, у які перевірка синтаксису обгортає вираз
+OPEN_PAREN = Token("left_paren", "(")
+CLOSE_PAREN = Token("right_paren", ")")
+
+# кількість рядків у частині програми для паралельної генерації коду
+CHUNK_SIZE = 5000
+
 class CodeGenerator:
-    def __init__(self, program_lines, storage):
+    def __init__(self, program_lines, storage, parser="recursive"):
         self._storage = storage
         self._program_lines = program_lines
+        self._parser = parser       # спосіб розбору виразу (один з PARSERS)
+        self._error_line = 0        # номер рядка з помилкою або 0
+        self._stack_depths = []     # найбільші глибини стеку присвоєнь коду
+        self._underflow = -1        # номер команди коду, для якої у стеку
+                                    # недостатньо значень, або -1
 
     def generate_code(self):
         """
@@ -67,15 +142,126 @@ class CodeGenerator:
         :return: список команд - кортежів (<код_команди>, <операнд>)
         :return: текст помилки
         """
+        if self._parser == "array":
+            return self._generate_array_code()
+
         code = []
+        error = ""
+        self._error_line = 0
         self._storage.clear()
-        for program_line in self._program_lines:
+        for line_no, program_line in enumerate(self._program_lines, 1):
             line_code, error = self._generate_line_code(program_line)
             if error:
+                self._error_line = line_no
                 break
             code += line_code
+        self._analyze_stack(code)
         return code, error
 
+    def _generate_array_code(self):
+        """
+        Метод генерує код так само, як generate_code, за токенами
+        усієї програми у вигляді TokenArray
+        Побічний ефект: очищує пам'ять.
+        :return: список команд - кортежів (<код_команди>, <операнд>)
+        :return: текст помилки
+        """
+        code = []
+        error = ""
+        self._error_line = 0
+        self._storage.clear()
+        tokens = TokenArray(self._program_lines)
+        for line in range(tokens.line_count()):
+            line_code, error = self._generate_array_line_code(tokens, line)
+            if error:
+                self._error_line = line + 1
+                break
+            code += line_code
+        self._analyze_stack(code)
+        return code, error
+
+    def generate_code_parallel(self, workers=None, chunk_size=CHUNK_SIZE):
+        """
+        Метод генерує код так само, як generate_code, але частини програми
+        по chunk_size рядків обробляються паралельно у workers процесах
+        (None - за кількістю процесорів).
+        Якщо програма має лише одну частину, то код генерується
+        у поточному процесі
+        Побічний ефект: очищує пам'ять.
+        :param workers: кількість процесів або None
+        :param chunk_size: кількість рядків у частині
+        :return: список команд - кортежів (<код_команди>, <операнд>)
+        :return: текст помилки
+        """
+        lines = self._program_lines
+        if len(lines) <= chunk_size:
+            return self.generate_code()
+
+        code = []
+        error = ""
+        self._error_line = 0
+        self._storage.clear()
+        chunks = [(lines[start:start + chunk_size], self._parser)
+                  for start in range(0, len(lines), chunk_size)]
+        executor = ProcessPoolExecutor(workers)
+        try:
+            results = executor.map(_generate_chunk, chunks)
+            for number, (chunk_code, error, error_line, variables) in \
+                    enumerate(results):
+                for variable in variables:
+                    if not self._storage.is_in(variable):
+                        self._storage.add(variable)
+                code += chunk_code
+                if error:
+                    self._error_line = number * chunk_size + error_line
+                    break
+        finally:
+            executor.shutdown(cancel_futures=True)
+        self._analyze_stack(code)
+        return code, error
+
+    def get_error_line(self):
+        """
+        Метод повертає номер рядка (від 1), у якому виникла помилка
+        під час останньої генерації коду, або 0, якщо помилки не було
+        :return: номер рядка
+        """
+        return self._error_line
+
+    def get_stack_depths(self):
+        """
+        Метод повертає найбільшу глибину стеку кожного присвоєння коду,
+        згенерованого востаннє (k-те присвоєння відповідає k-му
+        непорожньому рядку програми до рядка з помилкою)
+        :return: список глибин стеку
+        """
+        return self._stack_depths
+
+    def get_max_stack_depth(self):
+        """
+        Метод повертає найбільшу глибину стеку коду,
+        згенерованого востаннє
+        :return: глибина стеку
+        """
+        return max(self._stack_depths, default=0)
+
+    def get_underflow_index(self):
+        """
+        Метод повертає номер команди коду, згенерованого востаннє,
+        для якої у стеку недостатньо значень, або None, якщо код правильний
+        :return: номер команди або None
+        """
+        return self._underflow if self._underflow >= 0 else None
+
+    def _analyze_stack(self, code):
+        """
+        Метод обчислює найбільші глибини стеку присвоєнь коду
+        та номер команди, для якої у стеку недостатньо значень
+        :param code: список команд - кортежів (<код_команди>, <операнд>)
+        :return: None
+        """
+        self._stack_depths, self._underflow = analyze_stack(code)
+
     def _generate_line_code(self, program_line):
         """
         Метод генерує код за рядком програми program_line.
@@ -95,6 +281,11 @@ class CodeGenerator:
         :return: список команд - кортежів (<код_команди>, <операнд>)
         :return: текст помилки
         """
+        if self._parser == "fused":
+            return self._generate_fused_line_code(program_line)
+        if self._parser == "array":
+            return self._generate_array_line_code(TokenArray([program_line]), 0)
+
         code = []
         tokens = get_tokens(program_line)
         if not tokens:
@@ -105,7 +296,10 @@ class CodeGenerator:
         if error:
             return code, error
 
-        self._expression(code, tokens[2:])
+        if self._parser == "cursor":
+            self._cursor_expression(code, tokens, 2)
+        else:
+            self._expression(code, tokens[2:])
         variable = tokens[0].value
         if not self._storage.is_in(variable):
             self._storage.add(variable)
@@ -192,6 +386,361 @@ class CodeGenerator:
         else:
             print("Factor: Invalid token", token.type)
 
+    def _cursor_expression(self, code, tokens, start):
+        """
+        Метод генерує код за списком токенів виразу, що починається
+        з індексу start, так само, як _expression, але без рекурсії.
+        Операнди одразу дають команди LOADC або LOADV, а операції та ліві
+        дужки зберігаються у стеку операцій. Перед додаванням операції
+        зі стеку виштовхуються операції з не меншим пріоритетом,
+        права дужка виштовхує операції до відповідної лівої дужки.
+        Права дужка без пари завершує вираз, як і у _expression.
+        Токени зі списку tokens не вилучаються
+        Побічний ефект: змінює список code
+        :param code: список команд - кортежів (<код_команди>, <операнд>)
+        :param tokens: список токенів
+        :param start: індекс першого токена виразу
+        :return: None
+        """
+        operations = []
+        for i in range(start, len(tokens)):
+            token = tokens[i]
+            if token.type == "constant":
+                code.append(("LOADC", float(token.value)))
+            elif token.type == "variable":
+                variable = token.value
+                if not self._storage.is_in(variable):
+                    self._storage.add(variable)
+                code.append(("LOADV", variable))
+            elif token.type == "operation":
+                priority = PRECEDENCE[token.value]
+                while operations and operations[-1] != "(" and \
+                        PRECEDENCE[operations[-1]] >= priority:
+                    code.append(OPERATION_COMMANDS[operations.pop()])
+                operations.append(token.value)
+            elif token.type == "left_paren":
+                operations.append("(")
+            elif token.type == "right_paren":
+                while operations and operations[-1] != "(":
+                    code.append(OPERATION_COMMANDS[operations.pop()])
+                if not operations:
+                    break
+                operations.pop()
+            else:
+                print("Factor: Invalid token", token.type)
+                break
+
+        while operations:
+            operation = operations.pop()
+            if operation != "(":
+                code.append(OPERATION_COMMANDS[operation])
+
+    def _generate_fused_line_code(self, program_line):
+        """
+        Метод генерує код за рядком програми так само, як
+        _generate_line_code, але перевіряє синтаксис рядка під час розбору
+        виразу за один прохід по токенах.
+        Перевіряються пари сусідніх токенів (з дужками навколо виразу)
+        та глибина дужок. Після правої дужки без пари розбір виразу
+        завершується, а перевірка продовжується до кінця рядка.
+        Константи, що не перетворюються у число, залишаються рядками
+        до кінця перевірки, щоб помилка синтаксису мала перевагу
+        :param program_line: рядок програми
+        :return: список команд - кортежів (<код_команди>, <операнд>)
+        :return: текст помилки
+        """
+        code = []
+        tokens = scan_tokens(program_line)
+        if not tokens:
+            return code, ""
+        if len(tokens) < 2 or tokens[0].type != "variable" or \
+                tokens[1].type != "equal":
+            return code, ERRORS["incorrect_assignment"]
+        if len(tokens) == 2:
+            return code, ERRORS["empty_expr"]
+
+        previous = OPEN_PAREN       # попередній токен
+        depth = 1                   # глибина дужок
+        parens_ok = True            # чи не було зайвих ')'
+        pair_error = ""             # перша недопустима пара
+        operations = []             # стек операцій
+        variables = []              # змінні виразу
+        parsing = True              # чи продовжується розбір виразу
+        invalid_constant = False    # чи є константа, що не є числом
+        for i in range(2, len(tokens)):
+            token = tokens[i]
+            kind = token.type
+            if not pair_error and kind not in VALID_PAIRS[previous.type]:
+                pair_error = ERRORS["invalid_pair"].format(previous, token)
+            previous = token
+
+            if kind == "left_paren":
+                depth += 1
+                if parsing:
+                    operations.append("(")
+            elif kind == "right_paren":
+                depth -= 1
+                if depth < 0:
+                    parens_ok = False
+                if parsing:
+                    while operations and operations[-1] != "(":
+                        code.append(OPERATION_COMMANDS[operations.pop()])
+                    if operations:
+                        operations.pop()
+                    else:
+                        parsing = False
+            elif not parsing:
+                continue
+            elif kind == "constant":
+                try:
+                    code.append(("LOADC", float(token.value)))
+                except ValueError:
+                    code.append(("LOADC", token.value))
+                    invalid_constant = True
+            elif kind == "variable":
+                variables.append(token.value)
+                code.append(("LOADV", token.value))
+            elif kind == "operation":
+                priority = PRECEDENCE[token.value]
+                while operations and operations[-1] != "(" and \
+                        PRECEDENCE[operations[-1]] >= priority:
+                    code.append(OPERATION_COMMANDS[operations.pop()])
+                operations.append(token.value)
+            else:
+                parsing = False
+
+        if not pair_error and "right_paren" not in VALID_PAIRS[previous.type]:
+            pair_error = ERRORS["invalid_pair"].format(previous, CLOSE_PAREN)
+        if not parens_ok or depth != 1:
+            return [], ERRORS["incorrect_parens"]
+        if pair_error:
+            return [], pair_error
+
+        while operations:
+            operation = operations.pop()
+            if operation != "(":
+                code.append(OPERATION_COMMANDS[operation])
+        if invalid_constant:
+            code = [(command, float(operand)) if command == "LOADC"
+                    else (command, operand) for command, operand in code]
+        for variable in variables:
+            if not self._storage.is_in(variable):
+                self._storage.add(variable)
+        variable = tokens[0].value
+        if not self._storage.is_in(variable):
+            self._storage.add(variable)
+        code.append(("SET", variable))
+        return code, ""
+
+    def _generate_array_line_code(self, tokens, line):
+        """
+        Метод генерує код за рядком програми з номером line (від 0)
+        так само, як _generate_line_code з parser="cursor", але за кодами
+        типів токенів TokenArray: значення змінних та операцій
+        вирізаються з тексту програми, а константи перетворюються у числа
+        методом TokenArray.number
+        :param tokens: токени програми TokenArray
+        :param line: номер рядка
+        :return: список команд - кортежів (<код_команди>, <операнд>)
+        :return: текст помилки
+        """
+        code = []
+        start, end = tokens.line_range(line)
+        if start == end:
+            return code, ""
+
+        analyzer = ArraySyntaxAnalyzer(tokens, line)
+        success, error = analyzer.check_assignment_syntax()
+        if error:
+            return code, error
+
+        types = tokens.get_types()
+        operations = []
+        for i in range(start + 2, end):
+            kind = types[i]
+            if kind == CONSTANT:
+                code.append(("LOADC", tokens.number(i)))
+            elif kind == VARIABLE:
+                variable = tokens.value(i)
+                if not self._storage.is_in(variable):
+                    self._storage.add(variable)
+                code.append(("LOADV", variable))
+            elif kind == OPERATION:
+                operation = tokens.value(i)
+                priority = PRECEDENCE[operation]
+                while operations and operations[-1] != "(" and \
+                        PRECEDENCE[operations[-1]] >= priority:
+                    code.append(OPERATION_COMMANDS[operations.pop()])
+                operations.append(operation)
+            elif kind == LEFT_PAREN:
+                operations.append("(")
+            elif kind == RIGHT_PAREN:
+                while operations and operations[-1] != "(":
+                    code.append(OPERATION_COMMANDS[operations.pop()])
+                if not operations:
+                    break
+                operations.pop()
+
+        while operations:
+            operation = operations.pop()
+            if operation != "(":
+                code.append(OPERATION_COMMANDS[operation])
+        variable = tokens.value(start)
+        if not self._storage.is_in(variable):
+            self._storage.add(variable)
+        code.append(("SET", variable))
+        return code, error
+
+    def generate_code_stream(self):
+        """
+        Метод генерує код так само, як generate_code, але program_lines
+        може бути файлом або будь-яким ітератором рядків програми,
+        токени якого читаються по одному
+        Побічний ефект: очищує пам'ять.
+        :return: список команд - кортежів (<код_команди>, <операнд>)
+        :return: текст помилки
+        """
+        code = []
+        error = ""
+        self._error_line = 0
+        self._storage.clear()
+        cursor = TokenCursor(iter_tokens(self._program_lines))
+        while cursor.next_line():
+            line_code, error = self._generate_stream_line_code(cursor)
+            if error:
+                self._error_line = cursor.line()
+                break
+            code += line_code
+        self._analyze_stack(code)
+        return code, error
+
+    def _generate_stream_line_code(self, cursor):
+        """
+        Метод генерує код за токенами поточного рядка курсора cursor.
+        Одночасно з розбором перевіряє синтаксис рядка за допомогою
+        ExpressionChecker, а після розбору вилучає з курсора
+        залишок токенів рядка, щоб перевірити їх.
+        Змінні рядка додаються до пам'яті лише якщо рядок правильний,
+        у тому ж порядку, що й у _generate_line_code
+        :param cursor: курсор TokenCursor на початку рядка
+        :return: список команд - кортежів (<код_команди>, <операнд>)
+        :return: текст помилки
+        """
+        code = []
+        target = cursor.advance()
+        equal = cursor.advance()
+        if target.type != "variable" or equal is None or equal.type != "equal":
+            while cursor.advance() is not None:
+                pass
+            return code, ERRORS["incorrect_assignment"]
+
+        checker = ExpressionChecker()
+        variables = []
+        self._stream_expression(code, cursor, checker, variables)
+        while self._take(cursor, checker) is not None:
+            pass
+        success, error = checker.finish()
+        if error:
+            return [], error
+        for command, operand in code:
+            if command == "LOADC" and isinstance(operand, str):
+                float(operand)  # неправильна константа, як і у _factor
+
+        variables.append(target.value)
+        for variable in variables:
+            if not self._storage.is_in(variable):
+                self._storage.add(variable)
+        code.append(("SET", target.value))
+        return code, error
+
+    def _take(self, cursor, checker):
+        """
+        Метод вилучає наступний токен рядка з курсора
+        та передає його на перевірку checker
+        :param cursor: курсор TokenCursor
+        :param checker: ExpressionChecker
+        :return: токен або None, якщо токени рядка закінчились
+        """
+        token = cursor.advance()
+        if token is not None:
+            checker.feed(token)
+        return token
+
+    def _stream_expression(self, code, cursor, checker, variables):
+        """
+        Метод генерує код виразу так само, як _expression,
+        але забирає токени з курсора cursor
+        :param code: список команд - кортежів (<код_команди>, <операнд>)
+        :param cursor: курсор TokenCursor
+        :param checker: ExpressionChecker
+        :param variables: список змінних рядка
+        :return: None
+        """
+        self._stream_term(code, cursor, checker, variables)
+        token = cursor.peek()
+        while token is not None and token.type == "operation" \
+                and token.value in ('+', '-'):
+            self._take(cursor, checker)
+            self._stream_term(code, cursor, checker, variables)
+            if token.value == '+':
+                code.append(("ADD", None))
+            else:
+                code.append(("SUB", None))
+            token = cursor.peek()
+
+    def _stream_term(self, code, cursor, checker, variables):
+        """
+        Метод генерує код доданку так само, як _term,
+        але забирає токени з курсора cursor
+        :param code: список команд - кортежів (<код_команди>, <операнд>)
+        :param cursor: курсор TokenCursor
+        :param checker: ExpressionChecker
+        :param variables: список змінних рядка
+        :return: None
+        """
+        self._stream_factor(code, cursor, checker, variables)
+        token = cursor.peek()
+        while token is not None and token.type == "operation" \
+                and token.value in ('*', '/'):
+            self._take(cursor, checker)
+            self._stream_factor(code, cursor, checker, variables)
+            if token.value == '*':
+                code.append(("MUL", None))
+            else:
+                code.append(("DIV", None))
+            token = cursor.peek()
+
+    def _stream_factor(self, code, cursor, checker, variables):
+        """
+        Метод генерує код множника так само, як _factor,
+        але забирає токени з курсора cursor.
+        Змінні не додаються до пам'яті, а записуються у список variables.
+        Неправильні токени не повідомляються, оскільки про помилку
+        повідомить checker. Константа, яку не вдалось перетворити у число,
+        залишається рядком до завершення перевірки рядка програми
+        :param code: список команд - кортежів (<код_команди>, <операнд>)
+        :param cursor: курсор TokenCursor
+        :param checker: ExpressionChecker
+        :param variables: список змінних рядка
+        :return: None
+        """
+        token = self._take(cursor, checker)
+        if token is None:
+            return
+        if token.type == "left_paren":
+            self._stream_expression(code, cursor, checker, variables)
+            next_token = cursor.peek()
+            if next_token is not None and next_token.type == "right_paren":
+                self._take(cursor, checker)
+        elif token.type == "constant":
+            try:
+                code.append(("LOADC", float(token.value)))
+            except ValueError:
+                code.append(("LOADC", token.value))
+        elif token.type == "variable":
+            variables.append(token.value)
+            code.append(("LOADV", token.value))
+
     def in_storage(self, variable):
         """
         Метод перевіряє, чи міститься змінна variable у пам'яті.
@@ -200,6 +749,21 @@ class CodeGenerator:
         """
         return self._storage.is_in(variable)
 
+
+def _generate_chunk(chunk):
+    """
+    Функція генерує код частини програми в окремому процесі
+    :param chunk: кортеж (<список рядків>, <спосіб розбору виразу>)
+    :return: кортеж (<код>, <текст помилки>, <номер рядка з помилкою
+             у частині>, <список змінних частини>)
+    """
+    lines, parser = chunk
+    storage = Storage()
+    generator = CodeGenerator(lines, storage, parser)
+    code, error = generator.generate_code()
+    return code, error, generator.get_error_line(), list(storage.get_all())
+
+
 if __name__ == "__main__":
     generator = CodeGenerator(["a = b + c", "y = (2 - 1"],
                               Storage())
@@ -240,7 +804,110 @@ if __name__ == "__main__":
                  ('SUB', None),
                  ('SET', 'y')]
 
+    success = success and generator.get_stack_depths() == [1, 1, 4, 4] and \
+        generator.get_max_stack_depth() == 4 and \
+        generator.get_underflow_index() is None
+
     success = success and generator.in_storage('a')
     success = success and generator.in_storage('x')
 
+    lines = ["x = 1",
+             "z = (((a)))",
+             "a = b + c * (d - e)",
+             "y = (2 - 1) * (x345 + 3 * d) / 234.5 - z",
+             "w = a - b - c / d / e * f + g",
+             "v = a) + (b"]
+    storage = Storage()
+    expected, _ = CodeGenerator(lines, storage).generate_code()
+    expected_variables = list(storage.get_all())
+    storage = Storage()
+    cursor_code, error = CodeGenerator(lines, storage, "cursor").generate_code()
+    success = success and not error and cursor_code == expected and \
+        list(storage.get_all()) == expected_variables
+
+    depth = 5000
+    cursor_code, error = CodeGenerator(["x = " + "(" * depth + "a" + ")" * depth],
+                                       Storage(), "cursor").generate_code()
+    success = success and not error and cursor_code == [('LOADV', 'a'),
+                                                        ('SET', 'x')]
+
+    lines = ["x = 1",
+             "",
+             "z = (((a)))",
+             "a = b + c * (d - e)",
+             "y = (2 - 1) * (x345 + 3 * d) / 234.5 - z",
+             "w = a) + (b"]
+    storage = Storage()
+    expected, _ = CodeGenerator(lines, storage).generate_code()
+    expected_variables = list(storage.get_all())
+    storage = Storage()
+    stream_code, error = CodeGenerator(iter(lines), storage).generate_code_stream()
+    success = success and not error and stream_code == expected and \
+        list(storage.get_all()) == expected_variables
+
+    for lines in (["a = b + c", "y = (2 - 1"], ["x = 1", "y = 2 * + 3"],
+                  ["x + 1"], ["x"], ["x = "], ["x = 2", "y = 3 )("]):
+        storage = Storage()
+        expected = CodeGenerator(lines, storage).generate_code()
+        expected_variables = list(storage.get_all())
+        storage = Storage()
+        success = success and \
+            CodeGenerator(lines, storage).generate_code_stream() == expected and \
+            list(storage.get_all()) == expected_variables
+
+    for lines in (["x = 1",
+                   "z = (((a)))",
+                   "a = b + c * (d - e)",
+                   "y = (2 - 1) * (x345 + 3 * d) / 234.5 - z",
+                   "w = a - b - c / d / e * f + g",
+                   "v = a) + (b"],
+                  ["a = b + c", "y = (2 - 1"], ["x = 1", "y = 2 * + 3"],
+                  ["x + 1"], ["x"], ["x = "], ["x = 2", "y = 3 )("],
+                  ["x = (a", "y = 1.2.3"], ["x = a b"], ["x = a +"]):
+        storage = Storage()
+        expected = CodeGenerator(lines, storage).generate_code()
+        expected_variables = list(storage.get_all())
+        for parser in ("fused", "array"):
+            storage = Storage()
+            success = success and \
+                CodeGenerator(lines, storage, parser).generate_code() == \
+                expected and list(storage.get_all()) == expected_variables
+
+    lines = ["x{0} = a{0} * {0} + x{1}".format(i, i // 2) for i in range(30)]
+    storage = Storage()
+    expected = CodeGenerator(lines, storage).generate_code()
+    expected_variables = list(storage.get_all())
+    storage = Storage()
+    generator = CodeGenerator(lines, storage, "cursor")
+    success = success and \
+        generator.generate_code_parallel(2, chunk_size=4) == expected and \
+        list(storage.get_all()) == expected_variables and \
+        generator.get_error_line() == 0
+
+    lines[13] = "x = (1"
+    lines[21] = "y = 2 * + 3"
+    storage = Storage()
+    generator = CodeGenerator(lines, storage)
+    expected = generator.generate_code()
+    expected_variables = list(storage.get_all())
+    success = success and generator.get_error_line() == 14
+    storage = Storage()
+    generator = CodeGenerator(lines, storage)
+    success = success and \
+        generator.generate_code_parallel(2, chunk_size=4) == expected and \
+        list(storage.get_all()) == expected_variables and \
+        generator.get_error_line() == 14 and \
+        generator.get_stack_depths() == [2] * 13 and \
+        generator.get_underflow_index() is None
+
+    generator = CodeGenerator(iter(lines), Storage())
+    generator.generate_code_stream()
+    success = success and generator.get_error_line() == 14
+
+    storage = Storage()
+    generator = CodeGenerator(lines, storage, "array")
+    success = success and generator.generate_code() == expected and \
+        list(storage.get_all()) == expected_variables and \
+        generator.get_error_line() == 14
+
     print("Success =", success)
@@ -0,0 +1,325 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для виконання коду, який згенеровано генератором коду,
+шляхом перетворення його у функцію мови Python.
+
+Функція compile_code перетворює список команд
+(<код_команди>, <операнд>) у текст функції Python та компілює його
+за допомогою вбудованої функції compile.
+Стек інтерпретатора під час перетворення замінюється виразами Python:
+LOADC та LOADV додають до стеку константу або локальну змінну функції,
+ADD, SUB, MUL, DIV об'єднують два верхніх вирази у один,
+SET присвоює вираз локальній змінній.
+Значення змінних пам'яті читаються у локальні змінні на початку функції
+та записуються у пам'ять наприкінці, тому під час виконання
+словник команд та стек не використовуються.
+
+Помилки виконання такі самі, як у Interpreter:
+- недопустима команда та змінна, що не існує, визначаються під час
+  перетворення за станом пам'яті, функція виконує команди до місця помилки;
+- ділення на 0 перехоплюється як ZeroDivisionError;
+- значення невизначеної змінної вводиться (storage.input_var)
+  у той самий момент, що й в Interpreter.
+Після помилки у пам'яті залишаються значення, присвоєні до неї.
+"""
+import math
+
+from storage import Storage
+from interpreter import Interpreter, ERRORS
+
+# найбільша глибина вкладеності виразу у тексті функції,
+# глибші вирази обчислюються у тимчасових змінних
+MAX_NESTING = 50
+
+# оператори Python, що відповідають командам
+OPERATORS = {"ADD": "+",
+             "SUB": "-",
+             "MUL": "*",
+             "DIV": "/"}
+
+
+def compile_code(code, storage):
+    """
+    Функція перетворює програмний код у функцію Python.
+    Функція має параметри get, set, input - функції читання,
+    запису та введення значення змінної пам'яті,
+    і повертає код помилки виконання або 0, якщо помилки немає.
+    Існування змінних перевіряється у пам'яті storage
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :param storage: пам'ять
+    :return: функція програми
+    :return: текст функції програми
+    """
+    source, constants = _ProgramWriter(code, storage).write()
+    namespace = dict(constants)
+    exec(compile(source, "<formula>", "exec"), namespace)
+    return namespace["_program"], source
+
+
+class _ProgramWriter:
+    """
+    Перетворення програмного коду у текст функції Python
+    """
+    def __init__(self, code, storage):
+        self._code = code               # програмний код
+        self._storage = storage         # пам'ять
+        self._slots = {}                # локальні змінні змінних пам'яті
+        self._assigned = []             # змінні, що присвоюються
+        self._defined = set()           # змінні, які вже мають значення
+        self._constants = {}            # константи, що не записуються числом
+        self._stack = []                # стек кортежів (<вираз>,
+                                        # <чи є ділення>, <глибина виразу>)
+        self._body = []                 # рядки тіла функції
+        self._temps = 0                 # кількість тимчасових змінних
+
+    def write(self):
+        """
+        Метод повертає текст функції програми та словник констант,
+        які треба додати до простору імен функції
+        :return: текст функції
+        :return: словник констант
+        """
+        for command, operand in self._code:
+            if command == "LOADC":
+                self._stack.append((self._constant(operand), False, 0))
+            elif command == "LOADV":
+                if not self._storage.is_in(operand):
+                    self._fail(2)
+                    break
+                slot = self._slot(operand)
+                if operand not in self._defined:
+                    self._flush(len(self._stack))
+                    self._emit("if {} is None:".format(slot))
+                    self._emit("    {} = _input({!r})".format(slot, operand))
+                    self._defined.add(operand)
+                self._stack.append((slot, False, 0))
+            elif command in OPERATORS:
+                second, second_div, second_depth = self._stack.pop()
+                first, first_div, first_depth = self._stack.pop()
+                self._stack.append(
+                    ("({} {} {})".format(first, OPERATORS[command], second),
+                     first_div or second_div or command == "DIV",
+                     max(first_depth, second_depth) + 1))
+                if self._stack[-1][2] > MAX_NESTING:
+                    self._flush(len(self._stack) - 1)
+                    self._stack[-1] = (self._temp(self._stack[-1][0]),
+                                       False, 0)
+            elif command == "SET":
+                if not self._storage.is_in(operand):
+                    self._fail(2)
+                    break
+                self._flush(len(self._stack) - 1)
+                slot = self._slot(operand)
+                if operand not in self._assigned:
+                    self._assigned.append(operand)
+                self._emit("{} = {}".format(slot, self._stack.pop()[0]))
+                self._defined.add(operand)
+            else:
+                self._fail(1)
+                break
+        else:
+            self._flush(len(self._stack))
+
+        lines = ["def _program(_get, _set, _input):",
+                 "    _error = 0"]
+        for variable, slot in self._slots.items():
+            lines.append("    {} = _get({!r})".format(slot, variable))
+        lines.append("    try:")
+        lines.append("        pass")
+        lines.extend("        " + line for line in self._body)
+        lines.append("    except ZeroDivisionError:")
+        lines.append("        _error = 3")
+        for variable in self._assigned:
+            lines.append("    _set({!r}, {})".format(variable,
+                                                      self._slots[variable]))
+        lines.append("    return _error")
+        return "\n".join(lines) + "\n", self._constants
+
+    def _slot(self, variable):
+        """
+        Метод повертає ім'я локальної змінної для змінної пам'яті
+        :param variable: ім'я змінної
+        :return: ім'я локальної змінної
+        """
+        if variable not in self._slots:
+            self._slots[variable] = "v{}".format(len(self._slots))
+        return self._slots[variable]
+
+    def _constant(self, number):
+        """
+        Метод повертає запис константи у тексті функції.
+        Скінченні числа записуються як є, інші значення
+        додаються до простору імен функції
+        :param number: константа
+        :return: рядок
+        """
+        if type(number) in (int, float) and math.isfinite(number):
+            return repr(number)
+        name = "_c{}".format(len(self._constants))
+        self._constants[name] = number
+        return name
+
+    def _flush(self, depth):
+        """
+        Метод обчислює у тимчасових змінних вирази з діленням
+        у нижніх depth елементах стеку. Це зберігає порядок виникнення
+        ділення на 0 відносно наступних інструкцій
+        :param depth: кількість елементів стеку
+        :return: None
+        """
+        for i in range(depth):
+            expression, has_div, _ = self._stack[i]
+            if has_div:
+                self._stack[i] = (self._temp(expression), False, 0)
+
+    def _temp(self, expression):
+        """
+        Метод обчислює вираз у новій тимчасовій змінній
+        :param expression: вираз
+        :return: ім'я тимчасової змінної
+        """
+        temp = "t{}".format(self._temps)
+        self._temps += 1
+        self._emit("{} = {}".format(temp, expression))
+        return temp
+
+    def _fail(self, error):
+        """
+        Метод завершує функцію помилкою error
+        :param error: код помилки
+        :return: None
+        """
+        self._flush(len(self._stack))
+        self._emit("_error = {}".format(error))
+
+    def _emit(self, line):
+        """
+        Метод додає рядок до тіла функції
+        :param line: рядок
+        :return: None
+        """
+        self._body.append(line)
+
+
+class CompiledInterpreter(Interpreter):
+    """
+    Інтерпретатор, що виконує програму як функцію Python.
+    Функція будується під час першого виконання та будується знову,
+    якщо змінився склад змінних пам'яті, які використовує програма
+    """
+    def __init__(self, code, storage):
+        Interpreter.__init__(self, code, storage)
+        self._variables = []        # змінні, які використовує програма
+        for command, operand in code:
+            if command in ("LOADV", "SET") and operand not in self._variables:
+                self._variables.append(operand)
+        self._signature = None      # наявність змінних у пам'яті
+        self._function = None       # функція програми
+        self._source = ""           # текст функції програми
+
+    def execute(self):
+        """
+        Метод виконує код програми, записаний у self._code.
+        Повертає код останньої помилки або 0, якщо помилки немає.
+        Якщо є помилка, то показує її.
+        :return: код останньої помилки або 0, якщо помилки немає
+        """
+        signature = tuple(map(self._storage.is_in, self._variables))
+        if signature != self._signature:
+            self._function, self._source = compile_code(self._code,
+                                                        self._storage)
+            self._signature = signature
+
+        self._last_error = self._function(self._storage.get,
+                                          self._storage.set,
+                                          self._input)
+        if self._last_error:
+            print("Помилка виконання: {}".format(ERRORS[self._last_error]))
+        return self._last_error
+
+    def get_source(self):
+        """
+        Метод повертає текст функції програми
+        (після першого виконання)
+        :return: рядок
+        """
+        return self._source
+
+    def _input(self, variable):
+        """
+        Метод вводить значення невизначеної змінної за допомогою storage
+        :param variable: ім'я змінної
+        :return: значення змінної
+        """
+        self._storage.input_var(variable)
+        return self._storage.get(variable)
+
+
+if __name__ == "__main__":
+
+    def run(code, variables, values=None):
+        storage = Storage()
+        for variable in variables:
+            storage.add(variable)
+        for variable, value in (values or {}).items():
+            storage.set(variable, value)
+        expected_storage = Storage()
+        for variable in variables:
+            expected_storage.add(variable)
+        for variable, value in (values or {}).items():
+            expected_storage.set(variable, value)
+        expected = Interpreter(code, expected_storage).execute()
+        result = CompiledInterpreter(code, storage).execute()
+        return result == expected and \
+            storage.get_all() == expected_storage.get_all(), result
+
+    code = [('LOADC', 1.0),
+            ('SET', 'x'),
+            ('LOADC', 1.0),
+            ('SET', 'y'),
+            ('LOADV', 'x'),
+            ('LOADV', 'a'),
+            ('MUL', None),
+            ('SET', 't'),
+            ('LOADC', 1.0),
+            ('LOADV', 'x'),
+            ('LOADV', 'y'),
+            ('SUB', None),
+            ('DIV', None),
+            ('SET', 'z')]
+    same, last_error = run(code, ['x', 'y', 'a', 't', 'z'], {'a': 5.0})
+    success = same and last_error == 3
+
+    same, last_error = run([('XXX', 1.0), ('SET', 'x')], [])
+    success = success and same and last_error == 1
+
+    same, last_error = run([('LOADC', 1.0), ('SET', 'x')], [])
+    success = success and same and last_error == 2
+
+    same, last_error = run([('LOADC', 2.0), ('SET', 'x'),
+                            ('LOADC', 1.0), ('LOADC', 0.0), ('DIV', None),
+                            ('LOADC', 1.0), ('SET', 'y'),
+                            ('SET', 'z')], ['x', 'y', 'z'])
+    success = success and same and last_error == 3
+
+    code = [('LOADC', 2.0),
+            ('SET', 'x'),
+            ('LOADC', 1.0),
+            ('SET', 'y'),
+            ('LOADC', 1.0),
+            ('LOADV', 'x'),
+            ('LOADV', 'y'),
+            ('SUB', None),
+            ('DIV', None),
+            ('SET', 'z')]
+    storage = Storage()
+    for variable in ('x', 'y', 'z'):
+        storage.add(variable)
+    interpreter = CompiledInterpreter(code, storage)
+    last_error = interpreter.execute()
+    success = success and last_error == 0 and interpreter.get_value('z') == 1.0
+    last_error = interpreter.execute()
+    success = success and last_error == 0 and interpreter.get_value('z') == 1.0
+
+    print("Success =", success)
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для виконання коду, який згенеровано генератором коду,
+без перевірки коду помилки після кожної команди.
+
+FastInterpreter.run виконує команди в одному циклі та повідомляє
+про помилку винятком ExecutionError, що містить номер команди.
+Змінні читаються та записуються безпосередньо у словнику пам'яті
+storage.Storage (get_all), тому на кожну команду немає запису _last_error.
+Словник OverlayStorage.get_all записує значення так само, як set,
+тому пам'ять сценарію зберігає лише зміни.
+Цикл не рахує номери команд: номер команди, на якій виникла помилка,
+обчислюється за кількістю команд, що залишились в ітераторі.
+
+FastInterpreter.execute перетворює виняток у код помилки з ERRORS,
+тому його можна використовувати замість Interpreter.
+"""
+from operator import length_hint
+
+from storage import Storage
+from interpreter import Interpreter, ERRORS
+
+
+class ExecutionError(Exception):
+    """
+    Помилка виконання програми
+    """
+    code = 0        # код помилки з ERRORS
+
+    def __init__(self, index):
+        Exception.__init__(self, "{} (команда {})".format(ERRORS[self.code],
+                                                          index))
+        self.index = index          # номер команди, на якій виникла помилка
+
+
+class InvalidCommandError(ExecutionError):
+    code = 1
+
+
+class MissingVariableError(ExecutionError):
+    code = 2
+
+
+class DivisionByZeroError(ExecutionError):
+    code = 3
+
+
+class FastInterpreter(Interpreter):
+    """
+    Інтерпретатор, що повідомляє про помилки винятками.
+    Використовує пам'ять storage.Storage
+    """
+    def __init__(self, code, storage):
+        Interpreter.__init__(self, code, storage)
+        self._error_index = None    # номер команди з помилкою або None
+
+    def run(self):
+        """
+        Метод виконує код програми, записаний у self._code.
+        Якщо виникла помилка, то піднімає виняток ExecutionError
+        :return: None
+        """
+        code = self._code
+        storage = self._storage
+        values = storage.get_all()
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        commands = iter(code)
+        try:
+            for command, operand in commands:
+                if command == "LOADV":
+                    value = values[operand]
+                    if value is None:
+                        storage.input_var(operand)
+                        value = values[operand]
+                    push(value)
+                elif command == "LOADC":
+                    push(operand)
+                elif command == "ADD":
+                    second = pop()
+                    push(pop() + second)
+                elif command == "MUL":
+                    second = pop()
+                    push(pop() * second)
+                elif command == "SUB":
+                    second = pop()
+                    push(pop() - second)
+                elif command == "DIV":
+                    second = pop()
+                    push(pop() / second)
+                elif command == "SET":
+                    if operand not in values:
+                        raise MissingVariableError(_index(code, commands))
+                    values[operand] = pop()
+                else:
+                    raise InvalidCommandError(_index(code, commands))
+        except KeyError:
+            raise MissingVariableError(_index(code, commands)) from None
+        except ZeroDivisionError:
+            raise DivisionByZeroError(_index(code, commands)) from None
+
+    def execute(self):
+        """
+        Метод виконує код програми, записаний у self._code.
+        Повертає код останньої помилки або 0, якщо помилки немає.
+        Якщо є помилка, то показує її.
+        :return: код останньої помилки або 0, якщо помилки немає
+        """
+        self._last_error = 0
+        self._error_index = None
+        try:
+            self.run()
+        except ExecutionError as e:
+            self._last_error = e.code
+            self._error_index = e.index
+            print("Помилка виконання: {}".format(ERRORS[self._last_error]))
+        return self._last_error
+
+    def get_error_index(self):
+        """
+        Метод повертає номер команди, на якій виникла помилка
+        під час останнього виконання, або None, якщо помилки не було
+        :return: номер команди або None
+        """
+        return self._error_index
+
+
+def _index(code, commands):
+    """
+    Функція повертає номер команди, яку щойно взято з ітератора commands
+    :param code: список команд
+    :param commands: ітератор списку команд
+    :return: номер команди
+    """
+    return len(code) - length_hint(commands) - 1
+
+
+if __name__ == "__main__":
+    code = [('LOADC', 1.0),
+            ('SET', 'x'),
+            ('LOADC', 1.0),
+            ('SET', 'y'),
+            ('LOADV', 'x'),
+            ('LOADV', 'a'),
+            ('MUL', None),
+            ('SET', 't'),
+            ('LOADC', 1.0),
+            ('LOADV', 'x'),
+            ('LOADV', 'y'),
+            ('SUB', None),
+            ('DIV', None),
+            ('SET', 'z')]
+    storage = Storage()
+    for variable in ('x', 'y', 'a', 't', 'z'):
+        storage.add(variable)
+    storage.set('a', 5.0)
+    interpreter = FastInterpreter(code, storage)
+    success = interpreter.execute() == 3 and \
+        interpreter.get_error_index() == 12 and \
+        interpreter.get_value('t') == 5.0 and interpreter.get_value('z') is None
+
+    try:
+        FastInterpreter(code, storage).run()
+        success = False
+    except DivisionByZeroError as e:
+        success = success and e.index == 12 and e.code == 3
+
+    interpreter = FastInterpreter([('XXX', 1.0), ('SET', 'x')], Storage())
+    success = success and interpreter.execute() == 1 and \
+        interpreter.get_error_index() == 0
+    interpreter = FastInterpreter([('LOADC', 1.0), ('SET', 'x')], Storage())
+    success = success and interpreter.execute() == 2 and \
+        interpreter.get_error_index() == 1
+    interpreter = FastInterpreter([('LOADV', 'x'), ('SET', 'x')], Storage())
+    success = success and interpreter.execute() == 2 and \
+        interpreter.get_error_index() == 0
+
+    code = [('LOADC', 2.0),
+            ('SET', 'x'),
+            ('LOADC', 1.0),
+            ('SET', 'y'),
+            ('LOADC', 1.0),
+            ('LOADV', 'x'),
+            ('LOADV', 'y'),
+            ('SUB', None),
+            ('DIV', None),
+            ('SET', 'z')]
+    storage = Storage()
+    for variable in ('x', 'y', 'z'):
+        storage.add(variable)
+    interpreter = FastInterpreter(code, storage)
+    success = success and interpreter.execute() == 0 and \
+        interpreter.get_error_index() is None and \
+        interpreter.get_value('z') == 1.0
+
+    print("Success =", success)
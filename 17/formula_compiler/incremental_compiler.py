@@ -0,0 +1,308 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для повторної генерації коду програми після зміни
+частини її рядків.
+
+IncrementalCompiler зберігає для кожного рядка програми фрагмент:
+код рядка, текст помилки та змінні рядка у порядку їх додавання до пам'яті.
+Код рядка залежить лише від тексту рядка, тому під час наступної генерації
+рядки, що збігаються на початку та в кінці програми, не розбираються.
+Рядки змінної частини шукаються серед старих рядків цієї частини за текстом
+(це враховує вставку, видалення та переміщення рядків),
+і лише нові рядки розбираються генератором коду.
+Як і у CodeGenerator.generate_code, рядки розбираються лише до першого
+рядка з помилкою: фрагменти рядків після нього створюються тоді,
+коли помилку виправлено.
+
+Активні рядки - це рядки до першого рядка з помилкою. Код активних рядків
+зберігається одним списком, а кінці кодів рядків у цьому списку
+(накопичені довжини) обчислюються лише до першого зміненого рядка
+і перераховуються від місця останньої зміни, коли потрібні далі.
+Для кожної змінної рахується кількість активних рядків, у яких
+вона є, тому змінна додається до пам'яті або видаляється з неї лише
+під час зміни рядків, а значення інших змінних не змінюються.
+Отже, цикли Python виконуються лише по змінених рядках (та рядках,
+які стали активними або перестали бути активними). Від довжини програми
+залежать лише порівняння старих та нових рядків, копія списку рядків
+і вставка у списки рядків, фрагментів та коду (зсув хвоста списку) -
+усе це виконується у C, - а також, якщо наступна зміна нижче
+попередньої, перерахунок кінців кодів рядків між ними.
+
+Результат такий самий, як у CodeGenerator.generate_code:
+код до першого рядка з помилкою та текст цієї помилки. Код повертається
+без копіювання, тому його не можна змінювати, а наступний виклик
+generate_code змінює його. Пам'ять містить ті самі змінні, що й після
+generate_code; після першої генерації вони у тому ж порядку, а далі
+нові змінні додаються в кінець. На відміну від generate_code,
+значення змінних, що залишились у програмі, зберігаються.
+"""
+from itertools import compress, count
+from operator import ne
+
+from storage import Storage
+from code_generator import CodeGenerator
+
+
+def _common_length(first, second, limit):
+    """
+    Функція повертає кількість однакових елементів на початку
+    ітераторів first та second, не більшу за limit.
+    Елементи порівнюються без циклу Python (map та compress)
+    :param first: ітератор
+    :param second: ітератор
+    :param limit: найбільша кількість
+    :return: кількість однакових елементів
+    """
+    return min(next(compress(count(), map(ne, first, second)), limit), limit)
+
+
+class IncrementalCompiler:
+    def __init__(self, storage, parser="recursive"):
+        self._storage = storage         # пам'ять
+        self._line_storage = Storage()  # пам'ять для змінних одного рядка
+        self._generator = CodeGenerator([], self._line_storage, parser)
+                                        # генератор коду окремих рядків
+        self._lines = []                # рядки програми
+        self._fragments = []            # фрагменти рядків - кортежі
+                                        # (<код>, <помилка>, <змінні>)
+                                        # або None, якщо рядок не розібрано
+        self._active = 0                # кількість активних рядків (номер
+                                        # першого рядка з помилкою)
+        self._code = []                 # код активних рядків
+        self._ends = []                 # кінці кодів рядків у self._code
+        self._valid = 0                 # кількість правильних кінців
+        self._counts = {}               # словник змінна - кількість
+                                        # активних рядків з цією змінною
+        self._generated = 0             # кількість розібраних рядків
+        self._reused = 0                # кількість збережених рядків
+
+    def generate_code(self, program_lines):
+        """
+        Метод генерує код за списком рядків програми program_lines,
+        розбираючи лише рядки, яких не було у попередній програмі.
+        Повертає код та текст помилки так само, як CodeGenerator.generate_code
+        Побічний ефект: змінює склад змінних пам'яті
+        :param program_lines: список рядків програми
+        :return: список команд - кортежів (<код_команди>, <операнд>)
+        :return: текст помилки
+        """
+        program_lines = list(program_lines)
+        old_lines = self._lines
+        limit = min(len(old_lines), len(program_lines))
+        prefix = _common_length(old_lines, program_lines, limit)
+        suffix = _common_length(reversed(old_lines), reversed(program_lines),
+                                limit - prefix)
+        self._reused += prefix + suffix
+
+        old_end = len(old_lines) - suffix
+        new_end = len(program_lines) - suffix
+        known = {line: fragment for line, fragment
+                 in zip(old_lines[prefix:old_end],
+                        self._fragments[prefix:old_end])
+                 if fragment is not None}
+        fragments = [known.get(line) for line in program_lines[prefix:new_end]]
+        self._reused += sum(1 for fragment in fragments
+                            if fragment is not None)
+        old_active = self._active
+        self._lines = program_lines
+        if old_active < prefix:
+            self._fragments[prefix:old_end] = fragments
+            self._ends[prefix:old_end] = [0] * len(fragments)
+            return self._result()
+
+        start = self._end(prefix - 1)
+        removed = self._fragments[prefix:min(old_end, old_active)]
+        length = sum(len(fragment[0]) for fragment in removed)
+        self._fragments[prefix:old_end] = fragments
+        self._ends[prefix:old_end] = [0] * len(fragments)
+        self._valid = prefix
+        shift = new_end - old_end
+
+        self._active = prefix
+        code = self._activate(new_end, start)
+        for fragment in removed:
+            self._release(fragment[2])
+        if self._active < new_end:
+            for index in range(old_end, old_active):
+                self._release(self._fragments[index + shift][2])
+            self._code[start:] = code
+        elif old_active >= old_end:
+            self._code[start:start + length] = code
+            self._active = old_active + shift
+        else:
+            self._code[start:] = code
+            self._code += self._activate(len(program_lines), len(self._code))
+        return self._result()
+
+    def get_stats(self):
+        """
+        Метод повертає кількість розібраних та збережених рядків
+        за усі виклики generate_code
+        :return: словник з ключами generated, reused
+        """
+        return {"generated": self._generated,
+                "reused": self._reused}
+
+    def _generate_line(self, line):
+        """
+        Метод генерує фрагмент рядка програми
+        :param line: рядок програми
+        :return: кортеж (<код>, <помилка>, <змінні>)
+        """
+        self._line_storage.clear()
+        code, error = self._generator._generate_line_code(line)
+        return tuple(code), error, tuple(self._line_storage.get_all())
+
+    def _activate(self, end, offset):
+        """
+        Метод робить активними рядки, починаючи з self._active,
+        до рядка end або до першого рядка з помилкою, розбираючи
+        рядки, що ще не розібрані, та додаючи їх змінні до пам'яті.
+        Кінці кодів рядків обчислюються, якщо правильні кінці
+        закінчуються на рядку self._active
+        :param end: номер рядка після останнього
+        :param offset: кінець коду рядків перед рядком self._active
+        :return: список команд активованих рядків
+        """
+        code = []
+        index = self._active
+        track = self._valid == index
+        while index < end:
+            fragment = self._fragments[index]
+            if fragment is None:
+                fragment = self._generate_line(self._lines[index])
+                self._fragments[index] = fragment
+                self._generated += 1
+            if fragment[1]:
+                break
+            code += fragment[0]
+            if track:
+                self._ends[index] = offset + len(code)
+            for variable in fragment[2]:
+                count = self._counts.get(variable, 0)
+                if not count:
+                    self._storage.add(variable)
+                self._counts[variable] = count + 1
+            index += 1
+        self._active = index
+        if track:
+            self._valid = index
+        return code
+
+    def _release(self, variables):
+        """
+        Метод зменшує кількість активних рядків зі змінними variables
+        і видаляє з пам'яті змінні, яких більше немає в активних рядках
+        :param variables: змінні рядка
+        :return: None
+        """
+        for variable in variables:
+            count = self._counts[variable] - 1
+            if count:
+                self._counts[variable] = count
+            else:
+                del self._counts[variable]
+                self._storage.remove(variable)
+
+    def _end(self, index):
+        """
+        Метод повертає кінець коду активного рядка index у self._code,
+        перераховуючи кінці рядків від останнього правильного
+        :param index: номер рядка (-1 - перед першим рядком)
+        :return: номер команди після коду рядка
+        """
+        ends = self._ends
+        while self._valid <= index:
+            previous = ends[self._valid - 1] if self._valid else 0
+            ends[self._valid] = previous + len(self._fragments[self._valid][0])
+            self._valid += 1
+        return ends[index] if index >= 0 else 0
+
+    def _result(self):
+        """
+        Метод повертає код активних рядків та текст помилки
+        першого рядка з помилкою
+        :return: список команд - кортежів (<код_команди>, <операнд>)
+        :return: текст помилки
+        """
+        error = ""
+        if self._active < len(self._lines):
+            error = self._fragments[self._active][1]
+        return self._code, error
+
+
+if __name__ == "__main__":
+    import random
+
+    def same(compiler, storage, lines):
+        expected_storage = Storage()
+        expected = CodeGenerator(lines, expected_storage).generate_code()
+        return compiler.generate_code(lines) == expected and \
+            set(storage.get_all()) == set(expected_storage.get_all())
+
+    lines = ["x = 1",
+             "z = (((a)))",
+             "a = b + c * (d - e)",
+             "y = (2 - 1) * (x345 + 3 * d) / 234.5 - z",
+             "w = a - b - c / d / e * f + g"]
+    storage = Storage()
+    compiler = IncrementalCompiler(storage)
+    expected_storage = Storage()
+    CodeGenerator(lines, expected_storage).generate_code()
+    success = same(compiler, storage, lines) and \
+        list(storage.get_all()) == list(expected_storage.get_all()) and \
+        compiler.get_stats() == {"generated": 5, "reused": 0}
+
+    storage.set("b", 2.0)
+    lines[2] = "a = b * q"
+    success = success and same(compiler, storage, lines) and \
+        compiler.get_stats() == {"generated": 6, "reused": 4} and \
+        storage.get("b") == 2.0 and list(storage.get_all())[-1] == "q"
+
+    lines.insert(1, "y = (2 - 1")
+    success = success and same(compiler, storage, lines) and \
+        compiler.get_stats() == {"generated": 7, "reused": 9}
+
+    del lines[1]
+    lines.insert(0, "")
+    lines.append("v = a) + (b")
+    lines[3], lines[4] = lines[4], lines[3]
+    success = success and same(compiler, storage, lines) and \
+        compiler.get_stats()["generated"] == 9
+
+    success = success and same(compiler, storage, ["x = 2"])
+
+    storage = Storage()
+    compiler = IncrementalCompiler(storage)
+    success = success and \
+        compiler.generate_code(["z = a=_c-b1/((", "z = 1.2.3"]) == \
+        ([], "Неправильно розставлені дужки") and \
+        compiler.get_stats()["generated"] == 1
+
+    storage = Storage()
+    IncrementalCompiler(storage).generate_code(["x = a + b"])
+    storage = storage.snapshot().fork()
+    compiler = IncrementalCompiler(storage)
+    success = success and same(compiler, storage, ["x = a + b"]) and \
+        same(compiler, storage, ["x = a"]) and not storage.is_in("b") and \
+        storage.get_removed() == {"b"}
+
+    choices = ["x = a + 1", "y = x * b", "a = (c", "z = y / x - a",
+               "b = 2 * * 3", "", "c = d", "x = x + 1"]
+    generator = random.Random(1)
+    storage = Storage()
+    compiler = IncrementalCompiler(storage)
+    lines = []
+    for _ in range(300):
+        position = generator.randint(0, len(lines))
+        action = generator.randrange(3)
+        if action == 0 or not lines:
+            lines.insert(position, generator.choice(choices))
+        elif action == 1:
+            del lines[min(position, len(lines) - 1)]
+        else:
+            lines[min(position, len(lines) - 1)] = generator.choice(choices)
+        success = success and same(compiler, storage, lines)
+
+    print("Success =", success)
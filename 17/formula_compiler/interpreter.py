@@ -29,7 +29,8 @@ from storage import Storage
 ERRORS = {0: "",
           1: "Недопустима команда",
           2: "Змінна не існує",
-          3: "Ділення на 0"}
+          3: "Ділення на 0",
+          4: "Недостатньо значень у стеку"}
 
 
 class Interpreter():
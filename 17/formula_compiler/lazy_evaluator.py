@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для обчислення лише тих змінних програми,
+значення яких потрібні (обчислення за запитом).
+
+Функція slice_code будує зворотний зріз коду: розбиває код на присвоєння
+(команди до SET включно) і, проходячи їх від кінця, залишає присвоєння
+потрібної змінної, після чого потрібними стають змінні, які воно читає
+(до попереднього присвоєння кожної з них). Інші присвоєння пропускаються.
+
+LazyInterpreter.evaluate виконує зріз коду для заданих змінних,
+а get_value обчислює змінну, якщо її значення ще не обчислено.
+Перед першим обчисленням запам'ятовуються значення вхідних змінних
+коду (як Spreadsheet._inputs), і кожен зріз виконується з цими
+значеннями, а після виконання у пам'ять повертаються значення раніше
+обчислених змінних. Тому результат не залежить від порядку запитів
+і дорівнює результату виконання усього коду.
+Виконуються лише потрібні присвоєння, тому помилки у пропущених
+присвоєннях не виявляються, а змінні, що не запитані, можуть мати
+проміжні значення. Невизначена вхідна змінна вводиться, як і в
+Interpreter, коли її вперше читає виконана команда, тому команди після
+помилки нічого не вводять.
+Метод get_report повідомляє, скільки рядків (присвоєнь) пропущено.
+"""
+from storage import Storage
+from interpreter import Interpreter
+from bindings import input_variables
+
+
+def slice_code(code, outputs):
+    """
+    Функція повертає команди присвоєнь, потрібних для обчислення
+    змінних outputs, у порядку коду, та кількість пропущених присвоєнь.
+    Команди після останнього SET не потрібні для жодної змінної
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :param outputs: потрібні змінні
+    :return: список команд
+    :return: кількість пропущених присвоєнь
+    """
+    statements = []     # присвоєння - кортежі (<початок>, <кінець>,
+                        # <змінна>, <змінні, які читає присвоєння>)
+    start = 0
+    reads = []
+    for position, (command, operand) in enumerate(code):
+        if command == "LOADV":
+            reads.append(operand)
+        elif command == "SET":
+            statements.append((start, position + 1, operand, reads))
+            start = position + 1
+            reads = []
+
+    needed = set(outputs)
+    kept = []
+    for start, end, variable, reads in reversed(statements):
+        if variable in needed:
+            needed.discard(variable)
+            needed.update(reads)
+            kept.append((start, end))
+    sliced = [command for start, end in reversed(kept)
+              for command in code[start:end]]
+    return sliced, len(statements) - len(kept)
+
+
+class LazyInterpreter(Interpreter):
+    def __init__(self, code, storage):
+        Interpreter.__init__(self, code, storage)
+        self._assigned = {command[1] for command in code
+                          if command[0] == "SET"}
+                                    # змінні, що присвоюються у коді
+        self._code_inputs = input_variables(code)
+                                    # вхідні змінні коду
+        self._slices = {}           # словник множина змінних -
+                                    # (<зріз коду>, <пропущені присвоєння>,
+                                    # <вхідні змінні зрізу>)
+        self._inputs = None         # вхідні значення змінних до першого
+                                    # обчислення або None
+        self._reading = set()       # невизначені вхідні змінні, які ще
+                                    # не прочитані під час виконання
+        self._evaluated = set()     # змінні, значення яких обчислено
+        self._values = {}           # обчислені значення змінних
+        self._statements = sum(1 for command in code if command[0] == "SET")
+                                    # кількість присвоєнь коду
+        self._skipped = 0           # кількість пропущених присвоєнь
+                                    # під час останнього обчислення
+        self._instructions = 0      # кількість команд зрізу
+                                    # під час останнього обчислення
+
+    def _loadv(self, variable):
+        """
+        Метод завантажує значення змінної у стек, як Interpreter._loadv.
+        Якщо змінна - невизначена вхідна змінна, то запам'ятовує
+        введене значення як її вхідне значення
+        :param variable: ім'я змінної
+        :return: None
+        """
+        Interpreter._loadv(self, variable)
+        if variable in self._reading and not self._last_error:
+            self._reading.discard(variable)
+            self._inputs[variable] = self._stack[-1]
+
+    def _run(self, code, inputs, outputs):
+        """
+        Метод виконує код code так, ніби виконується увесь код програми:
+        спочатку встановлює вхідні змінні inputs рівними їх значенням
+        до першого обчислення, а після виконання повертає у пам'ять
+        значення раніше обчислених змінних, крім outputs.
+        Невизначена вхідна змінна залишається невизначеною і вводиться,
+        як і в Interpreter, лише коли її вперше читає виконана команда,
+        а введене значення запам'ятовується (_loadv).
+        Якщо помилки немає, то запам'ятовує значення змінних outputs,
+        інакше вважає їх не обчисленими
+        :param code: список команд - кортежів (<код_команди>, <операнд>)
+        :param inputs: вхідні змінні коду code
+        :param outputs: змінні, які обчислює код code
+        :return: код помилки або 0, якщо помилки немає
+        """
+        storage = self._storage
+        if self._inputs is None:
+            self._inputs = {variable: storage.get(variable)
+                            for variable in self._code_inputs
+                            if storage.is_in(variable)}
+        for variable in inputs:
+            if variable in self._inputs:
+                value = self._inputs[variable]
+                storage.set(variable, value)
+                if value is None:
+                    self._reading.add(variable)
+
+        saved = self._code
+        self._code = code
+        try:
+            self._last_error = Interpreter.execute(self)
+        finally:
+            self._code = saved
+            self._reading.clear()
+
+        for variable in self._evaluated - outputs:
+            storage.set(variable, self._values[variable])
+        if self._last_error:
+            self._evaluated -= outputs
+        else:
+            for variable in outputs:
+                self._values[variable] = storage.get(variable)
+            self._evaluated |= outputs
+        return self._last_error
+
+    def evaluate(self, outputs):
+        """
+        Метод виконує лише присвоєння, потрібні для обчислення
+        змінних outputs.
+        Повертає код помилки або 0, якщо помилки немає.
+        Якщо є помилка, то показує її.
+        :param outputs: потрібні змінні
+        :return: код помилки або 0, якщо помилки немає
+        """
+        key = frozenset(outputs)
+        if key not in self._slices:
+            sliced, skipped = slice_code(self._code, key)
+            self._slices[key] = (sliced, skipped, input_variables(sliced))
+        sliced, self._skipped, inputs = self._slices[key]
+        self._instructions = len(sliced)
+        return self._run(sliced, inputs, key & self._assigned)
+
+    def execute(self):
+        """
+        Метод виконує увесь код програми так само, як Interpreter.execute,
+        з вхідними значеннями змінних до першого обчислення
+        :return: код помилки або 0, якщо помилки немає
+        """
+        self._skipped = 0
+        self._instructions = len(self._code)
+        return self._run(self._code, self._code_inputs, self._assigned)
+
+    def get_value(self, variable):
+        """
+        Метод повертає значення зміної variable з пам'яті, спочатку
+        обчислюючи його, якщо змінна присвоюється у коді, а її значення
+        ще не обчислено.
+        Якщо змінної у пам'яті немає, вона невизначена або під час
+        обчислення виникла помилка, повертає None
+        :param variable: ім'я змінної
+        :return: float (or None)
+        """
+        if variable in self._assigned and variable not in self._evaluated:
+            if self.evaluate([variable]):
+                return None
+        return Interpreter.get_value(self, variable)
+
+    def set_input(self, variable, value):
+        """
+        Метод змінює вхідне значення змінної та позначає усі обчислені
+        значення як застарілі. Інші вхідні значення не змінюються
+        :param variable: ім'я змінної
+        :param value: нове значення
+        :return: None
+        """
+        self._storage.set(variable, value)
+        if self._inputs is not None and variable in self._inputs:
+            self._inputs[variable] = value
+        self._evaluated.clear()
+        self._values.clear()
+
+    def invalidate(self):
+        """
+        Метод позначає усі обчислені значення як застарілі, а вхідні
+        значення змінних знову читаються з пам'яті під час наступного
+        обчислення, наприклад, після зміни вхідних змінних у пам'яті.
+        Змінна, яка є вхідною і присвоюється у коді, матиме значення,
+        що залишилось у пам'яті, тому таку змінну слід змінювати set_input
+        :return: None
+        """
+        self._inputs = None
+        self._evaluated.clear()
+        self._values.clear()
+
+    def get_report(self):
+        """
+        Метод повертає опис останнього обчислення
+        :return: словник з ключами statements (кількість присвоєнь коду),
+                 executed (кількість виконаних присвоєнь),
+                 skipped (кількість пропущених присвоєнь),
+                 instructions (кількість команд, що виконувались)
+        """
+        return {"statements": self._statements,
+                "executed": self._statements - self._skipped,
+                "skipped": self._skipped,
+                "instructions": self._instructions}
+
+
+if __name__ == "__main__":
+    from code_generator import CodeGenerator
+
+    lines = ["x = 1",
+             "y = a + x",
+             "u = b / (x - 1)",
+             "x = y * 2",
+             "z = x + y",
+             "w = z * c"]
+    storage = Storage()
+    code, error = CodeGenerator(lines, storage).generate_code()
+    storage.set("a", 2.0)
+    storage.set("b", 1.0)
+    interpreter = LazyInterpreter(code, storage)
+    success = interpreter.get_value("z") == 9.0 and \
+        interpreter.get_report() == {"statements": 6, "executed": 4,
+                                     "skipped": 2, "instructions": 14} and \
+        interpreter.get_value("u") is None
+    success = success and interpreter.execute() == 3 and \
+        interpreter.get_report()["skipped"] == 0
+
+    sliced, skipped = slice_code(code, ["y"])
+    success = success and skipped == 4 and sliced == code[:6]
+    sliced, skipped = slice_code(code, ["a", "q"])
+    success = success and sliced == [] and skipped == 6
+
+    storage.set("a", 3.0)
+    interpreter.invalidate()
+    success = success and interpreter.get_value("z") == 12.0 and \
+        interpreter.get_value("a") == 3.0
+
+    storage = Storage()
+    CodeGenerator(lines, storage).generate_code()
+    storage.set("a", 2.0)
+    storage.set("c", 0.5)
+    interpreter = LazyInterpreter(code, storage)
+    success = success and interpreter.evaluate(["w", "y"]) == 0 and \
+        interpreter.get_value("w") == 4.5 and \
+        interpreter.get_report()["skipped"] == 1 and \
+        storage.get("u") is None
+
+    lines = ["y = x + 1", "x = 5", "t = x * y", "y = y + x"]
+    storage = Storage()
+    code, error = CodeGenerator(lines, storage).generate_code()
+    storage.set("x", 1.0)
+    expected = Storage()
+    CodeGenerator(lines, expected).generate_code()
+    expected.set("x", 1.0)
+    Interpreter(code, expected).execute()
+    expected = expected.get_all()
+    for order in (["x", "y", "t"], ["t", "x", "y"], ["y", "t", "x"]):
+        for variable in ("x", "y", "t"):
+            storage.set(variable, None)
+        storage.set("x", 1.0)
+        interpreter = LazyInterpreter(code, storage)
+        success = success and \
+            [interpreter.get_value(variable) for variable in order] == \
+            [expected[variable] for variable in order]
+    success = success and storage.get_all() == expected
+    interpreter.set_input("x", 2.0)
+    success = success and interpreter.get_value("x") == 5.0 and \
+        interpreter.get_value("y") == 8.0 and \
+        interpreter.execute() == 0 and storage.get("t") == 15.0
+
+    lines = ["y = 1 / a", "c = c + 1"]
+    storage = Storage()
+    code, error = CodeGenerator(lines, storage).generate_code()
+    storage.set("a", 0.0)
+    interpreter = LazyInterpreter(code, storage)
+    success = success and interpreter.execute() == 3 and \
+        storage.get("c") is None and interpreter.get_value("c") == 3.0 and \
+        interpreter.execute() == 3 and storage.get("c") == 2.0 and \
+        interpreter.get_value("c") == 3.0
+
+    print("Success =", success)
@@ -14,6 +14,28 @@ interpreter
 from storage import Storage
 from code_generator import CodeGenerator
 from interpreter import Interpreter, ERRORS
+from code_cache import CodeCache
+from register_interpreter import RegisterInterpreter
+from binary_code import BinaryInterpreter
+from slot_storage import SlotStorage, SlotInterpreter
+from fast_interpreter import FastInterpreter
+from spreadsheet import Spreadsheet
+from profiler import ProfilingInterpreter
+from bindings import Bindings, bind
+from stack_depth import PreallocatedInterpreter
+from superinstructions import SuperInterpreter
+from optimizer import fold_constants
+
+# способи виконання програми: кортежі (<інтерпретатор>, <пам'ять>)
+BACKENDS = {"stack": (Interpreter, Storage),
+            "register": (RegisterInterpreter, Storage),
+            "binary": (BinaryInterpreter, Storage),
+            "slot": (SlotInterpreter, SlotStorage),
+            "fast": (FastInterpreter, Storage),
+            "spreadsheet": (Spreadsheet, Storage),
+            "profile": (ProfilingInterpreter, Storage),
+            "preallocated": (PreallocatedInterpreter, Storage),
+            "super": (SuperInterpreter, Storage)}
 
 
 def load_program(filename):
@@ -39,22 +61,53 @@ def print_program(program_lines):
         print(line)
 
 
-def execute_program(program_lines):
+def execute_program(program_lines, cache=None, backend="stack",
+                    bindings=None, optimize=False):
     """
     Функція виконує програму та показує стан пам'яті після виконання
+    Якщо задано кеш коду cache (code_cache.CodeCache), то код програми
+    береться з кешу, а генерується лише для нової програми
     :param program_lines: список рядків програми
+    :param cache: кеш коду або None
+    :param backend: інтерпретатор з BACKENDS: "stack" - стековий,
+                    "register" - регістровий, "binary" - стековий
+                    над компактним записом коду, "slot" - стековий
+                    зі змінними у слотах пам'яті SlotStorage, "fast" -
+                    стековий з помилками-винятками, "spreadsheet" -
+                    обчислення присвоєнь за графом залежностей,
+                    "profile" - стековий з профілюванням, "preallocated" -
+                    стековий зі стеком найбільшої глибини коду, "super" -
+                    стековий з суперкомандами
+    :param bindings: значення вхідних змінних (bindings.Bindings) або None.
+                     Якщо задано, то значення встановлюються у пам'ять
+                     до виконання, і змінні з клавіатури не вводяться
+    :param optimize: чи обчислювати константні вирази коду до виконання
+                     (optimizer.fold_constants) та показувати кількість
+                     вилучених команд
     :return: None
     """
     print_program(program_lines)
 
-    storage = Storage()
-    cd = CodeGenerator(program_lines, storage)
-    code, error = cd.generate_code()
+    interpreter_class, storage_class = BACKENDS[backend]
+    storage = storage_class()
+    if cache is not None:
+        code, error = cache.generate_code(program_lines, storage)
+    else:
+        cd = CodeGenerator(program_lines, storage)
+        code, error = cd.generate_code()
     if error:
         print("Помилка при генерації коду: {}".format(error))
         return None, error
-
-    interpreter = Interpreter(code, storage)
+    if bindings is not None:
+        error = bind(code, storage, bindings)
+        if error:
+            print("Помилка при заданні значень змінних: {}".format(error))
+            return None, error
+    if optimize:
+        code, eliminated = fold_constants(code)
+        print("Оптимізація: вилучено команд {}".format(eliminated))
+
+    interpreter = interpreter_class(code, storage)
     last_error = interpreter.execute()
     if last_error:
         error = ERRORS[last_error]
@@ -80,4 +133,45 @@ if __name__ == '__main__':
     z = interpreter.get_value('z')
     success = success and error == "" and z == 27.0
 
+    print("\nprogram3 (cache)")
+    cache = CodeCache()
+    for _ in range(2):
+        interpreter, error = execute_program(load_program('program3.txt'),
+                                             cache)
+        z = interpreter.get_value('z')
+        success = success and error == "" and z == 27.0
+    success = success and cache.get_stats()["hits"] == 1
+
+    for backend in ("register", "binary", "slot", "fast", "spreadsheet",
+                    "preallocated", "super", "profile"):
+        print("\nprogram2, program3 ({})".format(backend))
+        interpreter, error = execute_program(load_program('program2.txt'),
+                                             backend=backend)
+        success = success and error == "Ділення на 0"
+        interpreter, error = execute_program(load_program('program3.txt'),
+                                             backend=backend)
+        z = interpreter.get_value('z')
+        success = success and error == "" and z == 27.0
+
+    success = success and interpreter.get_profile()["runs"] == 1
+
+    print("\nprogram4 (optimize)")
+    program = ["x = 2 * 3 - 1", "y = x * 1 + 0", "z = (x + 4 / 2) / 2"]
+    for backend in ("stack", "slot"):
+        interpreter, error = execute_program(program, backend=backend,
+                                             optimize=True)
+        success = success and error == "" and \
+            interpreter.get_value("y") == 5.0 and \
+            interpreter.get_value("z") == 3.5
+
+    print("\nprogram2 (bindings)")
+    interpreter, error = execute_program(load_program('program2.txt'),
+                                         bindings=Bindings(["b"], [1.0]))
+    success = success and interpreter is None and \
+        error == "Не задано значення змінних: a"
+    interpreter, error = execute_program(load_program('program2.txt'),
+                                         bindings=Bindings(["a"], [3.0]))
+    success = success and error == "Ділення на 0" and \
+        interpreter.get_value("u2") == -5.0
+
     print("\nSuccess =", success)
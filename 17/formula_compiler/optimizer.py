@@ -0,0 +1,630 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для оптимізації коду, який згенеровано генератором коду.
+Кожна функція оптимізації отримує список команд
+(<код_команди>, <операнд>) і повертає новий список команд,
+виконання якого дає той самий результат, та кількість вилучених команд.
+
+Функція fold_constants:
+- обчислює вирази, що складаються лише з констант
+  (LOADC 2, LOADC 1, SUB -> LOADC 1.0);
+- вилучає тотожні операції x + 0, 0 + x, x - 0, x * 1, 1 * x, x / 1
+  (єдина відмінність - для x = -0.0 вираз x + 0 дорівнював би 0.0);
+- замінює ділення на константу множенням на обернене число.
+Ділення на константу 0 залишається у коді, щоб помилка виникла
+під час виконання.
+
+Функція remove_dead_stores вилучає присвоєння, значення яких
+не читається до наступного присвоєння тій самій змінній.
+Присвоєння залишається, якщо обчислення його виразу може дати помилку
+(ділення не на ненульову константу) або ввести значення змінної,
+яка ще не мала значення, а також якщо між ним та наступним присвоєнням
+є вираз, що може дати помилку (тоді наступне присвоєння
+може не виконатись).
+
+Функція eliminate_common_subexpressions знаходить однакові підвирази
+у всій програмі (з урахуванням того, що a + b та b + a однакові),
+та замінює повторне обчислення завантаженням змінної, яка вже містить
+значення підвиразу. Якщо такої змінної немає, а підвираз повторюється
+достатньо разів, то його значення зберігається у тимчасовій змінній
+TEMP_PREFIX<номер>, яка додається до пам'яті. Номери нових тимчасових
+змінних більші за номери тимчасових змінних, що вже є у коді або пам'яті,
+тому функцію можна повторно застосовувати до оптимізованого коду.
+Ці функції працюють з кодом, що складається з присвоєнь
+(як код генератора), інший код повертають без змін.
+
+Для оптимізації команди перетворюються у дерева виразів:
+LOADC та LOADV - листки (<код_команди>, <операнд>),
+арифметична команда - вузол (<код_команди>, <лівий>, <правий>).
+Дерево записується у код (у зворотному польському записі),
+коли його значення потрібне команді SET або невідомій команді.
+"""
+import math
+
+# арифметичні команди та відповідні обчислення
+OPERATIONS = {"ADD": lambda first, second: first + second,
+              "SUB": lambda first, second: first - second,
+              "MUL": lambda first, second: first * second,
+              "DIV": lambda first, second: first / second}
+
+# константи, з якими операція не змінює інший операнд:
+# (<команда>, <константа>, <чи може константа бути лівим операндом>)
+IDENTITIES = (("ADD", 0, True),
+              ("SUB", 0, False),
+              ("MUL", 1, True),
+              ("DIV", 1, False))
+
+# значення у стеку оптимізатора для виразу, вже записаного у код
+EMITTED = None
+
+# префікс імен тимчасових змінних (не може бути іменем змінної програми)
+TEMP_PREFIX = "$"
+
+# команди, результат яких не залежить від порядку операндів
+COMMUTATIVE = ("ADD", "MUL")
+
+
+def fold_constants(code, exact=True):
+    """
+    Функція обчислює константні вирази, вилучає тотожні операції
+    та замінює ділення на константу множенням.
+    Якщо exact, то ділення замінюється лише тоді, коли обернене число
+    точне (дільник - степінь 2), і результат не змінюється.
+    Інакше ділення на будь-яку ненульову константу замінюється,
+    і результат може відрізнятись в останньому знаку.
+    Команди, починаючи з невідомої команди або команди, для якої
+    у стеку недостатньо значень, не змінюються
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :param exact: чи заміняти ділення лише на точне множення
+    :return: новий список команд
+    :return: кількість вилучених команд
+    """
+    result = []
+    stack = []
+    for i, command in enumerate(code):
+        if command[0] in ("LOADC", "LOADV"):
+            stack.append(command)
+        elif command[0] in OPERATIONS and len(stack) >= 2:
+            second = stack.pop()
+            first = stack.pop()
+            stack.append(_combine(command[0], first, second, result, exact))
+        elif command[0] == "SET" and stack:
+            _emit_pending(stack, result)
+            stack.pop()
+            result.append(command)
+        else:
+            _emit_pending(stack, result)
+            result.extend(code[i:])
+            break
+    else:
+        _emit_pending(stack, result)
+    return result, len(code) - len(result)
+
+
+def _combine(command, first, second, result, exact):
+    """
+    Функція повертає значення у стеку оптимізатора для арифметичної
+    команди command з операндами first та second.
+    Якщо лівий операнд вже записаний у код (EMITTED), то записує у код
+    правий операнд та команду, і повертає EMITTED
+    :param command: код арифметичної команди
+    :param first: лівий операнд (дерево або EMITTED)
+    :param second: правий операнд (дерево або EMITTED)
+    :param result: список команд результату
+    :param exact: чи заміняти ділення лише на точне множення
+    :return: дерево виразу або EMITTED
+    """
+    if first is not EMITTED and second is not EMITTED:
+        return _simplify(command, first, second, exact)
+
+    if second is not EMITTED and _is_constant(second):
+        if _is_identity(command, second[1], False):
+            return EMITTED
+        reciprocal = _reciprocal(command, second[1], exact)
+        if reciprocal is not None:
+            result.append(("LOADC", reciprocal))
+            result.append(("MUL", None))
+            return EMITTED
+
+    if second is not EMITTED:
+        _emit_tree(second, result)
+    result.append((command, None))
+    return EMITTED
+
+
+def _simplify(command, first, second, exact):
+    """
+    Функція будує спрощене дерево виразу для арифметичної команди
+    з деревами операндів first та second
+    :param command: код арифметичної команди
+    :param first: дерево лівого операнда
+    :param second: дерево правого операнда
+    :param exact: чи заміняти ділення лише на точне множення
+    :return: дерево виразу
+    """
+    if _is_constant(first) and _is_constant(second) and \
+            not (command == "DIV" and second[1] == 0):
+        return ("LOADC", OPERATIONS[command](first[1], second[1]))
+    if _is_constant(second) and _is_identity(command, second[1], False):
+        return first
+    if _is_constant(first) and _is_identity(command, first[1], True):
+        return second
+    if _is_constant(second):
+        reciprocal = _reciprocal(command, second[1], exact)
+        if reciprocal is not None:
+            return ("MUL", first, ("LOADC", reciprocal))
+    return (command, first, second)
+
+
+def _is_constant(tree):
+    """
+    Функція перевіряє, чи є дерево константою
+    :param tree: дерево виразу
+    :return: булівське значення
+    """
+    return tree[0] == "LOADC"
+
+
+def _is_identity(command, number, left):
+    """
+    Функція перевіряє, чи не змінює команда command з константою number
+    інший операнд
+    :param command: код арифметичної команди
+    :param number: константа
+    :param left: чи є константа лівим операндом
+    :return: булівське значення
+    """
+    for identity_command, identity, commutative in IDENTITIES:
+        if command == identity_command and number == identity and \
+                (commutative or not left):
+            return True
+    return False
+
+
+def _reciprocal(command, number, exact):
+    """
+    Функція повертає число, обернене до дільника number,
+    якщо ділення на number можна замінити множенням, інакше None
+    :param command: код арифметичної команди
+    :param number: константа - правий операнд
+    :param exact: чи заміняти ділення лише на точне множення
+    :return: обернене число або None
+    """
+    if command != "DIV" or number == 0 or \
+            type(number) not in (int, float) or not math.isfinite(number):
+        return None
+    reciprocal = 1 / number
+    if not math.isfinite(reciprocal) or reciprocal == 0:
+        return None
+    if exact and (math.frexp(number)[0] not in (0.5, -0.5) or
+                  reciprocal * number != 1):
+        return None
+    return reciprocal
+
+
+def _emit_pending(stack, result):
+    """
+    Функція записує у код усі ще не записані дерева зі стеку оптимізатора
+    у порядку від нижнього до верхнього
+    :param stack: стек оптимізатора
+    :param result: список команд результату
+    :return: None
+    """
+    for i, tree in enumerate(stack):
+        if tree is not EMITTED:
+            _emit_tree(tree, result)
+            stack[i] = EMITTED
+
+
+def _emit_tree(tree, result):
+    """
+    Функція записує дерево виразу у код у зворотному польському записі.
+    Обхід дерева виконується без рекурсії
+    :param tree: дерево виразу
+    :param result: список команд результату
+    :return: None
+    """
+    todo = [tree]
+    while todo:
+        node = todo.pop()
+        if len(node) == 2:
+            result.append(node)
+        else:
+            todo.append((node[0], None))
+            todo.append(node[2])
+            todo.append(node[1])
+
+
+def remove_dead_stores(code):
+    """
+    Функція вилучає присвоєння, значення яких не читається
+    до наступного присвоєння тій самій змінній.
+    Останнє присвоєння кожній змінній залишається, оскільки його значення
+    залишається у пам'яті після виконання програми
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :return: новий список команд
+    :return: кількість вилучених команд
+    """
+    statements = _split_statements(code)
+    if statements is None:
+        return code, 0
+
+    defined = set()
+    removable = []
+    for variable, tree in statements:
+        removable.append(not _may_fail(tree) and
+                         not _may_input(tree, defined))
+        defined.add(variable)
+
+    overwritten = set()     # змінні, які присвоюються пізніше до читання
+    kept = []
+    for i in range(len(statements) - 1, -1, -1):
+        variable, tree = statements[i]
+        if variable in overwritten and removable[i]:
+            continue
+        kept.append(statements[i])
+        if _may_fail(tree):
+            overwritten.clear()
+        else:
+            overwritten.add(variable)
+        for node in _postorder(tree):
+            if node[0] == "LOADV":
+                overwritten.discard(node[1])
+
+    result = []
+    for variable, tree in reversed(kept):
+        _emit_tree(tree, result)
+        result.append(("SET", variable))
+    return result, len(code) - len(result)
+
+
+def eliminate_common_subexpressions(code, storage):
+    """
+    Функція замінює повторні обчислення однакових підвиразів
+    завантаженням змінної, яка містить значення підвиразу.
+    Підвираз, вкладений у вже обчислений раніше підвираз, не враховується,
+    оскільки буде замінений разом з ним.
+    Створені тимчасові змінні додаються до пам'яті storage.
+    Якщо код не став коротшим, то повертає його без змін
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :param storage: пам'ять
+    :return: новий список команд
+    :return: кількість вилучених команд
+    """
+    statements = _split_statements(code)
+    if statements is None:
+        return code, 0
+
+    numbering = _ValueNumbering()
+    counts = {}             # номер значення - кількість обчислень
+    sizes = {}              # номер значення - кількість команд обчислення
+    for variable, tree in statements:
+        for node in _postorder(tree):
+            number = numbering.number(node)
+            if len(node) == 3:
+                sizes[number] = 1 + sizes.get(numbering.number(node[1]), 1) + \
+                    sizes.get(numbering.number(node[2]), 1)
+        todo = [tree]
+        while todo:
+            node = todo.pop()
+            if len(node) == 2:
+                continue
+            number = numbering.number(node)
+            counts[number] = counts.get(number, 0) + 1
+            if counts[number] == 1:
+                todo.append(node[2])
+                todo.append(node[1])
+        numbering.assign(variable)
+
+    numbering.reset()
+    holders = {}            # номер значення - (змінна, версія змінної)
+    temps = []
+    first_temp = _next_temp(code, storage)
+    result = []
+    for variable, tree in statements:
+        for node in _postorder(tree):
+            numbering.number(node)
+        tree_number = numbering.number(tree)
+        todo = [tree]
+        while todo:
+            node = todo.pop()
+            if node[0] == "SET":
+                node = node[1]
+                number = numbering.number(node)
+                result.append((node[0], None))
+                count = counts[number]
+                if node is not tree and number not in holders and \
+                        (count - 1) * (sizes[number] - 1) > 2:
+                    temp = "{}{}".format(TEMP_PREFIX,
+                                         first_temp + len(temps))
+                    temps.append(temp)
+                    result.append(("SET", temp))
+                    result.append(("LOADV", temp))
+                    holders[number] = (temp, 0)
+                continue
+            if len(node) == 2:
+                result.append(node)
+                continue
+            number = numbering.number(node)
+            holder = holders.get(number)
+            if holder is not None and numbering.version(holder[0]) == holder[1]:
+                result.append(("LOADV", holder[0]))
+                continue
+            todo.append(("SET", node))
+            todo.append(node[2])
+            todo.append(node[1])
+        result.append(("SET", variable))
+        numbering.assign(variable)
+        holders[tree_number] = (variable, numbering.version(variable))
+
+    if len(result) >= len(code):
+        return code, 0
+    for temp in temps:
+        storage.add(temp)
+    return result, len(code) - len(result)
+
+
+def _next_temp(code, storage):
+    """
+    Функція повертає номер, більший за номери усіх тимчасових змінних
+    TEMP_PREFIX<номер> у коді та у пам'яті storage
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :param storage: пам'ять
+    :return: номер першої нової тимчасової змінної
+    """
+    names = {command[1] for command in code
+             if command[0] in ("LOADV", "SET")}
+    names.update(storage.get_all())
+    first = 0
+    for name in names:
+        if isinstance(name, str) and name.startswith(TEMP_PREFIX):
+            number = name[len(TEMP_PREFIX):]
+            if number.isdecimal():
+                first = max(first, int(number) + 1)
+    return first
+
+
+class _ValueNumbering:
+    """
+    Нумерація значень виразів: однакові вирази, обчислені при однакових
+    значеннях змінних, отримують однаковий номер
+    """
+    def __init__(self):
+        self._numbers = {}      # ключ виразу - номер значення
+        self._nodes = {}        # id вузла дерева поточного присвоєння -
+                                # номер значення
+        self._versions = {}     # змінна - кількість присвоєнь їй
+
+    def number(self, node):
+        """
+        Метод повертає номер значення вузла дерева.
+        Номери дочірніх вузлів мають бути вже обчислені
+        :param node: вузол дерева
+        :return: номер значення
+        """
+        number = self._nodes.get(id(node))
+        if number is not None:
+            return number
+        if node[0] == "LOADC":
+            key = ("LOADC", type(node[1]), repr(node[1]))
+        elif node[0] == "LOADV":
+            key = ("LOADV", node[1], self.version(node[1]))
+        else:
+            first = self._nodes[id(node[1])]
+            second = self._nodes[id(node[2])]
+            if node[0] in COMMUTATIVE and second < first:
+                first, second = second, first
+            key = (node[0], first, second)
+        number = self._numbers.setdefault(key, len(self._numbers))
+        self._nodes[id(node)] = number
+        return number
+
+    def version(self, variable):
+        """
+        Метод повертає версію змінної - кількість присвоєнь їй
+        :param variable: ім'я змінної
+        :return: номер версії
+        """
+        return self._versions.get(variable, 0)
+
+    def assign(self, variable):
+        """
+        Метод враховує присвоєння змінній variable та переходить
+        до наступного присвоєння
+        :param variable: ім'я змінної
+        :return: None
+        """
+        self._versions[variable] = self.version(variable) + 1
+        self._nodes.clear()
+
+    def reset(self):
+        """
+        Метод повертає версії змінних до початку програми.
+        Номери значень зберігаються
+        :return: None
+        """
+        self._versions.clear()
+        self._nodes.clear()
+
+
+def _split_statements(code):
+    """
+    Функція розбиває код на присвоєння та будує дерево виразу
+    кожного присвоєння.
+    Повертає None, якщо код містить невідомі команди, або перед командою
+    SET у стеку не рівно одне значення
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :return: список пар (<змінна>, <дерево виразу>) або None
+    """
+    statements = []
+    stack = []
+    for command in code:
+        if command[0] in ("LOADC", "LOADV"):
+            stack.append(command)
+        elif command[0] in OPERATIONS and len(stack) >= 2:
+            second = stack.pop()
+            first = stack.pop()
+            stack.append((command[0], first, second))
+        elif command[0] == "SET" and len(stack) == 1:
+            statements.append((command[1], stack.pop()))
+        else:
+            return None
+    if stack:
+        return None
+    return statements
+
+
+def _may_fail(tree):
+    """
+    Функція перевіряє, чи може обчислення дерева виразу дати помилку:
+    ділення виконується не лише на ненульові константи
+    :param tree: дерево виразу
+    :return: булівське значення
+    """
+    for node in _postorder(tree):
+        if node[0] == "DIV" and not (_is_constant(node[2]) and
+                                     node[2][1] != 0):
+            return True
+    return False
+
+
+def _may_input(tree, defined):
+    """
+    Функція перевіряє, чи може обчислення дерева виразу вводити значення
+    змінних: вираз містить змінні, які ще не мають значення
+    :param tree: дерево виразу
+    :param defined: множина змінних, які вже мають значення
+    :return: булівське значення
+    """
+    for node in _postorder(tree):
+        if node[0] == "LOADV" and node[1] not in defined:
+            return True
+    return False
+
+
+def _postorder(tree):
+    """
+    Функція-генератор повертає вузли дерева у зворотному порядку обходу
+    (спочатку операнди, потім операція) без рекурсії
+    :param tree: дерево виразу
+    :return: ітератор вузлів
+    """
+    todo = [(tree, False)]
+    while todo:
+        node, visited = todo.pop()
+        if len(node) == 2 or visited:
+            yield node
+        else:
+            todo.append((node, True))
+            todo.append((node[2], False))
+            todo.append((node[1], False))
+
+
+if __name__ == "__main__":
+    from storage import Storage
+    from code_generator import CodeGenerator
+    from interpreter import Interpreter
+
+    lines = ["x = 1",
+             "d = 4",
+             "z = 3",
+             "x345 = 2",
+             "y = (2 - 1) * (x345 + 3 * d) / 234.5 - z",
+             "w = (x + 0) * 1 / 1 - 0 + 0 * 5 + d / 4 + 1 * (0 + d)",
+             "v = (x + 2 * 3) / 0.5"]
+    storage = Storage()
+    code, error = CodeGenerator(lines, storage).generate_code()
+    optimized, eliminated = fold_constants(code)
+    success = not error and eliminated == len(code) - len(optimized) and \
+        optimized[8:17] == [('LOADV', 'x345'),
+                            ('LOADC', 3.0),
+                            ('LOADV', 'd'),
+                            ('MUL', None),
+                            ('ADD', None),
+                            ('LOADC', 234.5),
+                            ('DIV', None),
+                            ('LOADV', 'z'),
+                            ('SUB', None)] and \
+        ('LOADC', 2.0) in optimized and ('LOADC', 0.25) in optimized
+
+    Interpreter(code, storage).execute()
+    expected = dict(storage.get_all())
+    Interpreter(optimized, storage).execute()
+    success = success and storage.get_all() == expected and eliminated == 22
+
+    code = [('LOADC', 1.0), ('LOADC', 0.0), ('DIV', None), ('SET', 'x')]
+    success = success and fold_constants(code) == (code, 0)
+    code = [('LOADV', 'x'), ('LOADC', 2.0), ('LOADC', 2.0), ('SUB', None),
+            ('DIV', None), ('SET', 'x')]
+    success = success and fold_constants(code) == (
+        [('LOADV', 'x'), ('LOADC', 0.0), ('DIV', None), ('SET', 'x')], 2)
+    code = [('LOADV', 'x'), ('LOADC', 3.0), ('DIV', None), ('SET', 'y')]
+    success = success and fold_constants(code) == (code, 0)
+    success = success and \
+        fold_constants(code, exact=False)[0][1:3] == [('LOADC', 1 / 3),
+                                                      ('MUL', None)]
+    code = [('LOADC', 1.0), ('XXX', None), ('LOADC', 2.0), ('ADD', None)]
+    success = success and fold_constants(code) == (code, 0)
+    success = success and remove_dead_stores(code) == (code, 0)
+    success = success and eliminate_common_subexpressions(code, Storage()) == \
+        (code, 0)
+
+    lines = ["x = 1",
+             "y = 2",
+             "t = x * 5",
+             "t = x + y",
+             "s = (x + y) * (y + x) * (x + y)",
+             "r = a / x",
+             "r = 3",
+             "x = 4",
+             "z = (x + y)*(x*x + 2*x*y + y*y) - (x*x + 2*x*y + y*y)"]
+    storage = Storage()
+    code, error = CodeGenerator(lines, storage).generate_code()
+    storage.set("a", 6.0)
+    optimized, eliminated = remove_dead_stores(code)
+    success = success and eliminated == 4 and \
+        optimized[4:9] == [('LOADV', 'x'), ('LOADV', 'y'), ('ADD', None),
+                           ('SET', 't'), ('LOADV', 'x')]
+    optimized, eliminated = eliminate_common_subexpressions(optimized, storage)
+    success = success and eliminated > 0 and storage.is_in(TEMP_PREFIX + "0")
+    success = success and optimized[4:12] == [('LOADV', 'x'), ('LOADV', 'y'),
+                                              ('ADD', None), ('SET', 't'),
+                                              ('LOADV', 't'), ('LOADV', 't'),
+                                              ('MUL', None), ('LOADV', 't')]
+    Interpreter(optimized, storage).execute()
+    optimized_values = dict(storage.get_all())
+    storage.set("a", 6.0)
+    Interpreter(code, storage).execute()
+    success = success and all(storage.get(variable) == optimized_values[variable]
+                              for variable in storage.get_all()
+                              if not variable.startswith(TEMP_PREFIX))
+
+    lines = ["a = (x + y) * (x + y) * (x + y)",
+             "b = (x + y) * (x + y) - (x + y) * (x + y)"]
+    storage = Storage()
+    code, error = CodeGenerator(lines, storage).generate_code()
+    storage.set("x", 2.0)
+    storage.set("y", 3.0)
+    first, _ = eliminate_common_subexpressions(code, storage)
+    temps = [variable for variable in storage.get_all()
+             if variable.startswith(TEMP_PREFIX)]
+    again, eliminated = eliminate_common_subexpressions(code, storage)
+    success = success and temps == ["$0", "$1"] and eliminated > 0 and \
+        ("SET", "$2") in again and ("SET", "$0") not in again and \
+        eliminate_common_subexpressions(first, storage) == (first, 0)
+    storage.add("$7")
+    storage.add("$12")
+    code = [("LOADC", 1.0), ("SET", "$12")] + code
+    optimized, _ = eliminate_common_subexpressions(code, storage)
+    success = success and ("SET", "$13") in optimized and \
+        storage.is_in("$13") and not storage.is_in("$8")
+    Interpreter(first, storage).execute()
+    expected = (storage.get("a"), storage.get("b"))
+    storage.set("x", 2.0)
+    storage.set("y", 3.0)
+    Interpreter(optimized, storage).execute()
+    success = success and (storage.get("a"), storage.get("b")) == expected \
+        and expected == (125.0, 0.0)
+
+    print("Success =", success)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для паралельного виконання незалежних частин програми.
+
+ParallelExecutor розбиває код на присвоєння та об'єднує у ланцюжки
+присвоєння, пов'язані залежностями: присвоєння, що читає змінну,
+належить тому ж ланцюжку, що й останнє перед ним присвоєння цієї змінної;
+присвоєння однієї змінної також належать одному ланцюжку, щоб у пам'яті
+залишилось значення останнього з них.
+Ланцюжки не залежать один від одного, тому їх можна виконувати
+у різних процесах. Ланцюжки розподіляються між процесами так,
+щоб кількість команд у процесах була близькою, кожен процес виконує
+свої присвоєння у порядку програми (FastInterpreter) з копією
+потрібних змінних пам'яті, а присвоєні значення записуються у пам'ять.
+
+Значення невизначених змінних, які програма читає до присвоєння,
+вводяться до початку виконання.
+Якщо хоча б в одному процесі виникла помилка, то програма виконується
+ще раз послідовно (Interpreter), тому результат, помилка та стан пам'яті
+такі самі, як у Interpreter.
+
+Метод get_report повідомляє паралельність програми: кількість
+присвоєнь, поділена на довжину найдовшого ланцюжка залежностей,
+та паралельність розподілу: кількість команд, поділена
+на найбільшу кількість команд у процесі.
+"""
+import heapq
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from storage import Storage
+from interpreter import Interpreter
+from fast_interpreter import FastInterpreter, ExecutionError
+
+
+class ParallelExecutor(Interpreter):
+    def __init__(self, code, storage, workers=None):
+        Interpreter.__init__(self, code, storage)
+        self._workers = workers or os.cpu_count() or 1
+                                    # найбільша кількість процесів
+        self._statements = []       # присвоєння - пари (<початок>, <кінець>)
+                                    # у списку команд
+        self._inputs = []           # змінні, що читаються до присвоєння
+        self._chains = []           # ланцюжки - списки номерів присвоєнь
+        self._span = 0              # довжина найдовшого ланцюжка залежностей
+        self._parts = []            # частини для процесів - кортежі
+                                    # (<код>, <змінні>, <присвоєні змінні>)
+        self._executor = None       # пул процесів
+        self._analyze()
+        self._distribute()
+
+    def _analyze(self):
+        """
+        Метод розбиває код на присвоєння та об'єднує їх у ланцюжки
+        :return: None
+        """
+        parent = []             # батьківські присвоєння (об'єднання множин)
+
+        def find(index):
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+
+        def union(first, second):
+            first, second = find(first), find(second)
+            if first != second:
+                parent[max(first, second)] = min(first, second)
+
+        last_definition = {}
+        depth = []
+        reads = []
+        start = 0
+        for position, (command, operand) in enumerate(self._code):
+            if command == "LOADV":
+                reads.append(operand)
+            if command != "SET" and position < len(self._code) - 1:
+                continue
+            index = len(self._statements)
+            self._statements.append((start, position + 1))
+            parent.append(index)
+            statement_depth = 1
+            for variable in reads:
+                definition = last_definition.get(variable)
+                if definition is None:
+                    if variable not in self._inputs:
+                        self._inputs.append(variable)
+                else:
+                    union(index, definition)
+                    statement_depth = max(statement_depth,
+                                          depth[definition] + 1)
+            if command == "SET":
+                if operand in last_definition:
+                    union(index, last_definition[operand])
+                last_definition[operand] = index
+            depth.append(statement_depth)
+            reads = []
+            start = position + 1
+
+        chains = {}
+        for index in range(len(self._statements)):
+            chains.setdefault(find(index), []).append(index)
+        self._chains = list(chains.values())
+        self._span = max(depth, default=0)
+
+    def _distribute(self):
+        """
+        Метод розподіляє ланцюжки між процесами: кожен наступний
+        найдовший ланцюжок отримує процес з найменшою кількістю команд
+        :return: None
+        """
+        sizes = [sum(self._statements[index][1] - self._statements[index][0]
+                     for index in chain) for chain in self._chains]
+        bins = [(0, number, []) for number in
+                range(min(self._workers, len(self._chains)))]
+        for size, chain in sorted(zip(sizes, self._chains),
+                                  key=lambda item: -item[0]):
+            load, number, indices = heapq.heappop(bins)
+            indices.extend(chain)
+            heapq.heappush(bins, (load + size, number, indices))
+
+        for _, _, indices in sorted(bins, key=lambda item: item[1]):
+            code = []
+            for index in sorted(indices):
+                start, end = self._statements[index]
+                code += self._code[start:end]
+            variables = []
+            assigned = []
+            for command, operand in code:
+                if command in ("LOADV", "SET") and operand not in variables:
+                    variables.append(operand)
+                if command == "SET" and operand not in assigned:
+                    assigned.append(operand)
+            self._parts.append((code, variables, assigned))
+
+    def execute(self):
+        """
+        Метод виконує частини програми у паралельних процесах
+        та записує присвоєні значення у пам'ять.
+        Повертає код останньої помилки або 0, якщо помилки немає.
+        Якщо є помилка, то показує її.
+        :return: код останньої помилки або 0, якщо помилки немає
+        """
+        for variable in self._inputs:
+            if self._storage.is_in(variable) and \
+                    self._storage.get(variable) is None:
+                self._storage.input_var(variable)
+        if len(self._parts) <= 1:
+            return Interpreter.execute(self)
+
+        parts = []
+        for code, variables, assigned in self._parts:
+            values = {variable: self._storage.get(variable)
+                      for variable in variables
+                      if self._storage.is_in(variable)}
+            parts.append((code, values, assigned))
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self._workers)
+        results = list(self._executor.map(_execute_part, parts))
+        if any(error for error, _ in results):
+            return Interpreter.execute(self)
+
+        self._last_error = 0
+        for _, values in results:
+            for variable, value in values.items():
+                self._storage.set(variable, value)
+        return self._last_error
+
+    def get_report(self):
+        """
+        Метод повертає опис паралельності програми
+        :return: словник з ключами statements (кількість присвоєнь),
+                 chains (кількість незалежних ланцюжків),
+                 span (довжина найдовшого ланцюжка залежностей),
+                 parallelism (statements / span),
+                 workers (кількість процесів),
+                 achieved (кількість команд / найбільша кількість
+                 команд у процесі)
+        """
+        largest = max((len(code) for code, _, _ in self._parts), default=0)
+        return {"statements": len(self._statements),
+                "chains": len(self._chains),
+                "span": self._span,
+                "parallelism": len(self._statements) / self._span
+                if self._span else 0.0,
+                "workers": len(self._parts),
+                "achieved": len(self._code) / largest if largest else 0.0}
+
+    def close(self):
+        """
+        Метод завершує процеси виконавця
+        :return: None
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+def _execute_part(part):
+    """
+    Функція виконує частину програми в окремому процесі
+    :param part: кортеж (<код>, <словник значень змінних>,
+                 <присвоєні змінні>)
+    :return: код помилки
+    :return: словник присвоєних значень
+    """
+    code, values, assigned = part
+    storage = Storage()
+    for variable, value in values.items():
+        storage.add(variable)
+        storage.set(variable, value)
+    try:
+        FastInterpreter(code, storage).run()
+    except ExecutionError as e:
+        return e.code, {}
+    return 0, {variable: storage.get(variable) for variable in assigned}
+
+
+if __name__ == "__main__":
+    from code_generator import CodeGenerator
+
+    lines = ["x = 1",
+             "y = 2",
+             "u2 = x - 2*a",
+             "t = 2*x - y*b",
+             "z = (2*u2 + 3.2*x - 1.3*y)/t",
+             "w = c * 2",
+             "v = w - c",
+             "p = d + 1",
+             "d = 5"]
+
+    def run(values, workers):
+        storage = Storage()
+        code, _ = CodeGenerator(lines, storage).generate_code()
+        for variable, value in values.items():
+            storage.set(variable, value)
+        executor = ParallelExecutor(code, storage, workers)
+        last_error = executor.execute()
+        report = executor.get_report()
+        executor.close()
+        expected = Storage()
+        CodeGenerator(lines, expected).generate_code()
+        for variable, value in values.items():
+            expected.set(variable, value)
+        expected_error = Interpreter(code, expected).execute()
+        return last_error == expected_error and \
+            storage.get_all() == expected.get_all(), last_error, report
+
+    same, last_error, report = run({"a": 1.0, "b": 0.5, "c": 3.0,
+                                    "d": 4.0}, 2)
+    success = same and last_error == 0 and \
+        report == {"statements": 9, "chains": 4, "span": 3,
+                   "parallelism": 3.0, "workers": 2,
+                   "achieved": report["achieved"]} and \
+        report["achieved"] > 1.0
+
+    same, last_error, report = run({"a": 1.0, "b": 1.0, "c": 3.0,
+                                    "d": 4.0}, 3)
+    success = success and same and last_error == 3 and \
+        report["workers"] == 3
+
+    same, last_error, report = run({"a": 1.0, "b": 0.5, "c": 3.0,
+                                    "d": 4.0}, 1)
+    success = success and same and last_error == 0 and \
+        report["workers"] == 1
+
+    print("Success =", success)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для профілювання виконання коду інтерпретатором.
+
+ProfilingInterpreter виконує код так само, як Interpreter (тими ж методами
+обробки команд), але в окремому циклі з вимірюванням, тому Interpreter.execute
+не змінюється і без профілювання нічого не втрачає.
+Для кожної пари (<присвоєння>, <команда>) рахуються кількість виконань
+та сумарний час виконання, а також найбільша глибина стеку.
+Присвоєння - це команди до SET включно, k-те присвоєння коду відповідає
+k-му непорожньому рядку програми.
+Результати кількох виконань накопичуються до виклику reset_profile.
+
+Профіль можна отримати:
+    get_profile - словник з часом та кількістю виконань за командами
+                  та за рядками програми;
+    to_json - той самий словник у форматі JSON;
+    get_executions - кількість виконань кожного присвоєння коду;
+    dump_stats - файл у форматі модуля pstats: рядки програми -
+                 це функції, що викликають функції-команди.
+"""
+import json
+import marshal
+import time
+
+from storage import Storage
+from interpreter import Interpreter, ERRORS
+
+# ім'я "файлу" для рядків програми та команд у профілі pstats
+PROGRAM_FILE = "<program>"
+COMMANDS_FILE = "<interpreter>"
+
+
+class ProfilingInterpreter(Interpreter):
+    def __init__(self, code, storage, program_lines=None):
+        Interpreter.__init__(self, code, storage)
+        self._statements = []       # номер присвоєння для кожної команди
+        self._firsts = []           # ознаки першої команди присвоєння
+        self._lines = []            # рядки присвоєнь - пари
+                                    # (<номер рядка>, <текст рядка>)
+        self._costs = {}            # словник (<присвоєння>, <команда>) -
+                                    # список [<кількість>, <час>]
+        self._peak_stack = 0        # найбільша глибина стеку
+        self._runs = 0              # кількість виконань
+        self._build(program_lines)
+        self._executions = [0] * len(self._lines)
+                                    # кількість виконань присвоєнь
+
+    def _build(self, program_lines):
+        """
+        Метод визначає присвоєння кожної команди та рядки присвоєнь.
+        Якщо рядки програми не задано, то рядком присвоєння
+        вважається його номер
+        :param program_lines: список рядків програми або None
+        :return: None
+        """
+        statement = 0
+        first = True
+        for command, _ in self._code:
+            self._statements.append(statement)
+            self._firsts.append(first)
+            first = command == "SET"
+            if first:
+                statement += 1
+        count = statement + (1 if self._code and
+                             self._code[-1][0] != "SET" else 0)
+        if program_lines is not None:
+            self._lines = [(line_no, line.strip()) for line_no, line
+                           in enumerate(program_lines, 1) if line.strip()]
+        self._lines = self._lines[:count]
+        self._lines += [(number, "") for number
+                        in range(len(self._lines) + 1, count + 1)]
+
+    def execute(self):
+        """
+        Метод виконує код програми так само, як Interpreter.execute,
+        та вимірює час виконання кожної команди.
+        Повертає код останньої помилки або 0, якщо помилки немає.
+        Якщо є помилка, то показує її.
+        :return: код останньої помилки або 0, якщо помилки немає
+        """
+        costs = self._costs
+        executions = self._executions
+        stack = self._stack
+        clock = time.perf_counter
+        peak = self._peak_stack
+        self._runs += 1
+        for (command, operand), statement, first in \
+                zip(self._code, self._statements, self._firsts):
+            if first:
+                executions[statement] += 1
+            func = self._command_funcs.get(command)
+            start = clock()
+            if not func:
+                self._last_error = 1
+            else:
+                func(operand)
+            elapsed = clock() - start
+            if len(stack) > peak:
+                peak = len(stack)
+            cost = costs.get((statement, command))
+            if cost is None:
+                cost = costs[statement, command] = [0, 0.0]
+            cost[0] += 1
+            cost[1] += elapsed
+            if self._last_error:
+                print("Помилка виконання: {}".format(
+                    ERRORS[self._last_error]))
+                break
+        self._peak_stack = peak
+        return self._last_error
+
+    def reset_profile(self):
+        """
+        Метод очищує накопичений профіль
+        :return: None
+        """
+        self._costs = {}
+        self._executions = [0] * len(self._lines)
+        self._peak_stack = 0
+        self._runs = 0
+
+    def get_profile(self):
+        """
+        Метод повертає профіль виконання.
+        Рядки впорядковані за спаданням часу
+        :return: словник з ключами
+                 runs (кількість виконань),
+                 instructions (кількість виконаних команд),
+                 time (сумарний час команд у секундах),
+                 peak_stack (найбільша глибина стеку),
+                 commands (словник команда - словник з ключами
+                 count, time),
+                 lines (список словників з ключами line, text,
+                 executions, count, time)
+        """
+        commands = {}
+        lines = {}
+        for (statement, command), (count, elapsed) in self._costs.items():
+            total = commands.setdefault(command, {"count": 0, "time": 0.0})
+            total["count"] += count
+            total["time"] += elapsed
+            line_no, text = self._lines[statement]
+            total = lines.setdefault(
+                statement, {"line": line_no, "text": text,
+                            "executions": self._executions[statement],
+                            "count": 0, "time": 0.0})
+            total["count"] += count
+            total["time"] += elapsed
+        return {"runs": self._runs,
+                "instructions": sum(total["count"]
+                                    for total in commands.values()),
+                "time": sum(total["time"] for total in commands.values()),
+                "peak_stack": self._peak_stack,
+                "commands": commands,
+                "lines": sorted(lines.values(),
+                                key=lambda total: -total["time"])}
+
+    def get_executions(self):
+        """
+        Метод повертає кількість виконань кожного присвоєння коду
+        (k-те присвоєння - команди до k-го SET включно)
+        :return: список кількостей виконань
+        """
+        return list(self._executions)
+
+    def to_json(self, indent=None):
+        """
+        Метод повертає профіль виконання (get_profile) у форматі JSON
+        :param indent: відступ JSON або None
+        :return: рядок JSON
+        """
+        return json.dumps(self.get_profile(), ensure_ascii=False,
+                          indent=indent)
+
+    def get_pstats(self):
+        """
+        Метод повертає профіль у вигляді словника модуля pstats:
+        функції - кортежі (<файл>, <рядок>, <ім'я>), значення -
+        кортежі (<примітивні виклики>, <виклики>, <власний час>,
+        <сумарний час>, <словник функцій, що викликали>).
+        Рядок програми - це функція з номером рядка, що викликає
+        функції-команди
+        :return: словник
+        """
+        stats = {}
+        for (statement, command), (count, elapsed) in self._costs.items():
+            line_no, text = self._lines[statement]
+            caller = (PROGRAM_FILE, line_no, text or "statement")
+            executions = self._executions[statement]
+            _, _, tt, ct, callers = stats.get(caller, (0, 0, 0.0, 0.0, {}))
+            stats[caller] = (executions, executions, tt, ct + elapsed,
+                             callers)
+            function = (COMMANDS_FILE, 0, command)
+            cc, nc, tt, ct, callers = stats.get(function,
+                                                (0, 0, 0.0, 0.0, {}))
+            callers[caller] = (count, count, elapsed, elapsed)
+            stats[function] = (cc + count, nc + count, tt + elapsed,
+                               ct + elapsed, callers)
+        return stats
+
+    def dump_stats(self, filename):
+        """
+        Метод записує профіль у файл, який можна відкрити
+        pstats.Stats(filename)
+        :param filename: ім'я файлу
+        :return: None
+        """
+        with open(filename, "wb") as f:
+            marshal.dump(self.get_pstats(), f)
+
+
+if __name__ == "__main__":
+    import os
+    import pstats
+    import tempfile
+    from code_generator import CodeGenerator
+
+    lines = ["x = a",
+             "",
+             "y = (x + 2) * (x + 3) * (x + 4)",
+             "z = y / (x - 1)"]
+    storage = Storage()
+    code, error = CodeGenerator(lines, storage).generate_code()
+    storage.set("a", 1.0)
+    interpreter = ProfilingInterpreter(code, storage, lines)
+    success = interpreter.execute() == 3
+
+    profile = interpreter.get_profile()
+    success = success and profile["runs"] == 1 and \
+        profile["instructions"] == len(code) - 1 and \
+        profile["peak_stack"] == 3 and \
+        {command: total["count"] for command, total
+         in profile["commands"].items()} == \
+        {"LOADV": 6, "SET": 2, "LOADC": 4, "ADD": 3, "MUL": 2, "SUB": 1,
+         "DIV": 1} and \
+        sorted((total["line"], total["text"], total["executions"],
+                total["count"]) for total in profile["lines"]) == \
+        [(1, "x = a", 1, 2), (3, "y = (x + 2) * (x + 3) * (x + 4)", 1, 12),
+         (4, "z = y / (x - 1)", 1, 5)]
+
+    storage.set("a", 2.0)
+    success = success and interpreter.execute() == 0 and \
+        interpreter.get_value("z") == 120.0 and \
+        interpreter.get_profile()["instructions"] == 2 * len(code) - 1 and \
+        interpreter.get_executions() == [2, 2, 2]
+    success = success and \
+        json.loads(interpreter.to_json())["peak_stack"] == 3
+
+    filename = os.path.join(tempfile.mkdtemp(), "formula.prof")
+    interpreter.dump_stats(filename)
+    stats = pstats.Stats(filename)
+    success = success and stats.total_calls == 2 * len(code) - 1 + 3 * 2
+    os.remove(filename)
+    os.rmdir(os.path.dirname(filename))
+
+    interpreter.reset_profile()
+    profile = interpreter.get_profile()
+    success = success and profile["runs"] == 0 and \
+        profile["instructions"] == 0 and profile["lines"] == []
+
+    interpreter = ProfilingInterpreter([("XXX", None)], Storage())
+    success = success and interpreter.execute() == 1 and \
+        interpreter.get_profile()["lines"] == \
+        [{"line": 1, "text": "", "executions": 1, "count": 1,
+          "time": interpreter.get_profile()["time"]}]
+
+    print("Success =", success)
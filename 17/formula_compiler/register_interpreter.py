@@ -0,0 +1,246 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для виконання коду, який згенеровано генератором коду,
+на віртуальній машині з регістрами замість стеку.
+
+Функція allocate_registers перетворює список команд стекового коду
+у регістровий код. Кожна інструкція регістрового коду - це 4 цілих числа
+(<код>, <операнд 1>, <операнд 2>, <операнд 3>), усі інструкції зберігаються
+у одному масиві array('i'):
+R_LOADV r, v       - завантажити значення змінної з номером v у регістр r
+R_ADD r, r1, r2    - r = r1 + r2
+R_SUB r, r1, r2    - r = r1 - r2
+R_MUL r, r1, r2    - r = r1 * r2
+R_DIV r, r1, r2    - r = r1 / r2
+R_SET v, r         - встановити значення змінної з номером v рівним r
+R_FAIL e           - завершити виконання з помилкою e
+
+Регістри розподіляються за глибиною стеку: значення, що знаходилось би
+у стеку на глибині d, записується у регістр <кількість констант> + d.
+Константи програми розміщуються у окремих регістрах, які заповнюються
+один раз, тому команда LOADC не потребує інструкції.
+Арифметична операція виконується однією інструкцією без
+операцій зі стеком.
+"""
+from array import array
+
+from storage import Storage
+from interpreter import Interpreter, ERRORS
+
+# коди інструкцій регістрового коду
+R_LOADV = 0
+R_ADD = 1
+R_SUB = 2
+R_MUL = 3
+R_DIV = 4
+R_SET = 5
+R_FAIL = 6
+
+# інструкції, що відповідають арифметичним командам
+ARITHMETIC = {"ADD": R_ADD,
+              "SUB": R_SUB,
+              "MUL": R_MUL,
+              "DIV": R_DIV}
+
+# кількість чисел у інструкції
+WIDTH = 4
+
+
+def allocate_registers(code):
+    """
+    Функція перетворює стековий код у регістровий.
+    Повертає масив інструкцій, список значень констант (регістри
+    з номерами 0..len(constants)-1), список імен змінних
+    та загальну кількість регістрів.
+    Регістри значень стеку розміщуються після регістрів констант
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :return: масив інструкцій array('i')
+    :return: список констант
+    :return: список імен змінних
+    :return: кількість регістрів
+    """
+    constants = []
+    constant_registers = {}
+    for command, operand in code:
+        if command == "LOADC":
+            key = (type(operand), repr(operand))
+            if key not in constant_registers:
+                constant_registers[key] = len(constants)
+                constants.append(operand)
+        elif command not in ARITHMETIC and command not in ("LOADV", "SET"):
+            break
+
+    base = len(constants)
+    size = base
+    names = []
+    name_numbers = {}
+    stack = []          # стек номерів регістрів
+    instructions = array('i')
+    for command, operand in code:
+        if command == "LOADC":
+            stack.append(constant_registers[(type(operand), repr(operand))])
+        elif command == "LOADV":
+            register = base + len(stack)
+            instructions.extend((R_LOADV, register,
+                                 _name_number(operand, names, name_numbers),
+                                 0))
+            stack.append(register)
+        elif command in ARITHMETIC:
+            second = stack.pop()
+            first = stack.pop()
+            register = base + len(stack)
+            instructions.extend((ARITHMETIC[command], register, first, second))
+            stack.append(register)
+        elif command == "SET":
+            instructions.extend((R_SET,
+                                 _name_number(operand, names, name_numbers),
+                                 stack.pop(), 0))
+        else:
+            instructions.extend((R_FAIL, 1, 0, 0))
+            break
+        size = max(size, base + len(stack))
+    return instructions, constants, names, size
+
+
+def _name_number(variable, names, name_numbers):
+    """
+    Функція повертає номер змінної у списку імен, додаючи її до списку
+    :param variable: ім'я змінної
+    :param names: список імен змінних
+    :param name_numbers: словник ім'я - номер
+    :return: номер змінної
+    """
+    if variable not in name_numbers:
+        name_numbers[variable] = len(names)
+        names.append(variable)
+    return name_numbers[variable]
+
+
+class RegisterInterpreter(Interpreter):
+    """
+    Інтерпретатор регістрового коду.
+    Регістровий код будується зі стекового під час створення
+    """
+    def __init__(self, code, storage):
+        Interpreter.__init__(self, code, storage)
+        self._instructions, constants, self._names, size = \
+            allocate_registers(code)
+        self._registers = constants + [0.0] * (size - len(constants))
+
+    def execute(self):
+        """
+        Метод виконує регістровий код програми.
+        Повертає код останньої помилки або 0, якщо помилки немає.
+        Якщо є помилка, то показує її.
+        :return: код останньої помилки або 0, якщо помилки немає
+        """
+        instructions = self._instructions
+        registers = self._registers
+        names = self._names
+        storage = self._storage
+        self._last_error = 0
+        for code, first, second, third in zip(instructions[0::WIDTH],
+                                              instructions[1::WIDTH],
+                                              instructions[2::WIDTH],
+                                              instructions[3::WIDTH]):
+            if code == R_LOADV:
+                variable = names[second]
+                if not storage.is_in(variable):
+                    self._last_error = 2
+                    break
+                value = storage.get(variable)
+                if value is None:
+                    storage.input_var(variable)
+                    value = storage.get(variable)
+                registers[first] = value
+            elif code == R_ADD:
+                registers[first] = registers[second] + registers[third]
+            elif code == R_MUL:
+                registers[first] = registers[second] * registers[third]
+            elif code == R_SUB:
+                registers[first] = registers[second] - registers[third]
+            elif code == R_DIV:
+                divisor = registers[third]
+                if divisor == 0:
+                    self._last_error = 3
+                    break
+                registers[first] = registers[second] / divisor
+            elif code == R_SET:
+                variable = names[first]
+                if not storage.is_in(variable):
+                    self._last_error = 2
+                    break
+                storage.set(variable, registers[second])
+            else:
+                self._last_error = first
+                break
+
+        if self._last_error:
+            print("Помилка виконання: {}".format(ERRORS[self._last_error]))
+        return self._last_error
+
+
+if __name__ == "__main__":
+    code = [('LOADC', 1.0),
+            ('SET', 'x'),
+            ('LOADV', 'x'),
+            ('LOADC', 2.0),
+            ('LOADV', 'y'),
+            ('MUL', None),
+            ('ADD', None),
+            ('SET', 'z')]
+    instructions, constants, names, size = allocate_registers(code)
+    success = instructions.tolist() == [R_SET, 0, 0, 0,
+                                        R_LOADV, 2, 0, 0,
+                                        R_LOADV, 4, 1, 0,
+                                        R_MUL, 3, 1, 4,
+                                        R_ADD, 2, 2, 3,
+                                        R_SET, 2, 2, 0] and \
+        constants == [1.0, 2.0] and names == ['x', 'y', 'z'] and size == 5
+
+    code = [('LOADC', 1.0),
+            ('SET', 'x'),
+            ('LOADC', 1.0),
+            ('SET', 'y'),
+            ('LOADV', 'x'),
+            ('LOADV', 'a'),
+            ('MUL', None),
+            ('SET', 't'),
+            ('LOADC', 1.0),
+            ('LOADV', 'x'),
+            ('LOADV', 'y'),
+            ('SUB', None),
+            ('DIV', None),
+            ('SET', 'z')]
+    storage = Storage()
+    for variable in ('x', 'y', 'a', 't', 'z'):
+        storage.add(variable)
+    storage.set('a', 5.0)
+    interpreter = RegisterInterpreter(code, storage)
+    success = success and interpreter.execute() == 3 and \
+        interpreter.get_value('t') == 5.0 and interpreter.get_value('z') is None
+
+    interpreter = RegisterInterpreter([('XXX', 1.0), ('SET', 'x')], Storage())
+    success = success and interpreter.execute() == 1
+    interpreter = RegisterInterpreter([('LOADC', 1.0), ('SET', 'x')], Storage())
+    success = success and interpreter.execute() == 2
+
+    code = [('LOADC', 2.0),
+            ('SET', 'x'),
+            ('LOADC', 1.0),
+            ('SET', 'y'),
+            ('LOADC', 1.0),
+            ('LOADV', 'x'),
+            ('LOADV', 'y'),
+            ('SUB', None),
+            ('DIV', None),
+            ('SET', 'z')]
+    storage = Storage()
+    for variable in ('x', 'y', 'z'):
+        storage.add(variable)
+    interpreter = RegisterInterpreter(code, storage)
+    success = success and interpreter.execute() == 0 and \
+        interpreter.get_value('z') == 1.0
+
+    print("Success =", success)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для виконання однієї програми для багатьох сценаріїв
+("що буде, якщо"), які відрізняються значеннями кількох вхідних змінних.
+
+Функція run_scenarios виконує код для кожного сценарію у власній пам'яті
+OverlayStorage, створеній від спільного знімка StorageSnapshot
+(Storage.snapshot). Сценарій - це словник змінна - значення,
+що задає лише відмінності від знімка. Ні код, ні словник змінних
+знімка не копіюються, а пам'ять сценарію зберігає лише значення,
+що відрізняються від знімка.
+Якщо знімок зроблено після виконання програми, то пам'ять сценарію
+містить лише змінні, на які вплинули зміни.
+"""
+from storage import Storage
+from interpreter import Interpreter
+
+
+def run_scenarios(code, baseline, scenarios, interpreter_class=Interpreter):
+    """
+    Функція виконує код для кожного сценарію.
+    Якщо змінної сценарію немає у знімку, то сценарій не виконується
+    і має помилку 2 (змінна не існує)
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :param baseline: знімок пам'яті StorageSnapshot
+    :param scenarios: ітератор словників змінна - значення
+    :param interpreter_class: клас інтерпретатора
+    :return: список кортежів (<код помилки>, <пам'ять OverlayStorage>)
+    """
+    results = []
+    for scenario in scenarios:
+        storage = baseline.fork()
+        last_error = 0
+        for variable, value in scenario.items():
+            storage.set(variable, value)
+            if storage.get_last_error():
+                last_error = 2
+                break
+        if not last_error:
+            last_error = interpreter_class(code, storage).execute()
+        results.append((last_error, storage))
+    return results
+
+
+if __name__ == "__main__":
+    from code_generator import CodeGenerator
+    from fast_interpreter import FastInterpreter
+
+    lines = ["x = a * 2",
+             "y = b + 1",
+             "z = x / (y - 3)"]
+    storage = Storage()
+    code, error = CodeGenerator(lines, storage).generate_code()
+    storage.set("a", 1.0)
+    storage.set("b", 1.0)
+    success = Interpreter(code, storage).execute() == 0 and \
+        storage.get("z") == -2.0
+
+    baseline = storage.snapshot()
+    scenarios = [{"a": 4.0}, {"b": 2.0}, {"b": 3.0, "a": 2.0}, {"c": 1.0}]
+    for interpreter_class in (Interpreter, FastInterpreter):
+        results = run_scenarios(code, baseline, scenarios, interpreter_class)
+        success = success and \
+            [last_error for last_error, _ in results] == [0, 3, 0, 2] and \
+            results[0][1].get("z") == -8.0 and \
+            results[2][1].get("z") == 4.0 and \
+            storage.get("z") == -2.0 and baseline.get_all()["a"] == 1.0
+        success = success and results[0][1].get_changes() == \
+            {"a": 4.0, "x": 8.0, "z": -8.0}
+
+    print("Success =", success)
@@ -0,0 +1,358 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для реалізації пам'яті, у якій кожна змінна має
+номер (слот), та для виконання коду з доступом до змінних за номером.
+
+SlotStorage має ті самі методи, що й storage.Storage, тому генератор коду
+та інтерактивна робота з пам'яттю не змінюються. Змінна отримує слот
+під час додавання (генератор коду додає змінні під час генерації коду),
+значення усіх змінних зберігаються у масиві array('d'),
+а ознаки визначеності - у масиві байтів.
+Значення змінних зберігаються як дійсні числа.
+
+Функція resolve_slots замінює імена змінних у командах LOADV та SET
+номерами слотів, тому SlotInterpreter читає та записує змінні
+за індексом у масиві, без пошуку у словнику.
+"""
+from array import array
+
+from interpreter import Interpreter, ERRORS
+from binary_code import OPCODES, B_LOADC, B_LOADV, B_ADD, B_SUB, B_MUL, \
+    B_DIV, B_SET, B_FAIL
+
+# слот змінної, якої немає у пам'яті
+NO_SLOT = -1
+
+
+class SlotStorage:
+    __slots__ = ("_slots", "_names", "_values", "_defined", "_generation",
+                 "_last_error")
+
+    def __init__(self):
+        self._slots = {}            # словник змінна - номер слоту
+        self._names = []            # імена змінних у порядку слотів
+        self._values = array('d')   # значення змінних
+        self._defined = bytearray() # ознаки визначеності змінних
+        self._generation = 0        # кількість очищень пам'яті
+        self._last_error = 0        # код помилки останньої операції
+
+    def add(self, variable):
+        """
+        Метод додає змінну у память та призначає їй наступний слот.
+        Якщо така змінна вже існує, то встановлює помилку
+        :param variable: змінна
+        :return: None
+        """
+        if variable in self._slots:
+            self._last_error = 1
+        else:
+            self._last_error = 0
+            self._slots[variable] = len(self._names)
+            self._names.append(variable)
+            self._values.append(0.0)
+            self._defined.append(0)
+
+    def is_in(self, variable):
+        """
+        Метод перевіряє, чи є змінна у пам'яті.
+        :param variable: змінна
+        :return: булівське значенна (True, якщо є)
+        """
+        self._last_error = 0
+        return variable in self._slots
+
+    def get(self, variable):
+        """
+        Метод повертає значення змінної.
+        Якщо така змінна не існує або невизначена (==None),
+        то встановлює відповідну помилку
+        :param variable: змінна
+        :return: значення змінної
+        """
+        slot = self._slots.get(variable, NO_SLOT)
+        if slot == NO_SLOT:
+            self._last_error = 2
+            return None
+        if not self._defined[slot]:
+            self._last_error = 3
+            return None
+        self._last_error = 0
+        return self._values[slot]
+
+    def set(self, variable, value):
+        """
+        Метод встановлює значення змінної
+        Якщо змінна не існує, повертає помилку
+        :param variable: змінна
+        :param value: нове значення
+        :return: None
+        """
+        slot = self._slots.get(variable, NO_SLOT)
+        if slot == NO_SLOT:
+            self._last_error = 2
+        else:
+            self._last_error = 0
+            self.set_slot(slot, value)
+
+    def input_var(self, variable):
+        """
+        Метод здійснює введення з клавіатури та встановлення значення змінної
+        Якщо змінна не існує, повертає помилку
+        :param variable: змінна
+        :return: None
+        """
+        if variable not in self._slots:
+            self._last_error = 2
+        else:
+            self._last_error = 0
+            self.set_slot(self._slots[variable],
+                          float(input("{} = ? ".format(variable))))
+
+    def input_all(self):
+        """
+        Метод здійснює введення з клавіатури та встановлення значення
+        усіх змінних з пам'яті
+        :return: None
+        """
+        self._last_error = 0
+        for variable in self._names:
+            self.input_var(variable)
+
+    def clear(self):
+        """
+        Метод видаляє усі змінні з пам'яті.
+        Слоти змінних, отримані раніше, стають недійсними
+        :return: None
+        """
+        self._last_error = 0
+        self._slots.clear()
+        del self._names[:]
+        del self._values[:]
+        del self._defined[:]
+        self._generation += 1
+
+    def get_last_error(self):
+        """
+        Метод повертає код останньої помилки code
+        Для виведення повідомлення треба взяти
+        storage.ERRORS[code]
+        :return: код останньої помилки
+        """
+        return self._last_error
+
+    def get_all(self):
+        """
+        Метод повертає словник змінних пам'яті.
+        Словник будується заново, його зміна не змінює пам'ять
+        :return: словник змінних
+        """
+        return {variable: self._values[slot] if self._defined[slot] else None
+                for slot, variable in enumerate(self._names)}
+
+    def slot(self, variable):
+        """
+        Метод повертає номер слоту змінної або NO_SLOT, якщо змінної немає
+        :param variable: змінна
+        :return: номер слоту
+        """
+        return self._slots.get(variable, NO_SLOT)
+
+    def get_slot(self, slot):
+        """
+        Метод повертає значення змінної за номером слоту
+        або None, якщо змінна невизначена
+        :param slot: номер слоту
+        :return: значення змінної
+        """
+        return self._values[slot] if self._defined[slot] else None
+
+    def set_slot(self, slot, value):
+        """
+        Метод встановлює значення змінної за номером слоту.
+        Значення None робить змінну невизначеною
+        :param slot: номер слоту
+        :param value: нове значення
+        :return: None
+        """
+        if value is None:
+            self._defined[slot] = 0
+        else:
+            self._values[slot] = value
+            self._defined[slot] = 1
+
+    def get_layout(self):
+        """
+        Метод повертає стан розміщення змінних: кількість очищень пам'яті
+        та кількість змінних. Поки стан не змінився, слоти змінних
+        залишаються дійсними
+        :return: кортеж (<кількість очищень>, <кількість змінних>)
+        """
+        return self._generation, len(self._names)
+
+    def get_arrays(self):
+        """
+        Метод повертає масив значень та масив ознак визначеності змінних
+        для читання та запису за номером слоту
+        :return: масив значень array('d')
+        :return: масив ознак визначеності bytearray
+        """
+        return self._values, self._defined
+
+    def get_name(self, slot):
+        """
+        Метод повертає ім'я змінної за номером слоту
+        :param slot: номер слоту
+        :return: ім'я змінної
+        """
+        return self._names[slot]
+
+
+def resolve_slots(code, storage):
+    """
+    Функція перетворює програмний код у код зі слотами:
+    кожна команда - кортеж (<код команди з binary_code.OPCODES>, <операнд>),
+    операнд LOADV та SET - номер слоту змінної або NO_SLOT.
+    Недопустима команда записується як B_FAIL з кодом помилки
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :param storage: пам'ять SlotStorage
+    :return: список команд зі слотами
+    """
+    resolved = []
+    for command, operand in code:
+        opcode = OPCODES.get(command)
+        if opcode is None:
+            resolved.append((B_FAIL, 1))
+            break
+        if opcode == B_LOADV or opcode == B_SET:
+            operand = storage.slot(operand)
+        resolved.append((opcode, operand))
+    return resolved
+
+
+class SlotInterpreter(Interpreter):
+    """
+    Інтерпретатор, що звертається до змінних пам'яті SlotStorage
+    за номерами слотів.
+    Слоти визначаються перед першим виконанням та визначаються знову,
+    якщо у пам'ять додано змінні або пам'ять очищено
+    """
+    def __init__(self, code, storage):
+        Interpreter.__init__(self, code, storage)
+        self._layout = None         # стан розміщення змінних пам'яті
+        self._resolved = []         # код зі слотами
+
+    def execute(self):
+        """
+        Метод виконує код програми, записаний у self._code.
+        Повертає код останньої помилки або 0, якщо помилки немає.
+        Якщо є помилка, то показує її.
+        :return: код останньої помилки або 0, якщо помилки немає
+        """
+        storage = self._storage
+        layout = storage.get_layout()
+        if layout != self._layout:
+            self._resolved = resolve_slots(self._code, storage)
+            self._layout = layout
+        values, defined = storage.get_arrays()
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        self._last_error = 0
+        for opcode, operand in self._resolved:
+            if opcode == B_LOADV:
+                if operand == NO_SLOT:
+                    self._last_error = 2
+                    break
+                if not defined[operand]:
+                    storage.input_var(storage.get_name(operand))
+                push(values[operand])
+            elif opcode == B_LOADC:
+                push(operand)
+            elif opcode == B_ADD:
+                second = pop()
+                push(pop() + second)
+            elif opcode == B_MUL:
+                second = pop()
+                push(pop() * second)
+            elif opcode == B_SUB:
+                second = pop()
+                push(pop() - second)
+            elif opcode == B_DIV:
+                second = pop()
+                if second == 0:
+                    self._last_error = 3
+                    break
+                push(pop() / second)
+            elif opcode == B_SET:
+                if operand == NO_SLOT:
+                    self._last_error = 2
+                    break
+                values[operand] = pop()
+                defined[operand] = 1
+            else:
+                self._last_error = operand
+                break
+
+        if self._last_error:
+            print("Помилка виконання: {}".format(ERRORS[self._last_error]))
+        return self._last_error
+
+
+if __name__ == "__main__":
+    from code_generator import CodeGenerator
+
+    store = SlotStorage()
+    store.add("a")
+    success = store.get_last_error() == 0 and store.slot("a") == 0
+    store.add("a")
+    success = success and store.get_last_error() == 1
+    c = store.get("a")
+    success = success and c is None and store.get_last_error() == 3
+    c = store.get("b")
+    success = success and c is None and store.get_last_error() == 2
+    store.set("a", 1)
+    c = store.get("a")
+    success = success and c == 1.0 and store.get_last_error() == 0
+    store.set("b", 2)
+    success = success and store.get_last_error() == 2
+    store.add("x")
+    success = success and store.slot("x") == 1 and \
+        store.get_all() == {"a": 1.0, "x": None}
+    store.clear()
+    success = success and store.get_all() == {} and \
+        store.slot("a") == NO_SLOT and \
+        store.get_last_error() == 0
+
+    lines = ["x = 1",
+             "y = 2",
+             "t = x*a",
+             "z = 1/(y - 2*x)",
+             "w = z"]
+    storage = SlotStorage()
+    code, error = CodeGenerator(lines, storage).generate_code()
+    success = success and not error and \
+        [storage.slot(v) for v in ("x", "y", "a", "t", "z", "w")] == \
+        [0, 1, 2, 3, 4, 5]
+    storage.set("a", 5.0)
+    interpreter = SlotInterpreter(code, storage)
+    success = success and interpreter.execute() == 3 and \
+        interpreter.get_value("t") == 5.0 and \
+        interpreter.get_value("z") is None
+
+    code, error = CodeGenerator(["z = 1/(y - 2*x)", "w = z"],
+                                storage).generate_code()
+    storage.set("y", 2.0)
+    storage.set("x", 0.5)
+    interpreter = SlotInterpreter(code, storage)
+    success = success and interpreter.execute() == 0 and \
+        interpreter.get_value("w") == 1.0 and \
+        list(storage.get_all()) == ["y", "x", "z", "w"]
+
+    interpreter = SlotInterpreter([("XXX", 1.0), ("SET", "x")], SlotStorage())
+    success = success and interpreter.execute() == 1
+    interpreter = SlotInterpreter([("LOADC", 1.0), ("SET", "x")],
+                                  SlotStorage())
+    success = success and interpreter.execute() == 2
+
+    print("Success =", success)
@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для повторного виконання програми після зміни
+значень вхідних змінних так, як перераховується електронна таблиця:
+обчислюються лише присвоєння, на які вплинула зміна.
+
+Spreadsheet розбиває код на присвоєння (команди до SET включно)
+та будує граф залежностей: присвоєння, що читає змінну,
+залежить від останнього перед ним присвоєння цієї змінної
+(або від вхідного значення змінної, якщо такого присвоєння немає).
+Результат кожного присвоєння зберігається, тому присвоєння читає значення
+саме того присвоєння, від якого залежить, навіть якщо змінна
+присвоюється у програмі кілька разів.
+
+set_value змінює вхідну змінну та позначає як змінені (dirty)
+присвоєння, що її читають, і усі присвоєння, що від них залежать.
+execute обчислює змінені присвоєння у порядку програми,
+який є топологічним порядком графа, та рахує кількість обчислених
+присвоєнь. Перше виконання обчислює усі присвоєння і дає той самий
+результат, що й Interpreter.
+
+Вхідне значення змінної береться з пам'яті при першому використанні
+(з введенням, якщо змінна невизначена) і далі змінюється лише set_value.
+Тому програма, що читає змінну до її присвоєння (x = x + 1),
+при повторному виконанні використовує вхідне значення, а не результат
+попереднього виконання.
+"""
+from storage import Storage
+from interpreter import Interpreter, ERRORS
+
+# команди присвоєння після розбору залежностей
+S_LOADC = "LOADC"       # завантажити число
+S_RESULT = "RESULT"     # завантажити результат присвоєння з номером
+S_INPUT = "INPUT"       # завантажити вхідне значення змінної
+
+# арифметичні операції
+OPERATIONS = {"ADD": lambda first, second: first + second,
+              "SUB": lambda first, second: first - second,
+              "MUL": lambda first, second: first * second}
+
+
+class Spreadsheet(Interpreter):
+    def __init__(self, code, storage):
+        Interpreter.__init__(self, code, storage)
+        self._statements = []       # присвоєння - пари (<команди>, <змінна>)
+        self._dependents = []       # множини присвоєнь, що читають
+                                    # результат присвоєння
+        self._next_definition = []  # номер наступного присвоєння
+                                    # тієї ж змінної або None
+        self._readers = {}          # словник змінна - множина присвоєнь,
+                                    # що читають її вхідне значення
+        self._last_definition = {}  # словник змінна - номер останнього
+                                    # присвоєння змінної
+        self._inputs = {}           # вхідні значення змінних
+        self._results = []          # результати присвоєнь
+        self._build()
+        self._dirty = bytearray([1]) * len(self._statements)
+                                    # ознаки змінених присвоєнь
+        self._recomputed = 0        # кількість присвоєнь, обчислених
+                                    # під час останнього виконання
+        self._total = 0             # кількість обчислених присвоєнь
+
+    def _build(self):
+        """
+        Метод розбиває код на присвоєння та будує граф залежностей
+        :return: None
+        """
+        commands = []
+        for command, operand in self._code:
+            index = len(self._statements)
+            if command == "LOADV":
+                definition = self._last_definition.get(operand)
+                if definition is None:
+                    self._readers.setdefault(operand, set()).add(index)
+                    commands.append((S_INPUT, operand))
+                else:
+                    self._dependents[definition].add(index)
+                    commands.append((S_RESULT, definition))
+            else:
+                commands.append((command, operand))
+            if command == "SET":
+                self._add_statement(commands, operand)
+                previous = self._last_definition.get(operand)
+                if previous is not None:
+                    self._next_definition[previous] = index
+                self._last_definition[operand] = index
+                commands = []
+        if commands:
+            self._add_statement(commands, None)
+
+    def _add_statement(self, commands, variable):
+        """
+        Метод додає присвоєння до графа
+        :param commands: команди присвоєння
+        :param variable: змінна, що присвоюється, або None
+        :return: None
+        """
+        self._statements.append((commands, variable))
+        self._dependents.append(set())
+        self._next_definition.append(None)
+        self._results.append(None)
+
+    def set_value(self, variable, value):
+        """
+        Метод встановлює вхідне значення змінної у пам'яті та позначає
+        присвоєння, на які воно впливає. Якщо змінна присвоюється
+        у програмі, то її останнє присвоєння також позначається,
+        щоб повернути у пам'ять обчислене значення
+        :param variable: ім'я змінної
+        :param value: нове значення
+        :return: None
+        """
+        self._storage.set(variable, value)
+        self._inputs[variable] = value
+        changed = list(self._readers.get(variable, ()))
+        if variable in self._last_definition:
+            changed.append(self._last_definition[variable])
+        self._mark(changed)
+
+    def _mark(self, changed):
+        """
+        Метод позначає присвоєння changed та усі присвоєння,
+        що від них залежать, як змінені.
+        Присвоєння, що вже позначене, не розглядається, бо усі присвоєння,
+        що від нього залежать, також позначені
+        :param changed: номери присвоєнь
+        :return: None
+        """
+        dirty = self._dirty
+        while changed:
+            index = changed.pop()
+            if not dirty[index]:
+                dirty[index] = 1
+                changed.extend(self._dependents[index])
+
+    def execute(self):
+        """
+        Метод обчислює змінені присвоєння у порядку програми.
+        Повертає код помилки або 0, якщо помилки немає.
+        Після помилки присвоєння, що не обчислені, залишаються позначеними.
+        Якщо є помилка, то показує її.
+        :return: код помилки або 0, якщо помилки немає
+        """
+        dirty = self._dirty
+        self._recomputed = 0
+        self._last_error = 0
+        index = dirty.find(1)
+        while index >= 0:
+            self._last_error = self._evaluate(index)
+            if self._last_error:
+                print("Помилка виконання: {}".format(
+                    ERRORS[self._last_error]))
+                break
+            dirty[index] = 0
+            self._recomputed += 1
+            index = dirty.find(1, index + 1)
+        self._total += self._recomputed
+        return self._last_error
+
+    def _evaluate(self, index):
+        """
+        Метод обчислює присвоєння з номером index, зберігає його результат
+        та записує його у пам'ять, якщо пізніші присвоєння тієї ж змінної
+        не обчислені
+        :param index: номер присвоєння
+        :return: код помилки або 0, якщо помилки немає
+        """
+        commands, variable = self._statements[index]
+        stack = []
+        for command, operand in commands:
+            if command == S_LOADC:
+                stack.append(operand)
+            elif command == S_RESULT:
+                stack.append(self._results[operand])
+            elif command == S_INPUT:
+                if operand not in self._inputs:
+                    if not self._storage.is_in(operand):
+                        return 2
+                    value = self._storage.get(operand)
+                    if value is None:
+                        self._storage.input_var(operand)
+                        value = self._storage.get(operand)
+                    self._inputs[operand] = value
+                stack.append(self._inputs[operand])
+            elif command in OPERATIONS:
+                second = stack.pop()
+                first = stack.pop()
+                stack.append(OPERATIONS[command](first, second))
+            elif command == "DIV":
+                second = stack.pop()
+                first = stack.pop()
+                if second == 0:
+                    return 3
+                stack.append(first / second)
+            elif command == "SET":
+                if not self._storage.is_in(operand):
+                    return 2
+                self._results[index] = stack.pop()
+                following = self._next_definition[index]
+                while following is not None and self._dirty[following]:
+                    following = self._next_definition[following]
+                if following is None:
+                    self._storage.set(operand, self._results[index])
+            else:
+                return 1
+        return 0
+
+    def get_stats(self):
+        """
+        Метод повертає кількість обчислених присвоєнь
+        :return: словник з ключами recomputed (під час останнього
+                 виконання), total (за усі виконання), statements
+                 (кількість присвоєнь програми)
+        """
+        return {"recomputed": self._recomputed,
+                "total": self._total,
+                "statements": len(self._statements)}
+
+
+if __name__ == "__main__":
+    from code_generator import CodeGenerator
+
+    lines = ["x = 1",
+             "y = 2",
+             "u2 = x - 2*a",
+             "t = 2*x - y*b",
+             "z = (2*u2 + 3.2*x - 1.3*y)/t",
+             "w = c * 2",
+             "x = x + w"]
+    storage = Storage()
+    code, error = CodeGenerator(lines, storage).generate_code()
+    storage.set("a", 1.0)
+    storage.set("b", 0.5)
+    storage.set("c", 1.0)
+    sheet = Spreadsheet(code, storage)
+    success = sheet.execute() == 0 and sheet.get_stats()["recomputed"] == 7
+
+    def expected(values):
+        expected_storage = Storage()
+        CodeGenerator(lines, expected_storage).generate_code()
+        for variable, value in values.items():
+            expected_storage.set(variable, value)
+        Interpreter(code, expected_storage).execute()
+        return expected_storage.get_all()
+
+    success = success and \
+        storage.get_all() == expected({"a": 1.0, "b": 0.5, "c": 1.0})
+
+    sheet.set_value("a", 3.0)
+    success = success and sheet.execute() == 0 and \
+        sheet.get_stats()["recomputed"] == 2 and \
+        storage.get_all() == expected({"a": 3.0, "b": 0.5, "c": 1.0})
+
+    sheet.set_value("c", 5.0)
+    success = success and sheet.execute() == 0 and \
+        sheet.get_stats()["recomputed"] == 2 and \
+        storage.get_all() == expected({"a": 3.0, "b": 0.5, "c": 5.0})
+
+    sheet.set_value("b", 1.0)
+    success = success and sheet.execute() == 3 and \
+        sheet.get_stats()["recomputed"] == 1
+    sheet.set_value("b", 0.25)
+    success = success and sheet.execute() == 0 and \
+        sheet.get_stats()["recomputed"] == 2 and \
+        storage.get_all() == expected({"a": 3.0, "b": 0.25, "c": 5.0})
+
+    success = success and sheet.execute() == 0 and \
+        sheet.get_stats() == {"recomputed": 0, "total": 14, "statements": 7}
+
+    print("Success =", success)
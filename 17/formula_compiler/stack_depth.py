@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для статичного аналізу глибини стеку коду
+та виконання коду зі стеком заздалегідь визначеного розміру.
+
+Кожна команда бере зі стеку та додає до стеку відому кількість значень
+(STACK_EFFECTS), тому глибину стеку після кожної команди можна обчислити
+без виконання коду. Функція analyze_stack повертає найбільшу глибину
+стеку кожного присвоєння (команди до SET включно; k-те присвоєння коду
+генератора відповідає k-му непорожньому рядку програми) та номер команди,
+для якої у стеку недостатньо значень. Команди після невідомої команди
+не аналізуються, бо вони не виконуються.
+
+PreallocatedInterpreter аналізує код під час створення. Стек - це список
+найбільшої глибини, створений один раз, а вершина стеку - ціле число,
+тому під час виконання немає append та pop. Код з недостатньою кількістю
+значень у стеку не виконується: execute відразу повертає помилку 4,
+а не піднімає IndexError під час виконання.
+"""
+from storage import Storage
+from interpreter import Interpreter, ERRORS
+
+# кількість значень, які команда бере зі стеку та додає до стеку:
+# кортежі (<бере>, <додає>)
+STACK_EFFECTS = {"LOADC": (0, 1),
+                 "LOADV": (0, 1),
+                 "ADD": (2, 1),
+                 "SUB": (2, 1),
+                 "MUL": (2, 1),
+                 "DIV": (2, 1),
+                 "SET": (1, 0)}
+
+
+def analyze_stack(code):
+    """
+    Функція обчислює найбільшу глибину стеку кожного присвоєння коду.
+    Останнім присвоєнням вважаються також команди після останнього SET.
+    Якщо для команди у стеку недостатньо значень, то аналіз зупиняється,
+    а глибини повертаються лише для попередніх присвоєнь
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :return: список найбільших глибин стеку присвоєнь
+    :return: номер команди, для якої у стеку недостатньо значень,
+             або -1, якщо такої команди немає
+    """
+    depths = []
+    depth = 0
+    peak = 0
+    pending = False         # чи є команди присвоєння після останнього SET
+    for index, (command, _) in enumerate(code):
+        effect = STACK_EFFECTS.get(command)
+        if effect is None:
+            break
+        taken, added = effect
+        if depth < taken:
+            return depths, index
+        depth += added - taken
+        if depth > peak:
+            peak = depth
+        pending = command != "SET"
+        if not pending:
+            depths.append(peak)
+            peak = depth
+    if pending:
+        depths.append(peak)
+    return depths, -1
+
+
+class PreallocatedInterpreter(Interpreter):
+    """
+    Інтерпретатор зі стеком найбільшої глибини коду,
+    створеним до виконання, та цілим номером вершини стеку
+    """
+    def __init__(self, code, storage):
+        Interpreter.__init__(self, code, storage)
+        self._depths, self._underflow = analyze_stack(code)
+                                    # найбільші глибини стеку присвоєнь
+                                    # та номер команди з недостатньою
+                                    # кількістю значень у стеку або -1
+        self._max_depth = max(self._depths, default=0)
+                                    # найбільша глибина стеку коду
+        self._stack = [0.0] * self._max_depth
+                                    # стек інтерпретатора
+
+    def get_max_depth(self):
+        """
+        Метод повертає найбільшу глибину стеку коду
+        :return: глибина стеку
+        """
+        return self._max_depth
+
+    def get_underflow_index(self):
+        """
+        Метод повертає номер команди, для якої у стеку недостатньо значень,
+        або None, якщо код правильний
+        :return: номер команди або None
+        """
+        return self._underflow if self._underflow >= 0 else None
+
+    def execute(self):
+        """
+        Метод виконує код програми, записаний у self._code.
+        Якщо для якоїсь команди у стеку недостатньо значень,
+        то код не виконується і повертається помилка 4.
+        Повертає код останньої помилки або 0, якщо помилки немає.
+        Якщо є помилка, то показує її.
+        :return: код останньої помилки або 0, якщо помилки немає
+        """
+        storage = self._storage
+        stack = self._stack
+        top = 0
+        self._last_error = 0
+        if self._underflow >= 0:
+            self._last_error = 4
+            print("Помилка виконання: {}".format(ERRORS[self._last_error]))
+            return self._last_error
+
+        for command, operand in self._code:
+            if command == "LOADV":
+                if not storage.is_in(operand):
+                    self._last_error = 2
+                    break
+                value = storage.get(operand)
+                if value is None:
+                    storage.input_var(operand)
+                    value = storage.get(operand)
+                stack[top] = value
+                top += 1
+            elif command == "LOADC":
+                stack[top] = operand
+                top += 1
+            elif command == "ADD":
+                top -= 1
+                stack[top - 1] = stack[top - 1] + stack[top]
+            elif command == "MUL":
+                top -= 1
+                stack[top - 1] = stack[top - 1] * stack[top]
+            elif command == "SUB":
+                top -= 1
+                stack[top - 1] = stack[top - 1] - stack[top]
+            elif command == "DIV":
+                top -= 1
+                if stack[top] == 0:
+                    self._last_error = 3
+                    break
+                stack[top - 1] = stack[top - 1] / stack[top]
+            elif command == "SET":
+                if not storage.is_in(operand):
+                    self._last_error = 2
+                    break
+                top -= 1
+                storage.set(operand, stack[top])
+            else:
+                self._last_error = 1
+                break
+
+        if self._last_error:
+            print("Помилка виконання: {}".format(ERRORS[self._last_error]))
+        return self._last_error
+
+
+if __name__ == "__main__":
+    from code_generator import CodeGenerator
+
+    lines = ["x = 1",
+             "",
+             "y = (x + 2) * (x + 3 * (x + 4))",
+             "t = x * a",
+             "z = y / (x - 1)"]
+    storage = Storage()
+    code, error = CodeGenerator(lines, storage).generate_code()
+    success = analyze_stack(code) == ([1, 5, 2, 3], -1)
+
+    storage.set("a", 5.0)
+    interpreter = PreallocatedInterpreter(code, storage)
+    success = success and interpreter.get_max_depth() == 5 and \
+        interpreter.get_underflow_index() is None and \
+        interpreter.execute() == 3 and interpreter.get_value("y") == 48.0 \
+        and interpreter.get_value("t") == 5.0 and \
+        interpreter.get_value("z") is None
+
+    storage.set("a", 2.0)
+    code = code[:-4] + [("LOADC", 2.0)] + code[-3:]
+    interpreter = PreallocatedInterpreter(code, storage)
+    success = success and interpreter.get_max_depth() == 5 and \
+        interpreter.execute() == 0 and \
+        interpreter.get_value("z") == -48.0 and \
+        interpreter.get_value("t") == 2.0
+
+    code = [("LOADC", 1.0), ("SET", "x"), ("LOADC", 2.0), ("ADD", None),
+            ("SET", "x")]
+    storage = Storage()
+    storage.add("x")
+    interpreter = PreallocatedInterpreter(code, storage)
+    success = success and analyze_stack(code) == ([1], 3) and \
+        interpreter.get_underflow_index() == 3 and \
+        interpreter.execute() == 4 and storage.get("x") is None
+
+    code = [("LOADC", 1.0), ("LOADC", 2.0), ("XXX", None), ("ADD", None),
+            ("ADD", None)]
+    interpreter = PreallocatedInterpreter(code, storage)
+    success = success and analyze_stack(code) == ([2], -1) and \
+        interpreter.execute() == 1
+    success = success and analyze_stack([]) == ([], -1) and \
+        PreallocatedInterpreter([], storage).execute() == 0
+    interpreter = PreallocatedInterpreter([("LOADC", 1.0), ("SET", "y")],
+                                          storage)
+    success = success and interpreter.execute() == 2
+
+    print("Success =", success)
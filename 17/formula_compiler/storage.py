@@ -5,7 +5,16 @@
 
 Змінні можуть мати числові значення цілого або дійсного типу
 
+Метод Storage.snapshot повертає незмінний знімок пам'яті StorageSnapshot,
+а метод знімка fork - пам'ять OverlayStorage з тим самим API, що й Storage.
+Багато OverlayStorage спільно використовують один знімок і зберігають
+лише свої зміни (копіювання під час запису): значення, що збігається
+зі значенням у знімку, не зберігається. Тому пам'ять сценарію зростає
+з кількістю змін, а не з кількістю змінних програми.
 """
+from collections.abc import MutableMapping
+from math import copysign
+from types import MappingProxyType
 
 # словник, що співствляє коди помилок до їх описи
 ERRORS = {0: "",
@@ -97,6 +106,19 @@ class Storage():
         for variable in self._storage:
             self.input_var(variable)
 
+    def remove(self, variable):
+        """
+        Метод видаляє змінну з пам'яті
+        Якщо змінна не існує, повертає помилку
+        :param variable: змінна
+        :return: None
+        """
+        if variable not in self._storage:
+            self._last_error = 2
+        else:
+            self._last_error = 0
+            del self._storage[variable]
+
     def clear(self):
         """
         Метод видаляє усі змінні з пам'яті
@@ -123,6 +145,247 @@ class Storage():
         """
         return self._storage
 
+    def snapshot(self):
+        """
+        Метод повертає незмінний знімок поточного стану пам'яті
+        :return: StorageSnapshot
+        """
+        return StorageSnapshot(self._storage)
+
+
+class StorageSnapshot:
+    """
+    Незмінний знімок пам'яті, від якого створюються сценарії
+    """
+    def __init__(self, variables):
+        self._variables = MappingProxyType(dict(variables))
+                                    # змінні знімка (лише для читання)
+
+    def fork(self):
+        """
+        Метод повертає нову пам'ять, що починається зі стану знімка
+        :return: OverlayStorage
+        """
+        return OverlayStorage(self._variables)
+
+    def get_all(self):
+        """
+        Метод повертає словник змінних знімка (лише для читання)
+        :return: словник змінних
+        """
+        return self._variables
+
+
+class OverlayStorage(Storage):
+    """
+    Пам'ять над знімком: self._storage містить лише змінені
+    та додані змінні, інші змінні читаються зі знімка,
+    крім видалених змінних знімка self._hidden
+    """
+    def __init__(self, base):
+        Storage.__init__(self)
+        self._base = base           # змінні знімка (лише для читання)
+        self._hidden = set()        # видалені змінні знімка
+
+    def add(self, variable):
+        """
+        Метод додає змінну у память.
+        Якщо така змінна вже існує, то встановлює помилку
+        :param variable: змінна
+        :return: None
+        """
+        if self.is_in(variable):
+            self._last_error = 1
+        else:
+            self._last_error = 0
+            self._hidden.discard(variable)
+            self._storage[variable] = None
+
+    def is_in(self, variable):
+        """
+        Метод перевіряє, чи є змінна у пам'яті.
+        :param variable: змінна
+        :return: булівське значенна (True, якщо є)
+        """
+        self._last_error = 0
+        return variable in self._storage or \
+            variable in self._base and variable not in self._hidden
+
+    def get(self, variable):
+        """
+        Метод повертає значення змінної.
+        Якщо така змінна не існує або невизначена (==None),
+        то встановлює відповідну помилку
+        :param variable: змінна
+        :return: значення змінної
+        """
+        if variable in self._storage:
+            value = self._storage[variable]
+        elif variable in self._base and variable not in self._hidden:
+            value = self._base[variable]
+        else:
+            self._last_error = 2
+            return None
+        self._last_error = 3 if value is None else 0
+        return value
+
+    def set(self, variable, value):
+        """
+        Метод встановлює значення змінної
+        Якщо змінна не існує, повертає помилку
+        :param variable: змінна
+        :param value: нове значення
+        :return: None
+        """
+        if not self.is_in(variable):
+            self._last_error = 2
+        else:
+            self._last_error = 0
+            self._override(variable, value)
+
+    def input_var(self, variable):
+        """
+        Метод здійснює введення з клавіатури та встановлення значення змінної
+        Якщо змінна не існує, повертає помилку
+        :param variable: змінна
+        :return: None
+        """
+        if not self.is_in(variable):
+            self._last_error = 2
+        else:
+            self._last_error = 0
+            self._override(variable,
+                           float(input("{} = ? ".format(variable))))
+
+    def input_all(self):
+        """
+        Метод здійснює введення з клавіатури та встановлення значення
+        усіх змінних з пам'яті
+        :return: None
+        """
+        self._last_error = 0
+        for variable in list(self.get_all()):
+            self.input_var(variable)
+
+    def remove(self, variable):
+        """
+        Метод видаляє змінну з пам'яті (знімок не змінюється:
+        змінна знімка стає прихованою)
+        Якщо змінна не існує, повертає помилку
+        :param variable: змінна
+        :return: None
+        """
+        if not self.is_in(variable):
+            self._last_error = 2
+        else:
+            self._last_error = 0
+            self._storage.pop(variable, None)
+            if variable in self._base:
+                self._hidden.add(variable)
+
+    def clear(self):
+        """
+        Метод видаляє усі змінні з пам'яті (знімок не змінюється)
+        :return: None
+        """
+        self._last_error = 0
+        self._storage.clear()
+        self._hidden.clear()
+        self._base = MappingProxyType({})
+
+    def get_all(self):
+        """
+        Метод повертає словник змінних пам'яті: зміни поверх знімка.
+        Запис у цей словник змінює лише пам'ять, а не знімок,
+        і, як і set, не зберігає значення, що збігається зі знімком
+        :return: словник змінних OverlayVariables
+        """
+        return OverlayVariables(self)
+
+    def snapshot(self):
+        """
+        Метод повертає незмінний знімок поточного стану пам'яті
+        (знімок разом зі змінами)
+        :return: StorageSnapshot
+        """
+        return StorageSnapshot(self.get_all())
+
+    def get_changes(self):
+        """
+        Метод повертає словник змінних, значення яких відрізняються
+        від знімка, та доданих змінних.
+        Видалені змінні знімка повертає get_removed
+        :return: словник змінних
+        """
+        return self._storage
+
+    def get_removed(self):
+        """
+        Метод повертає множину видалених змінних знімка
+        :return: множина змінних
+        """
+        return self._hidden
+
+    def _override(self, variable, value):
+        """
+        Метод записує значення змінної у зміни.
+        Значення, що збігається зі значенням у знімку (того ж типу,
+        а для нуля - того ж знаку), не зберігається
+        :param variable: змінна
+        :param value: нове значення
+        :return: None
+        """
+        self._hidden.discard(variable)
+        base = self._base.get(variable)
+        if value is not None and value == base and \
+                type(value) is type(base) and \
+                (value != 0 or copysign(1, value) == copysign(1, base)):
+            self._storage.pop(variable, None)
+        else:
+            self._storage[variable] = value
+
+
+class OverlayVariables(MutableMapping):
+    """
+    Словник змінних пам'яті OverlayStorage (get_all).
+    Читає зміни поверх знімка, а записує через OverlayStorage._override
+    """
+    def __init__(self, storage):
+        self._owner = storage       # пам'ять OverlayStorage
+
+    def __getitem__(self, variable):
+        changes = self._owner._storage
+        if variable in changes:
+            return changes[variable]
+        if variable in self._owner._hidden:
+            raise KeyError(variable)
+        return self._owner._base[variable]
+
+    def __setitem__(self, variable, value):
+        self._owner._override(variable, value)
+
+    def __delitem__(self, variable):
+        self._owner.remove(variable)
+        if self._owner.get_last_error():
+            raise KeyError(variable)
+
+    def __contains__(self, variable):
+        return self._owner.is_in(variable)
+
+    def __iter__(self):
+        changes = self._owner._storage
+        base = self._owner._base
+        hidden = self._owner._hidden
+        for variable in base:
+            if variable not in hidden:
+                yield variable
+        for variable in changes:
+            if variable not in base:
+                yield variable
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
 
 if __name__ == "__main__":
     store = Storage()
@@ -145,6 +408,11 @@ if __name__ == "__main__":
     success = success and store.get_last_error() == 0
     f = store.get("x")
     success = success and f == 2 and store.get_last_error() == 0
+    store.remove("a")
+    success = success and store.get_last_error() == 0 and \
+        not store.is_in("a")
+    store.remove("a")
+    success = success and store.get_last_error() == 2
     store.clear()
     success = success and store.get_last_error() == 0
     store.add("a")
@@ -160,4 +428,59 @@ if __name__ == "__main__":
     success = success and store.is_in("a")
     success = success and {"a", "d"} == set(store.get_all().keys())
 
+    baseline = store.snapshot()
+    first = baseline.fork()
+    second = baseline.fork()
+    first.set("a", 5.0)
+    first.add("e")
+    second.set("d", 4.0)
+    second.set("x", 1.0)
+    success = success and second.get_last_error() == 2 and \
+        first.get("a") == 5.0 and first.get("d") == 4 and \
+        first.get("e") is None and first.get_last_error() == 3 and \
+        second.get("a") == 3 and not second.is_in("e") and \
+        store.get("a") == 3 and baseline.get_all() == {"a": 3, "d": 4} and \
+        first.get_changes() == {"a": 5.0, "e": None} and \
+        second.get_changes() == {} and \
+        dict(first.get_all()) == {"a": 5.0, "d": 4, "e": None}
+    values = second.get_all()
+    values["d"] = 4.0
+    values["a"] = 7.0
+    success = success and second.get_changes() == {"a": 7.0} and \
+        len(values) == 2 and list(values) == ["a", "d"] and "d" in values
+    values["a"] = 3
+    first.set("a", 3.0)
+    second.set("a", 0.0)
+    success = success and first.get_changes() == {"e": None}
+    zero = second.snapshot().fork()
+    zero.set("a", -0.0)
+    success = success and str(zero.get("a")) == "-0.0" and \
+        zero.get("d") == 4.0
+    zero.set("a", 0.0)
+    success = success and zero.get_changes() == {}
+    third = baseline.fork()
+    third.set("a", 7.0)
+    third.remove("a")
+    success = success and third.get_last_error() == 0 and \
+        not third.is_in("a") and third.get("a") is None and \
+        third.get_last_error() == 2 and "a" not in third.get_all() and \
+        dict(third.get_all()) == {"d": 4} and \
+        third.get_removed() == {"a"} and third.get_changes() == {} and \
+        dict(third.snapshot().get_all()) == {"d": 4} and \
+        baseline.get_all()["a"] == 3
+    third.remove("a")
+    third.set("a", 1.0)
+    success = success and third.get_last_error() == 2
+    third.add("a")
+    success = success and third.get_last_error() == 0 and \
+        third.get("a") is None and third.get_last_error() == 3 and \
+        third.get_removed() == set()
+    third.set("a", 3.0)
+    del third.get_all()["d"]
+    success = success and third.get_changes() == {} and \
+        list(third.get_all()) == ["a"] and not third.is_in("d")
+    first.clear()
+    success = success and first.get_changes() == {} and \
+        not first.is_in("a") and second.is_in("a")
+
     print("Success =", success)
@@ -0,0 +1,420 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для заміни частих послідовностей команд коду
+суперкомандами, які інтерпретатор виконує за один виклик.
+
+Можливі суперкоманди (CANDIDATES), де <OP> - ADD, SUB, MUL або DIV:
+(<OP>_VV, (x, y))  - LOADV x, LOADV y, <OP>
+(<OP>_VC, (x, c))  - LOADV x, LOADC c, <OP>
+(<OP>_CV, (c, x))  - LOADC c, LOADV x, <OP>
+(<OP>_V, x)        - LOADV x, <OP>
+(<OP>_C, c)        - LOADC c, <OP>
+(<OP>_SET, v)      - <OP>, SET v
+(LOADV_SET, (x, v)) - LOADV x, SET v
+(LOADC_SET, (c, v)) - LOADC c, SET v
+
+Суперкоманди обираються за профілем: count_patterns рахує,
+скільки викликів команд заощадила б кожна суперкоманда у коді,
+з урахуванням кількості виконань присвоєнь
+(profiler.ProfilingInterpreter.get_executions), а select_superinstructions
+залишає найвигідніші. Функція fuse (вічко, peephole) замінює послідовності
+команд обраними суперкомандами, переглядаючи код зліва направо
+та обираючи найдовшу послідовність.
+
+SuperInterpreter виконує код з суперкомандами так само, як Interpreter:
+результати та помилки такі самі, як для коду без суперкоманд.
+"""
+from functools import partial
+from operator import add, sub, mul, truediv
+
+from storage import Storage
+from interpreter import Interpreter
+
+# арифметичні команди та відповідні обчислення
+OPERATIONS = {"ADD": add,
+              "SUB": sub,
+              "MUL": mul,
+              "DIV": truediv}
+
+# команди завантаження, що передують арифметичній команді, для кожного
+# виду суперкоманди
+FORMS = {"VV": ("LOADV", "LOADV"),
+         "VC": ("LOADV", "LOADC"),
+         "CV": ("LOADC", "LOADV"),
+         "V": ("LOADV",),
+         "C": ("LOADC",)}
+
+# словник суперкоманда - послідовність команд, які вона замінює
+CANDIDATES = {command + "_" + form: loads + (command,)
+              for command in OPERATIONS for form, loads in FORMS.items()}
+CANDIDATES.update({command + "_SET": (command, "SET")
+                   for command in OPERATIONS})
+CANDIDATES.update({"LOADV_SET": ("LOADV", "SET"),
+                   "LOADC_SET": ("LOADC", "SET")})
+
+# найдовша послідовність команд суперкоманди
+LONGEST = max(len(sequence) for sequence in CANDIDATES.values())
+
+# команди, операнди яких стають операндами суперкоманди
+OPERAND_COMMANDS = ("LOADV", "LOADC", "SET")
+
+# найбільша кількість обраних суперкоманд
+MAX_SUPERINSTRUCTIONS = 12
+
+# найменша частка заощаджених викликів команд для обраної суперкоманди
+MIN_SHARE = 0.01
+
+
+def _match(code, index, sequences):
+    """
+    Функція шукає найдовшу послідовність sequences, з якої
+    починаються команди коду з номера index
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :param index: номер команди
+    :param sequences: словник послідовність команд - суперкоманда
+    :return: суперкоманда та довжина послідовності
+             або (None, 1), якщо послідовності немає
+    """
+    for length in range(min(LONGEST, len(code) - index), 1, -1):
+        name = sequences.get(tuple(command for command, _
+                                   in code[index:index + length]))
+        if name is not None:
+            return name, length
+    return None, 1
+
+
+def count_patterns(code, executions=None):
+    """
+    Функція рахує, скільки викликів команд заощадила б кожна суперкоманда
+    з CANDIDATES, якщо замінити ними код так само, як fuse.
+    Якщо задано executions, то кожна заміна враховується стільки разів,
+    скільки виконувалось її присвоєння
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :param executions: список кількостей виконань присвоєнь коду або None
+    :return: словник суперкоманда - кількість заощаджених викликів
+    """
+    sequences = {sequence: name for name, sequence in CANDIDATES.items()}
+    counts = {}
+    statement = 0
+    index = 0
+    while index < len(code):
+        name, length = _match(code, index, sequences)
+        if name is not None:
+            weight = 1
+            if executions is not None:
+                weight = executions[statement] \
+                    if statement < len(executions) else 0
+            counts[name] = counts.get(name, 0) + weight * (length - 1)
+        statement += sum(1 for command, _ in code[index:index + length]
+                         if command == "SET")
+        index += length
+    return counts
+
+
+def select_superinstructions(counts, total, limit=MAX_SUPERINSTRUCTIONS,
+                             min_share=MIN_SHARE):
+    """
+    Функція обирає не більше limit суперкоманд, кожна з яких заощаджує
+    не менше частки min_share від total викликів команд
+    :param counts: словник суперкоманда - кількість заощаджених викликів
+                   (сума результатів count_patterns для програм)
+    :param total: кількість викликів команд без суперкоманд
+    :param limit: найбільша кількість суперкоманд
+    :param min_share: найменша частка заощаджених викликів
+    :return: список суперкоманд за спаданням заощаджених викликів
+    """
+    chosen = sorted((name for name, count in counts.items()
+                     if count > 0 and count >= min_share * total),
+                    key=lambda name: (-counts[name], name))
+    return chosen[:limit]
+
+
+def fuse(code, names=None):
+    """
+    Функція замінює послідовності команд коду суперкомандами names
+    (за замовчуванням - усіма CANDIDATES)
+    :param code: список команд - кортежів (<код_команди>, <операнд>)
+    :param names: список суперкоманд або None
+    :return: новий список команд
+    :return: кількість вилучених команд
+    """
+    if names is None:
+        names = CANDIDATES
+    sequences = {CANDIDATES[name]: name for name in names}
+    result = []
+    index = 0
+    while index < len(code):
+        name, length = _match(code, index, sequences)
+        if name is None:
+            result.append(code[index])
+        else:
+            operands = tuple(operand for command, operand
+                             in code[index:index + length]
+                             if command in OPERAND_COMMANDS)
+            result.append((name, operands[0] if len(operands) == 1
+                           else operands))
+        index += length
+    return result, len(code) - len(result)
+
+
+class SuperInterpreter(Interpreter):
+    """
+    Інтерпретатор коду з суперкомандами names
+    (за замовчуванням - усіма CANDIDATES)
+    """
+    def __init__(self, code, storage, names=None):
+        fused, _ = fuse(code, names)
+        Interpreter.__init__(self, fused, storage)
+        self._source = code         # код без суперкоманд
+
+        handlers = {"VV": self._binary_vv,
+                    "VC": self._binary_vc,
+                    "CV": self._binary_cv,
+                    "V": self._binary_v,
+                    "C": self._binary_c,
+                    "SET": self._binary_set}
+        for command, operation in OPERATIONS.items():
+            for form, handler in handlers.items():
+                self._command_funcs[command + "_" + form] = \
+                    partial(handler, operation)
+        self._command_funcs["LOADV_SET"] = self._loadv_set
+        self._command_funcs["LOADC_SET"] = self._loadc_set
+
+    def get_fused_code(self):
+        """
+        Метод повертає код з суперкомандами, який виконує інтерпретатор
+        :return: список команд - кортежів (<код_команди>, <операнд>)
+        """
+        return self._code
+
+    def _fetch(self, variable):
+        """
+        Метод повертає значення змінної з пам'яті так само, як _loadv,
+        але не додає його у стек. Значення визначеної змінної
+        читається одним викликом storage.get.
+        Якщо змінної не існує, то встановлює відповідну помилку
+        :param variable: ім'я змінної
+        :return: значення або None, якщо змінної не існує
+        """
+        value = self._storage.get(variable)
+        if value is not None:
+            return value
+        if not self._storage.is_in(variable):
+            self._last_error = 2
+            return None
+
+        self._storage.input_var(variable)
+        return self._storage.get(variable)
+
+    def _binary_vv(self, operation, operand):
+        """
+        Метод виконує суперкоманду <OP>_VV: операцію над значеннями
+        двох змінних.
+        Побічний ефект: змінює значення _last_error
+        :param operation: функція операції з OPERATIONS
+        :param operand: кортеж (<змінна>, <змінна>)
+        :return: None
+        """
+        first = self._fetch(operand[0])
+        if first is None:
+            return
+        second = self._fetch(operand[1])
+        if second is None:
+            return
+        if second == 0 and operation is truediv:
+            self._last_error = 3
+            return
+
+        self._last_error = 0
+        self._stack.append(operation(first, second))
+
+    def _binary_vc(self, operation, operand):
+        """
+        Метод виконує суперкоманду <OP>_VC: операцію над значенням
+        змінної та числом.
+        Побічний ефект: змінює значення _last_error
+        :param operation: функція операції з OPERATIONS
+        :param operand: кортеж (<змінна>, <число>)
+        :return: None
+        """
+        first = self._fetch(operand[0])
+        if first is None:
+            return
+        if operand[1] == 0 and operation is truediv:
+            self._last_error = 3
+            return
+
+        self._last_error = 0
+        self._stack.append(operation(first, operand[1]))
+
+    def _binary_cv(self, operation, operand):
+        """
+        Метод виконує суперкоманду <OP>_CV: операцію над числом
+        та значенням змінної.
+        Побічний ефект: змінює значення _last_error
+        :param operation: функція операції з OPERATIONS
+        :param operand: кортеж (<число>, <змінна>)
+        :return: None
+        """
+        second = self._fetch(operand[1])
+        if second is None:
+            return
+        if second == 0 and operation is truediv:
+            self._last_error = 3
+            return
+
+        self._last_error = 0
+        self._stack.append(operation(operand[0], second))
+
+    def _binary_v(self, operation, variable):
+        """
+        Метод виконує суперкоманду <OP>_V: операцію над останнім
+        елементом стеку та значенням змінної.
+        Побічний ефект: змінює значення _last_error
+        :param operation: функція операції з OPERATIONS
+        :param variable: ім'я змінної
+        :return: None
+        """
+        second = self._fetch(variable)
+        if second is None:
+            return
+        if second == 0 and operation is truediv:
+            self._last_error = 3
+            return
+
+        self._last_error = 0
+        self._stack[-1] = operation(self._stack[-1], second)
+
+    def _binary_c(self, operation, number):
+        """
+        Метод виконує суперкоманду <OP>_C: операцію над останнім
+        елементом стеку та числом.
+        Побічний ефект: змінює значення _last_error
+        :param operation: функція операції з OPERATIONS
+        :param number: число
+        :return: None
+        """
+        if number == 0 and operation is truediv:
+            self._last_error = 3
+            return
+
+        self._last_error = 0
+        self._stack[-1] = operation(self._stack[-1], number)
+
+    def _binary_set(self, operation, variable):
+        """
+        Метод виконує суперкоманду <OP>_SET: операцію над двома
+        останніми елементами стеку та встановлює значення змінної
+        рівним результату.
+        Побічний ефект: змінює значення _last_error
+        :param operation: функція операції з OPERATIONS
+        :param variable: ім'я змінної
+        :return: None
+        """
+        second = self._stack.pop()
+        if second == 0 and operation is truediv:
+            self._last_error = 3
+            return
+
+        self._stack[-1] = operation(self._stack[-1], second)
+        self._set(variable)
+
+    def _loadv_set(self, operand):
+        """
+        Метод виконує суперкоманду LOADV_SET: встановлює значення змінної
+        рівним значенню іншої змінної
+        :param operand: кортеж (<змінна>, <змінна, якій присвоюється>)
+        :return: None
+        """
+        value = self._fetch(operand[0])
+        if value is None:
+            return
+        self._stack.append(value)
+        self._set(operand[1])
+
+    def _loadc_set(self, operand):
+        """
+        Метод виконує суперкоманду LOADC_SET: встановлює значення змінної
+        рівним числу
+        :param operand: кортеж (<число>, <змінна, якій присвоюється>)
+        :return: None
+        """
+        self._stack.append(operand[0])
+        self._set(operand[1])
+
+
+if __name__ == "__main__":
+    from code_generator import CodeGenerator
+    from profiler import ProfilingInterpreter
+
+    lines = ["x = 1",
+             "y = a",
+             "t = (x + y) * (x * 2 + 3 * y) - (y - x) / 4",
+             "z = t / (y - 2 * x)"]
+    storage = Storage()
+    code, error = CodeGenerator(lines, storage).generate_code()
+    fused, removed = fuse(code)
+    success = fused == [("LOADC_SET", (1.0, "x")),
+                        ("LOADV_SET", ("a", "y")),
+                        ("ADD_VV", ("x", "y")),
+                        ("MUL_VC", ("x", 2.0)),
+                        ("MUL_CV", (3.0, "y")),
+                        ("ADD", None),
+                        ("MUL", None),
+                        ("SUB_VV", ("y", "x")),
+                        ("DIV_C", 4.0),
+                        ("SUB_SET", "t"),
+                        ("LOADV", "t"),
+                        ("LOADV", "y"),
+                        ("MUL_CV", (2.0, "x")),
+                        ("SUB", None),
+                        ("DIV_SET", "z")] and removed == len(code) - 15
+
+    profiler = ProfilingInterpreter(code, storage)
+    storage.set("a", 3.0)
+    success = success and profiler.execute() == 0
+    counts = count_patterns(code, profiler.get_executions())
+    success = success and counts == count_patterns(code) and \
+        counts["MUL_CV"] == 4 and counts["LOADV_SET"] == 1 and \
+        select_superinstructions(counts, len(code), limit=2) == \
+        ["MUL_CV", "ADD_VV"] and \
+        select_superinstructions(counts, len(code), min_share=0.1) == \
+        ["MUL_CV"]
+    success = success and \
+        fuse(code, ["MUL_CV", "MUL_C"])[0][7:9] == \
+        [("LOADV", "x"), ("MUL_C", 2.0)]
+
+    expected = dict(storage.get_all())
+    for names in (None, ["MUL_CV", "ADD_VV"], []):
+        storage.set("a", 2.0)
+        interpreter = SuperInterpreter(code, storage, names)
+        success = success and interpreter.execute() == 3 and \
+            interpreter.get_value("t") == 23.75 and \
+            interpreter.get_value("z") == expected["z"]
+        storage.set("a", 3.0)
+        success = success and interpreter.execute() == 0 and \
+            storage.get_all() == expected
+
+    for line in ("x = y", "x = 2", "x = b + 1", "x = 1 / b", "x = b - y",
+                 "x = 2 * b", "x = y / (b - 1)", "x = (y - 1) / (b - 1)"):
+        results = []
+        for interpreter_class in (Interpreter, SuperInterpreter):
+            storage = Storage()
+            code, error = CodeGenerator(["y = 1", line],
+                                        storage).generate_code()
+            storage.set("b", 1.0)
+            interpreter = interpreter_class(code, storage)
+            results.append((interpreter.execute(), storage.get_all()))
+        success = success and results[0] == results[1]
+
+    code = [("LOADC", 1.0), ("SET", "x"), ("LOADV", "q"), ("SET", "x")]
+    storage = Storage()
+    storage.add("x")
+    interpreter = SuperInterpreter(code, storage)
+    success = success and interpreter.execute() == 2 and \
+        storage.get("x") == 1.0 and \
+        SuperInterpreter([("LOADC", 1.0), ("XXX", None)],
+                         storage).execute() == 1
+
+    print("Success =", success)
@@ -28,6 +28,9 @@
 Метод check_assignment_syntax за заданим списком токенів
 для присвоєння має повернути
 булівське значення та (можливо) помилку.
+
+Клас ExpressionChecker виконує ту саму перевірку виразу, отримуючи токени
+по одному, тому може працювати з потоком токенів без побудови їх списку.
 """
 from tokenizer import Token, get_tokens
 
@@ -102,6 +105,67 @@ class SyntaxAnalyzer:
     
         return next_tok.type in VALID_PAIRS[tok.type]
 
+class ExpressionChecker:
+    """
+    Покрокова перевірка синтаксичної правильності виразу.
+    Токени виразу передаються по одному методом feed,
+    результат перевірки повертає метод finish.
+    Помилки та їх пріоритет такі самі, як у
+    SyntaxAnalyzer.check_expression_syntax
+    """
+    def __init__(self):
+        self._prev = Token("left_paren", "(")   # попередній токен
+        self._count = 0                         # кількість токенів виразу
+        self._depth = 1                         # глибина вкладеності дужок
+        self._parens_ok = True                  # чи не було зайвих ')'
+        self._pair_error = ""                   # перша недопустима пара
+
+    def feed(self, tok):
+        """
+        Метод перевіряє наступний токен виразу
+        :param tok: токен
+        :return: None
+        """
+        self._count += 1
+        self._check(tok)
+
+    def finish(self):
+        """
+        Метод завершує перевірку виразу.
+        Повертає булівське значення та рядок помилки.
+        Якщо помилки немає, то повертає порожній рядок
+        :return: sucess - булівське значення
+        :return: error - рядок помилки
+        """
+        if not self._count:
+            return False, ERRORS["empty_expr"]
+
+        self._check(Token("right_paren", ")"))
+        if not self._parens_ok or self._depth != 0:
+            return False, ERRORS["incorrect_parens"]
+        if self._pair_error:
+            return False, self._pair_error
+        return True, ""
+
+    def _check(self, tok):
+        """
+        Метод враховує токен у глибині дужок та перевіряє пару
+        (попередній токен, tok), якщо недопустимої пари ще не знайдено
+        :param tok: токен
+        :return: None
+        """
+        if tok.type == "left_paren":
+            self._depth += 1
+        elif tok.type == "right_paren":
+            self._depth -= 1
+        if self._depth < 0:
+            self._parens_ok = False
+
+        if not self._pair_error and tok.type not in VALID_PAIRS[self._prev.type]:
+            self._pair_error = ERRORS["invalid_pair"].format(self._prev, tok)
+        self._prev = tok
+
+
 if __name__ == "__main__":
     analyzer = SyntaxAnalyzer(get_tokens("(((ab1_ - 345.56)(*/.2{_cde23"))
     success1, error1 = analyzer.check_expression_syntax()
@@ -131,4 +195,13 @@ if __name__ == "__main__":
         success7 and error7 == ""
     )
 
+    for string in ("(((ab1_ - 345.56)(*/.2{_cde23", "(ab1_ - 345.56)*/.2_cde23",
+                   " - 345.56*/.2_cde23", "2 - 345.56 *", "2 - .2", "   ",
+                   "((abc -3 * b2) + d5 / 7)", "a) + (b", ")a(", "a = b"):
+        checker = ExpressionChecker()
+        for token in get_tokens(string):
+            checker.feed(token)
+        success = success and checker.finish() == \
+            SyntaxAnalyzer(get_tokens(string)).check_expression_syntax()
+
     print("Success =", success)
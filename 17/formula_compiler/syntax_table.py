@@ -0,0 +1,172 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для перевірки синтаксичної правильності виразу
+за таблицею допустимих пар токенів.
+
+Типи токенів замінюються малими цілими числами (TYPE_CODES),
+а словник VALID_PAIRS - таблицею PAIR_TABLE, у якій для пари кодів
+(<код попереднього>, <код наступного>) з номером
+<код попереднього> * TYPE_COUNT + <код наступного> записано 1,
+якщо пара допустима, і 0 - якщо ні. Для кожного типу також є
+бітова маска допустимих наступних типів (VALID_MASKS).
+
+Функція check_codes перевіряє масив кодів виразу (з дужками навколо нього):
+пари сусідніх кодів перетворюються у ознаки допустимості за словником
+PAIR_VALID, а глибина дужок - це накопичена сума змін глибини.
+Цикли виконуються вбудованими функціями map, zip та accumulate.
+Функція check_codes_numpy робить ту саму перевірку векторними операціями
+NumPy: таблиця індексується одразу усіма парами сусідніх кодів,
+а глибина дужок - це накопичена сума.
+
+TableSyntaxAnalyzer повертає ті самі помилки у тому ж порядку пріоритету,
+що й SyntaxAnalyzerExt.
+"""
+from array import array
+from itertools import accumulate, islice
+from operator import attrgetter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from tokenizer import Token, get_tokens
+from syntax_analyzer import VALID_PAIRS
+from syntax_analyzer_ext import SyntaxAnalyzerExt, ERRORS
+
+# типи токенів у порядку їх кодів
+TYPES = ("variable", "constant", "operation", "left_paren", "right_paren",
+         "other", "equal")
+TYPE_CODES = {token_type: code for code, token_type in enumerate(TYPES)}
+TYPE_COUNT = len(TYPES)
+LEFT_PAREN = TYPE_CODES["left_paren"]
+RIGHT_PAREN = TYPE_CODES["right_paren"]
+
+# бітові маски допустимих наступних типів для кожного типу
+VALID_MASKS = tuple(sum(1 << TYPE_CODES[next_type]
+                        for next_type in VALID_PAIRS.get(token_type, ()))
+                    for token_type in TYPES)
+
+# таблиця допустимих пар: 1 - допустима, 0 - недопустима
+PAIR_TABLE = bytes((VALID_MASKS[first] >> second) & 1
+                   for first in range(TYPE_COUNT)
+                   for second in range(TYPE_COUNT))
+
+# словник пара кодів - ознака допустимості пари (1 або 0)
+PAIR_VALID = {(first, second): PAIR_TABLE[first * TYPE_COUNT + second]
+              for first in range(TYPE_COUNT)
+              for second in range(TYPE_COUNT)}
+
+# зміна глибини дужок для кожного типу
+DEPTH_CHANGE = tuple(1 if code == LEFT_PAREN else -1 if code == RIGHT_PAREN
+                     else 0 for code in range(TYPE_COUNT))
+
+
+def encode_types(tokens):
+    """
+    Функція повертає масив кодів типів токенів виразу
+    разом з дужками навколо виразу
+    :param tokens: список токенів
+    :return: масив array('B')
+    """
+    codes = array('B', [LEFT_PAREN])
+    codes.extend(map(TYPE_CODES.__getitem__, map(attrgetter("type"), tokens)))
+    codes.append(RIGHT_PAREN)
+    return codes
+
+
+def check_codes(codes):
+    """
+    Функція перевіряє масив кодів типів токенів виразу з дужками
+    навколо нього.
+    Повертає ознаку правильності дужок та номер першого токена
+    недопустимої пари або -1, якщо таких пар немає
+    :param codes: масив кодів
+    :return: булівське значення
+    :return: номер токена
+    """
+    depths = list(accumulate(map(DEPTH_CHANGE.__getitem__, codes)))
+    valid = bytes(map(PAIR_VALID.__getitem__,
+                      zip(codes, islice(codes, 1, None))))
+    return min(depths) >= 0 and depths[-1] == 0, valid.find(0)
+
+
+def check_codes_numpy(codes):
+    """
+    Функція перевіряє масив кодів так само, як check_codes,
+    векторними операціями NumPy
+    :param codes: масив кодів
+    :return: булівське значення
+    :return: номер токена
+    """
+    codes = np.frombuffer(codes, dtype=np.uint8)
+    depth = np.cumsum(np.take(_DEPTH_ARRAY, codes))
+    parens_ok = bool(depth.min() >= 0) and int(depth[-1]) == 0
+    valid = np.take(_PAIR_ARRAY, codes[:-1].astype(np.intp) * TYPE_COUNT +
+                    codes[1:])
+    invalid = int(np.argmin(valid)) if not valid.all() else -1
+    return parens_ok, invalid
+
+
+if np is not None:
+    _PAIR_ARRAY = np.frombuffer(PAIR_TABLE, dtype=np.uint8)
+    _DEPTH_ARRAY = np.array(DEPTH_CHANGE, dtype=np.int64)
+
+
+class TableSyntaxAnalyzer(SyntaxAnalyzerExt):
+    """
+    Перевірка синтаксису за таблицею допустимих пар.
+    Якщо vectorized, то перевірка виконується за допомогою NumPy
+    """
+    def __init__(self, tokens, vectorized=False):
+        SyntaxAnalyzerExt.__init__(self, tokens)
+        self._check = check_codes_numpy if vectorized else check_codes
+
+    def check_expression_syntax(self):
+        """
+        Метод перевіряє синтаксичну правильність виразу за списком токенів
+        так само, як SyntaxAnalyzer.check_expression_syntax
+        :return: sucess - булівське значення
+        :return: error - рядок помилки
+        """
+        if not self._tokens:
+            return False, ERRORS["empty_expr"]
+
+        parens_ok, invalid = self._check(encode_types(self._tokens))
+        if not parens_ok:
+            return False, ERRORS["incorrect_parens"]
+        if invalid >= 0:
+            tokens = [Token("left_paren", "(")] + self._tokens + \
+                [Token("right_paren", ")")]
+            return False, ERRORS["invalid_pair"].format(tokens[invalid],
+                                                        tokens[invalid + 1])
+        return True, ""
+
+
+if __name__ == "__main__":
+    success = VALID_MASKS[TYPE_CODES["other"]] == 0 and \
+        PAIR_TABLE[TYPE_CODES["variable"] * TYPE_COUNT +
+                   TYPE_CODES["operation"]] == 1 and \
+        PAIR_TABLE[TYPE_CODES["operation"] * TYPE_COUNT +
+                   TYPE_CODES["operation"]] == 0
+
+    checks = [False] if np is None else [False, True]
+    for string in ("(((ab1_ - 345.56)(*/.2{_cde23", "(ab1_ - 345.56)*/.2_cde23",
+                   " - 345.56*/.2_cde23", "2 - 345.56 *", "2 - .2", "   ",
+                   "((abc -3 * b2) + d5 / 7)", "a) + (b", ")a(", "a = b",
+                   "a", "(a)", "a + (b", "x = a + b", "x = ", "x + y",
+                   "x = a = b", "x = (a) (b)"):
+        tokens = get_tokens(string)
+        expected = SyntaxAnalyzerExt(tokens).check_expression_syntax()
+        expected_assignment = \
+            SyntaxAnalyzerExt(tokens).check_assignment_syntax()
+        for vectorized in checks:
+            analyzer = TableSyntaxAnalyzer(tokens, vectorized)
+            success = success and \
+                analyzer.check_expression_syntax() == expected
+            analyzer = TableSyntaxAnalyzer(tokens, vectorized)
+            success = success and \
+                analyzer.check_assignment_syntax() == expected_assignment
+
+    print("Success =", success)
@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Модуль призначено для компактного представлення токенів програми.
+
+TokenArray зберігає токени усієї програми не як список кортежів Token
+з рядками типу та значення, а як паралельні масиви:
+    коди типів токенів (syntax_table.TYPE_CODES) - array('B'),
+    позиції початку токенів у тексті програми - array('l'),
+    довжини токенів - array('l').
+Рядки програми об'єднуються в один текст (кожен рядок закінчується '\\n'),
+а масив _lines містить номер першого токена кожного рядка.
+Значення токена вирізається з тексту лише за запитом (value),
+а константа перетворюється у число один раз для кожного тексту константи
+(number).
+
+Текст з ASCII символів розбирається регулярним виразом LINE_TOKEN_REGEX
+(TOKEN_REGEX, у якому '\\n' розділяє рядки), інші рядки -
+курсором tokenizer._scan_cursor, тому токени такі самі, як у scan_tokens.
+
+ArraySyntaxAnalyzer перевіряє рядок програми за кодами типів
+(syntax_table.check_codes) з тими ж помилками, що й SyntaxAnalyzerExt.
+Об'єкти Token створюються лише для тексту помилки.
+"""
+import re
+from array import array
+
+from tokenizer import Token, TOKEN_TYPES, get_tokens, scan_tokens, \
+    _scan_cursor
+from syntax_analyzer_ext import SyntaxAnalyzerExt, ERRORS
+from syntax_table import TYPES, TYPE_CODES, LEFT_PAREN, RIGHT_PAREN, \
+    check_codes
+
+VARIABLE = TYPE_CODES["variable"]
+CONSTANT = TYPE_CODES["constant"]
+OPERATION = TYPE_CODES["operation"]
+EQUAL = TYPE_CODES["equal"]
+
+# коди типів токенів, що складаються з одного символа
+CHAR_CODES = {char: TYPE_CODES[token_type]
+              for char, token_type in TOKEN_TYPES.items()}
+
+# регулярний вираз для розбору тексту програми з ASCII символів,
+# група newline відповідає кінцю рядка програми
+LINE_TOKEN_REGEX = re.compile(r"""
+    [\t\x0b\x0c\r\x1c-\x1f ]*
+    (?:
+        (?P<constant>\d+(?:\.\d*){0,2})
+      | (?P<variable>[^\W\d]\w*)
+      | (?P<fixed>[-+*/()=])
+      | (?P<newline>\n)
+      | (?P<other>[^\s\x1c-\x1f])
+    )
+    """, re.VERBOSE | re.ASCII)
+
+# дужки, у які перевірка синтаксису обгортає вираз
+OPEN_PAREN = Token("left_paren", "(")
+CLOSE_PAREN = Token("right_paren", ")")
+
+
+class TokenArray:
+    """
+    Токени програми у вигляді паралельних масивів.
+    Рядки програми не повинні містити символів '\\n'
+    """
+    def __init__(self, program_lines):
+        self._source = "".join(line + "\n" for line in program_lines)
+                                        # текст програми
+        self._types = array('B')        # коди типів токенів
+        self._starts = array('l')       # позиції токенів у тексті
+        self._lengths = array('l')      # довжини токенів
+        self._lines = array('l', [0])   # номери перших токенів рядків
+                                        # та кількість токенів
+        self._numbers = {}              # словник текст константи - число
+        if self._source.isascii():
+            self._scan()
+        else:
+            self._scan_lines()
+
+    def _scan(self):
+        """
+        Метод розбирає текст програми з ASCII символів
+        регулярним виразом LINE_TOKEN_REGEX
+        :return: None
+        """
+        types = self._types
+        starts = self._starts
+        lengths = self._lengths
+        for match in LINE_TOKEN_REGEX.finditer(self._source):
+            group = match.lastgroup
+            if group == "newline":
+                self._lines.append(len(types))
+                continue
+            start, end = match.span(group)
+            if group == "fixed":
+                types.append(CHAR_CODES[self._source[start]])
+            else:
+                types.append(TYPE_CODES[group])
+            starts.append(start)
+            lengths.append(end - start)
+
+    def _scan_lines(self):
+        """
+        Метод розбирає текст програми по рядках курсором _scan_cursor
+        :return: None
+        """
+        offset = 0
+        for line in self._source.split("\n")[:-1]:
+            for start, token in _scan_cursor(line):
+                self._types.append(TYPE_CODES[token.type])
+                self._starts.append(offset + start)
+                self._lengths.append(len(token.value))
+            self._lines.append(len(self._types))
+            offset += len(line) + 1
+
+    def __len__(self):
+        return len(self._types)
+
+    def line_count(self):
+        """
+        Метод повертає кількість рядків програми
+        :return: кількість рядків
+        """
+        return len(self._lines) - 1
+
+    def line_range(self, line):
+        """
+        Метод повертає номери першого токена рядка line (від 0)
+        та токена після останнього
+        :param line: номер рядка
+        :return: номер першого токена
+        :return: номер токена після останнього
+        """
+        return self._lines[line], self._lines[line + 1]
+
+    def get_types(self):
+        """
+        Метод повертає масив кодів типів токенів
+        :return: масив array('B')
+        """
+        return self._types
+
+    def value(self, index):
+        """
+        Метод повертає значення токена з номером index
+        :param index: номер токена
+        :return: рядок
+        """
+        start = self._starts[index]
+        return self._source[start:start + self._lengths[index]]
+
+    def number(self, index):
+        """
+        Метод повертає значення константи з номером index у вигляді
+        дійсного числа. Якщо текст константи не є числом, то
+        піднімає ValueError, як і float
+        :param index: номер токена
+        :return: дійсне число
+        """
+        text = self.value(index)
+        number = self._numbers.get(text)
+        if number is None:
+            number = self._numbers[text] = float(text)
+        return number
+
+    def token(self, index):
+        """
+        Метод повертає токен з номером index у вигляді Token
+        :param index: номер токена
+        :return: токен Token
+        """
+        return Token(TYPES[self._types[index]], self.value(index))
+
+    def get_tokens(self, start, end):
+        """
+        Метод повертає список токенів Token з номерами від start до end
+        :param start: номер першого токена
+        :param end: номер токена після останнього
+        :return: список токенів
+        """
+        return [self.token(index) for index in range(start, end)]
+
+    def get_size(self):
+        """
+        Метод повертає кількість байтів, які займають масиви токенів
+        :return: кількість байтів
+        """
+        return sum(len(items) * items.itemsize for items in
+                   (self._types, self._starts, self._lengths, self._lines))
+
+
+class ArraySyntaxAnalyzer:
+    """
+    Перевірка синтаксису рядка програми за кодами типів TokenArray.
+    Методи повертають ті самі результати, що й методи SyntaxAnalyzerExt
+    для списку токенів рядка
+    """
+    def __init__(self, tokens, line):
+        self._tokens = tokens                           # токени програми
+        self._start, self._end = tokens.line_range(line)
+                                                        # межі рядка
+
+    def check_expression_syntax(self, start=None):
+        """
+        Метод перевіряє синтаксичну правильність виразу з токенів рядка,
+        починаючи з токена start (за замовчуванням - з початку рядка)
+        :param start: номер першого токена виразу або None
+        :return: sucess - булівське значення
+        :return: error - рядок помилки
+        """
+        if start is None:
+            start = self._start
+        end = self._end
+        if start >= end:
+            return False, ERRORS["empty_expr"]
+
+        codes = array('B', [LEFT_PAREN])
+        codes += self._tokens.get_types()[start:end]
+        codes.append(RIGHT_PAREN)
+        parens_ok, invalid = check_codes(codes)
+        if not parens_ok:
+            return False, ERRORS["incorrect_parens"]
+        if invalid >= 0:
+            return False, ERRORS["invalid_pair"].format(
+                self._wrapped_token(start, invalid),
+                self._wrapped_token(start, invalid + 1))
+        return True, ""
+
+    def check_assignment_syntax(self):
+        """
+        Метод перевіряє синтаксичну правильність присвоєння з токенів рядка
+        :return: sucess - булівське значення
+        :return: error - рядок помилки
+        """
+        types = self._tokens.get_types()
+        start = self._start
+        if self._end - start < 2 or types[start] != VARIABLE or \
+                types[start + 1] != EQUAL:
+            return False, ERRORS["incorrect_assignment"]
+        return self.check_expression_syntax(start + 2)
+
+    def _wrapped_token(self, start, position):
+        """
+        Метод повертає токен з номером position у виразі, що починається
+        з токена start, з дужками навколо виразу
+        :param start: номер першого токена виразу
+        :param position: номер токена у виразі з дужками
+        :return: токен Token
+        """
+        if position == 0:
+            return OPEN_PAREN
+        if start + position - 1 == self._end:
+            return CLOSE_PAREN
+        return self._tokens.token(start + position - 1)
+
+
+if __name__ == "__main__":
+    lines = ["x = (a + b)",
+             "",
+             "  y1 = 1.2.3.4 + 5.. * _z / (t) ;  ",
+             "(((ab1_ - 345.56)(*/.2{_cde23",
+             "x = 2 * 2.0 + 2"]
+    tokens = TokenArray(lines)
+    success = tokens.line_count() == 5 and \
+        tokens.get_tokens(0, len(tokens)) == \
+        [token for line in lines for token in scan_tokens(line)]
+    for line, string in enumerate(lines):
+        start, end = tokens.line_range(line)
+        success = success and tokens.get_tokens(start, end) == \
+            scan_tokens(string)
+
+    start, end = tokens.line_range(4)
+    success = success and tokens.value(start) == "x" and \
+        tokens.number(start + 2) == 2.0 and tokens.number(start + 4) == 2.0 \
+        and tokens.number(end - 1) == 2.0 and len(tokens._numbers) == 2
+    try:
+        tokens.number(tokens.line_range(2)[0] + 2)
+        success = False
+    except ValueError:
+        pass
+
+    lines = ["змінна = 2 * ab² + x½ - 3", "x = a"]
+    tokens = TokenArray(lines)
+    success = success and tokens.line_count() == 2 and \
+        tokens.get_tokens(0, len(tokens)) == \
+        scan_tokens(lines[0]) + scan_tokens(lines[1])
+
+    lines = ["{\x1c1*", "\x1dx\x1e=\x1f(a\x0b+\x0cb)\r\t", "\x1f"]
+    tokens = TokenArray(lines)
+    for line, string in enumerate(lines):
+        start, end = tokens.line_range(line)
+        success = success and tokens.get_tokens(start, end) == \
+            get_tokens(string)
+
+    lines = ["(((ab1_ - 345.56)(*/.2{_cde23", "(ab1_ - 345.56)*/.2_cde23",
+             " - 345.56*/.2_cde23", "2 - 345.56 *", "2 - .2", "   ",
+             "((abc -3 * b2) + d5 / 7)", "a) + (b", ")a(", "a = b",
+             "a", "(a)", "a + (b", "x = a + b", "x = ", "x + y",
+             "x = a = b", "x = (a) (b)", "x = a +", "x = (a"]
+    tokens = TokenArray(lines)
+    for line, string in enumerate(lines):
+        expected = SyntaxAnalyzerExt(scan_tokens(string))
+        analyzer = ArraySyntaxAnalyzer(tokens, line)
+        success = success and analyzer.check_expression_syntax() == \
+            expected.check_expression_syntax() and \
+            analyzer.check_assignment_syntax() == \
+            SyntaxAnalyzerExt(scan_tokens(string)).check_assignment_syntax()
+
+    print("Success =", success)
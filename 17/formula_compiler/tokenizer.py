@@ -17,8 +17,19 @@ x = a + b
 Функція get_tokens за заданим виразом має повертати
 послідовність лексем - токенів
 Кожний токен - це кортеж: (<тип токену>, <значення токену>)
+
+Функція scan_tokens повертає той самий список токенів, але розбирає рядок
+за один прохід: курсор рухається по вихідному рядку, і залишок рядка
+не копіюється після кожного токена (get_tokens має квадратичну складність
+від довжини рядка, scan_tokens - лінійну).
+
+Функція-генератор iter_tokens повертає токени програми по одному разом
+з номером рядка та стовпчика, читаючи рядки з файлу по мірі потреби.
+Клас TokenCursor дозволяє переглянути один наступний токен рядка
+без його вилучення з потоку.
 """
 
+import re
 from collections import namedtuple
 
 # типи токенів
@@ -42,6 +53,25 @@ TOKEN_TYPES = {"+": "operation",
 # тип токена
 Token = namedtuple('Token', ['type', 'value'])
 
+# токен з позицією у програмі (рядки та стовпчики нумеруються з 1)
+LocatedToken = namedtuple('LocatedToken', ['token', 'line', 'column'])
+
+# регулярний вираз для розбору рядка з ASCII символів за один прохід.
+# Альтернативи відповідають функціям _get_constant, _get_variable,
+# словнику TOKEN_TYPES та токену "other" (будь-який інший символ).
+# Пропуски - ті ж символи, що відкидає str.strip: у режимі ASCII \s
+# не містить роздільників \x1c-\x1f, тому вони додані до пропусків
+# і виключені з токена "other"
+TOKEN_REGEX = re.compile(r"""
+    [\s\x1c-\x1f]*
+    (?:
+        (?P<constant>\d+(?:\.\d*){0,2})
+      | (?P<variable>[^\W\d]\w*)
+      | (?P<fixed>[-+*/()=])
+      | (?P<other>[^\s\x1c-\x1f])
+    )
+    """, re.VERBOSE | re.ASCII)
+
 
 def get_tokens(string):
     """
@@ -128,6 +158,147 @@ def _get_variable(string):
     return string[:i], string[i:]
 
 
+def scan_tokens(string):
+    """
+    Функція за рядком повертає список токенів типу Token,
+    такий самий, як і get_tokens, але за один прохід по рядку
+    :param string: рядок
+    :return: список токенів
+    """
+    return [token for _, token in _scan(string)]
+
+
+def _scan(string):
+    """
+    Функція-генератор повертає пари (<позиція токена у рядку>, <токен>).
+    Рядок з ASCII символів розбирається регулярним виразом TOKEN_REGEX,
+    інші рядки - курсором _scan_cursor
+    :param string: рядок
+    :return: ітератор пар (позиція, токен)
+    """
+    if not string.isascii():
+        yield from _scan_cursor(string)
+        return
+
+    for match in TOKEN_REGEX.finditer(string):
+        group = match.lastgroup
+        value = match.group(group)
+        if group == "fixed":
+            yield match.start(group), Token(TOKEN_TYPES[value], value)
+        else:
+            yield match.start(group), Token(group, value)
+
+
+def _scan_cursor(string):
+    """
+    Функція-генератор повертає пари (<позиція токена у рядку>, <токен>),
+    рухаючи індекс по рядку string без копіювання його залишку.
+    Використовує ті ж перевірки символів, що й _get_constant та _get_variable,
+    тому правильно обробляє не ASCII літери та цифри
+    :param string: рядок
+    :return: ітератор пар (позиція, токен)
+    """
+    n = len(string)
+    i = 0
+    while i < n:
+        c = string[i]
+        if c.isspace():
+            i += 1
+            continue
+
+        start = i
+        if c in TOKEN_TYPES:
+            i += 1
+            yield start, Token(TOKEN_TYPES[c], c)
+        elif c.isdigit():
+            k = 0
+            i += 1
+            while i < n:
+                c = string[i]
+                if not c.isdigit() and c != '.' or c == '.' and k > 1:
+                    break
+                if c == '.':
+                    k += 1
+                i += 1
+            yield start, Token("constant", string[start:i])
+        elif c.isalpha() or c == '_':
+            i += 1
+            while i < n and (string[i].isalnum() or string[i] == '_'):
+                i += 1
+            yield start, Token("variable", string[start:i])
+        else:
+            i += 1
+            yield start, Token("other", c)
+
+
+def iter_tokens(source):
+    """
+    Функція-генератор повертає токени програми по одному
+    у вигляді LocatedToken(<токен>, <номер рядка>, <номер стовпчика>).
+    source - текст програми або файл (будь-який ітератор рядків),
+    рядки читаються по одному, тому список усіх токенів не будується
+    :param source: рядок програми або ітератор рядків
+    :return: ітератор токенів LocatedToken
+    """
+    if isinstance(source, str):
+        source = source.splitlines()
+    for line_no, line in enumerate(source, 1):
+        for start, token in _scan(line):
+            yield LocatedToken(token, line_no, start + 1)
+
+
+class TokenCursor:
+    """
+    Курсор з випередженням на один токен над потоком LocatedToken.
+    Курсор працює в межах поточного рядка програми: коли токени рядка
+    закінчились, peek та advance повертають None, а перехід до наступного
+    рядка виконує метод next_line
+    """
+    def __init__(self, located_tokens):
+        self._tokens = iter(located_tokens)         # потік токенів
+        self._next = next(self._tokens, None)       # наступний токен потоку
+        self._line = 0                              # номер поточного рядка
+
+    def next_line(self):
+        """
+        Метод переходить до рядка, якому належить наступний токен потоку.
+        Повертає False, якщо потік токенів вичерпано
+        :return: булівське значення
+        """
+        if self._next is None:
+            return False
+        self._line = self._next.line
+        return True
+
+    def line(self):
+        """
+        Метод повертає номер поточного рядка
+        :return: номер рядка
+        """
+        return self._line
+
+    def peek(self):
+        """
+        Метод повертає наступний токен поточного рядка, не вилучаючи його,
+        або None, якщо токени рядка закінчились
+        :return: токен Token або None
+        """
+        if self._next is None or self._next.line != self._line:
+            return None
+        return self._next.token
+
+    def advance(self):
+        """
+        Метод вилучає та повертає наступний токен поточного рядка
+        або None, якщо токени рядка закінчились
+        :return: токен Token або None
+        """
+        token = self.peek()
+        if token is not None:
+            self._next = next(self._tokens, None)
+        return token
+
+
 if __name__ == "__main__":
     success = get_tokens("(((ab1_ - 345.56)(*/.2{_cde23") == (
                 [Token(type='left_paren', value='('),
@@ -153,4 +324,38 @@ if __name__ == "__main__":
         Token(type='operation', value='+'),
         Token(type='variable', value='b'),
         Token(type='right_paren', value=')')]
+
+    for string in ("(((ab1_ - 345.56)(*/.2{_cde23",
+                   "x = (a + b)",
+                   "  y1 = 1.2.3.4 + 5.. * _z / (t) ;  ",
+                   "змінна = 2 * ab² + x½ - 3",
+                   "{\x1c1*",
+                   "\x1dx\x1e=\x1f(a\x0b+\x0cb)\r\t\n",
+                   ""):
+        success = success and scan_tokens(string) == get_tokens(string)
+
+    # кожен ASCII символ між двома токенами та на краях рядка
+    for code in range(128):
+        string = "{0}a{0}1{0}".format(chr(code))
+        success = success and scan_tokens(string) == get_tokens(string)
+
+    located = list(iter_tokens(["x = a", "", "  y=(b)"]))
+    success = success and located == [
+        LocatedToken(Token('variable', 'x'), 1, 1),
+        LocatedToken(Token('equal', '='), 1, 3),
+        LocatedToken(Token('variable', 'a'), 1, 5),
+        LocatedToken(Token('variable', 'y'), 3, 3),
+        LocatedToken(Token('equal', '='), 3, 4),
+        LocatedToken(Token('left_paren', '('), 3, 5),
+        LocatedToken(Token('variable', 'b'), 3, 6),
+        LocatedToken(Token('right_paren', ')'), 3, 7)]
+
+    cursor = TokenCursor(iter_tokens("x = a\ny = b"))
+    lines = []
+    while cursor.next_line():
+        line = []
+        while cursor.peek() is not None:
+            line.append(cursor.advance().value)
+        lines.append((cursor.line(), line))
+    success = success and lines == [(1, ['x', '=', 'a']), (2, ['y', '=', 'b'])]
     print("Success =", success)